@@ -4,120 +4,524 @@ AWS Architecture Diagram Generator
 
 Generates visual diagrams of your Pulumi infrastructure.
 Reads Pulumi state and creates beautiful architecture diagrams.
+
+PNGs are drawn with the diagrams library. The text backends (Mermaid,
+Graphviz DOT, SVG) work from the same topology model without importing
+it, so they start fast enough for PR comments and headless CI.
 """
 
-from diagrams import Diagram, Cluster, Edge
-from diagrams.aws.compute import EC2
-from diagrams.aws.network import (
-    VPC,
-    InternetGateway,
-    PublicSubnet,
-    RouteTable,
-    NATGateway,
-    ELB
-)
-from diagrams.aws.database import RDS
 import json
+import shutil
+import struct
 import subprocess
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from models.topology import DEFAULT_COLLAPSE_THRESHOLD, Topology, TopologyEdge
 
-def get_stack_outputs():
-    """Get Pulumi stack outputs."""
-    try:
-        # Find pulumi directory
-        pulumi_dir = Path('pulumi')
-        if not pulumi_dir.exists():
-            pulumi_dir = Path('..')
+# PNG text chunk keyword holding the topology hash of a rendered diagram
+PNG_HASH_KEY = b'topology-hash'
+
+# Graphviz edge routing by node count: orthogonal routing is the slowest
+# layout and degrades badly on large graphs, so bigger diagrams fall back
+# to splines and then straight lines
+SPLINE_MODES = ((60, 'ortho'), (250, 'spline'))
+LARGE_SPLINE_MODE = 'line'
+
+# Text output formats -> file extension
+TEXT_FORMATS = {'mermaid': '.mmd', 'dot': '.dot', 'svg': '.svg'}
+
+# Graphviz node shapes for the DOT backend
+DOT_SHAPES = {
+    'cgw': 'box3d',
+    'tgw': 'doubleoctagon',
+    'igw': 'invhouse',
+    'vgw': 'house',
+    'nat': 'hexagon',
+    'route_table': 'note',
+    'instance': 'component',
+}
 
+
+def _pulumi_dir() -> Path:
+    """Find the pulumi directory from the repo root or inside it."""
+    pulumi_dir = Path('pulumi')
+    return pulumi_dir if pulumi_dir.exists() else Path('..')
+
+
+def get_stack_state(stack=None):
+    """
+    Get the full Pulumi state of a stack (`pulumi stack export`).
+
+    Returns:
+        dict: Parsed state export, or {} if it could not be read
+    """
+    cmd = ['pulumi', 'stack', 'export']
+    if stack:
+        cmd += ['--stack', stack]
+    try:
         result = subprocess.run(
-            ['pulumi', 'stack', 'output', '--json'],
-            capture_output=True,
-            text=True,
-            check=True,
-            cwd=str(pulumi_dir)
+            cmd, cwd=_pulumi_dir(), capture_output=True, text=True, check=True
         )
         return json.loads(result.stdout)
     except subprocess.CalledProcessError as e:
-        print(f"Warning: Could not get Pulumi outputs: {e}")
+        print(f"Warning: Could not export Pulumi state: {e}")
         print(f"  stderr: {e.stderr}")
-        print("  Tip: Make sure you're in Cloud_Networking_Lab directory")
-        print("       and have run 'pulumi up' successfully")
         return {}
-    except Exception as e:
-        print(f"Error getting outputs: {e}")
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error reading Pulumi state: {e}")
         return {}
 
 
-def generate_current_architecture():
-    """Generate diagram of current deployed infrastructure."""
-
-    print("📊 Generating architecture diagram...")
-
-    # Get outputs
-    outputs = get_stack_outputs()
+def read_png_hash(path):
+    """
+    Read the topology hash stored in a rendered PNG.
 
-    # Create diagram
-    graph_attr = {
-        "fontsize": "16",
-        "bgcolor": "white",
-        "pad": "0.5",
-        "splines": "ortho"
+    Returns:
+        str: The stored hash, or None if the file is missing or unstamped
+    """
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return None
+
+    pos = 8  # PNG signature
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[pos:pos + 8])
+        if chunk_type == b'tEXt':
+            keyword, _, text = data[pos + 8:pos + 8 + length].partition(b'\0')
+            if keyword == PNG_HASH_KEY:
+                return text.decode()
+        if chunk_type == b'IEND':
+            break
+        pos += 12 + length
+    return None
+
+
+def write_png_hash(path, digest):
+    """Stamp a PNG with the topology hash it was rendered from."""
+    path = Path(path)
+    data = path.read_bytes()
+    body = PNG_HASH_KEY + b'\0' + digest.encode()
+    chunk = (
+        struct.pack('>I', len(body)) + b'tEXt' + body
+        + struct.pack('>I', zlib.crc32(b'tEXt' + body) & 0xffffffff)
+    )
+    iend = data.rfind(b'IEND') - 4
+    path.write_bytes(data[:iend] + chunk + data[iend:])
+
+
+def choose_splines(topology):
+    """Graphviz splines mode for a topology's size."""
+    count = len(topology.nodes)
+    return next((mode for limit, mode in SPLINE_MODES if count <= limit), LARGE_SPLINE_MODE)
+
+
+def level_of_detail(topology, threshold=DEFAULT_COLLAPSE_THRESHOLD, az=None, tier=None):
+    """
+    Pick the view of a topology to draw.
+
+    Drilling down to an AZ and/or tier draws it at full detail; otherwise
+    VPCs with more than ``threshold`` subnets are collapsed into per-AZ,
+    per-tier group nodes.
+
+    Args:
+        topology: Full topology
+        threshold: Subnets per VPC drawn individually (0: never collapse)
+        az: Only draw this availability zone
+        tier: Only draw this subnet tier
+
+    Returns:
+        Topology to render
+    """
+    if az or tier:
+        return topology.focus(az=az, tier=tier)
+    return topology.collapse(threshold) if threshold else topology
+
+
+def walk_topology(topology):
+    """
+    Diagram layout of a topology, shared by every backend.
+
+    Yields events in drawing order: ``('cluster', title)`` opens a
+    nested group, ``('end', None)`` closes it, ``('node', node)`` draws a
+    node in the innermost open group and ``('edge', edge)`` connects two
+    nodes that were already drawn.
+    """
+    drawn = set()
+
+    cgws = topology.of_kind('cgw')
+    if cgws:
+        yield 'cluster', "On-Premises"
+        for cgw in cgws:
+            drawn.add(cgw.id)
+            yield 'node', cgw
+        yield 'end', None
+
+    yield 'cluster', "AWS Cloud"
+    for tgw in topology.of_kind('tgw'):
+        drawn.add(tgw.id)
+        yield 'node', tgw
+
+    for vpc in topology.of_kind('vpc'):
+        yield 'cluster', f"VPC: {vpc.label}\n{vpc.attrs.get('cidr', '')}"
+        for gateway in topology.children(vpc.id, 'igw', 'vgw', 'route_table'):
+            drawn.add(gateway.id)
+            yield 'node', gateway
+
+        subnets = topology.children(vpc.id, 'subnet', 'subnet_group')
+        for az in sorted({s.attrs.get('az', '') for s in subnets}):
+            yield 'cluster', f"Availability Zone: {az}"
+            for subnet in (s for s in subnets if s.attrs.get('az', '') == az):
+                drawn.add(subnet.id)
+                yield 'node', subnet
+                for child in topology.children(subnet.id):
+                    drawn.add(child.id)
+                    yield 'node', child
+                    yield 'edge', TopologyEdge(source=subnet.id, target=child.id)
+            yield 'end', None
+        yield 'end', None
+    yield 'end', None
+
+    for edge in topology.edges:
+        if edge.source in drawn and edge.target in drawn:
+            yield 'edge', edge
+
+
+def node_label(node):
+    """Display label for a node, with its key attributes."""
+    if node.kind == 'subnet_group':
+        label = f"{node.attrs['count']} {node.label}"
+        instances = int(node.attrs.get('instances', 0))
+        return f"{label}\n{instances} instance(s)" if instances else label
+    if node.kind == 'subnet':
+        return f"{node.label}\n{node.attrs.get('cidr', '')}"
+    if node.kind == 'cgw':
+        return f"{node.label}\n{node.attrs.get('ip', '')}"
+    return node.label
+
+
+def topology_to_mermaid(topology, title=None):
+    """
+    Mermaid flowchart source for a topology.
+
+    Renders natively in GitHub/GitLab markdown, so it can be posted
+    straight into a PR comment inside a ```mermaid fence.
+    """
+    def text(value):
+        return value.replace('"', '#quot;').replace('\n', '<br/>')
+
+    lines = [
+        '---',
+        f'title: {text(title or f"Cloud Networking Lab - {topology.name}")}',
+        '---',
+        'flowchart TB',
+    ]
+    ids = {}
+    clusters = 0
+    depth = 1
+    for event, item in walk_topology(topology):
+        indent = '    ' * depth
+        if event == 'cluster':
+            lines.append(f'{indent}subgraph c{clusters}["{text(item)}"]')
+            clusters += 1
+            depth += 1
+        elif event == 'end':
+            depth -= 1
+            lines.append(f"{'    ' * depth}end")
+        elif event == 'node':
+            ids[item.id] = f"n{len(ids)}"
+            lines.append(f'{indent}{ids[item.id]}["{text(node_label(item))}"]')
+        else:
+            arrow = f' -->|"{text(item.label)}"| ' if item.label else ' --> '
+            lines.append(f'{indent}{ids[item.source]}{arrow}{ids[item.target]}')
+    return '\n'.join(lines) + '\n'
+
+
+def topology_to_dot(topology, title=None):
+    """Graphviz DOT source for a topology."""
+    def text(value):
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    lines = [
+        f'digraph "{text(topology.name)}" {{',
+        f'    graph [label="{text(title or f"Cloud Networking Lab - {topology.name}")}", '
+        f'labelloc=t, fontsize=16, rankdir=TB, splines={choose_splines(topology)}];',
+        '    node [shape=box, style=rounded, fontsize=10];',
+        '    edge [fontsize=9];',
+    ]
+    ids = {}
+    clusters = 0
+    depth = 1
+    for event, item in walk_topology(topology):
+        indent = '    ' * depth
+        if event == 'cluster':
+            lines.append(f'{indent}subgraph cluster_{clusters} {{')
+            lines.append(f'{indent}    label="{text(item)}";')
+            clusters += 1
+            depth += 1
+        elif event == 'end':
+            depth -= 1
+            lines.append(f"{'    ' * depth}}}")
+        elif event == 'node':
+            ids[item.id] = f"n{len(ids)}"
+            shape = DOT_SHAPES.get(item.kind)
+            attrs = f', shape={shape}' if shape else ''
+            lines.append(f'{indent}{ids[item.id]} [label="{text(node_label(item))}"{attrs}];')
+        else:
+            label = f' [label="{text(item.label)}"]' if item.label else ''
+            lines.append(f'{indent}{ids[item.source]} -> {ids[item.target]}{label};')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_text(topology, fmt, title=None):
+    """
+    Render a topology in a text format without the diagrams library.
+
+    Args:
+        topology: Topology to draw
+        fmt: One of TEXT_FORMATS (mermaid, dot, svg)
+        title: Diagram title
+
+    Returns:
+        str: Diagram source (or SVG document)
+
+    Raises:
+        RuntimeError: If SVG is requested and Graphviz is not installed
+    """
+    if fmt == 'mermaid':
+        return topology_to_mermaid(topology, title)
+    dot = topology_to_dot(topology, title)
+    if fmt == 'dot':
+        return dot
+    if not shutil.which('dot'):
+        raise RuntimeError("SVG output needs Graphviz 'dot' on PATH (or use --format dot)")
+    result = subprocess.run(['dot', '-Tsvg'], input=dot, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def render_topology(topology, filename, title=None, force=False):
+    """
+    Render a topology to PNG with the diagrams library.
+
+    Skips Graphviz entirely when the existing PNG was rendered from a
+    topology with the same hash.
+
+    Args:
+        topology: Topology to draw
+        filename: Output path without extension
+        title: Diagram title
+        force: Render even if the PNG is up to date
+
+    Returns:
+        bool: True if rendered, False if skipped
+    """
+    png = Path(f"{filename}.png")
+    digest = topology.graph_hash()
+    if not force and read_png_hash(png) == digest:
+        print(f"⏭️  {png} is up to date - skipping render")
+        return False
+
+    from diagrams import Cluster, Diagram, Edge
+    from diagrams.aws.compute import EC2
+    from diagrams.aws.network import (
+        InternetGateway,
+        NATGateway,
+        PrivateSubnet,
+        PublicSubnet,
+        RouteTable,
+        TransitGateway,
+        VpnGateway,
+    )
+    from diagrams.generic.network import Router
+
+    icons = {
+        'cgw': Router,
+        'tgw': TransitGateway,
+        'igw': InternetGateway,
+        'nat': NATGateway,
+        'vgw': VpnGateway,
+        'route_table': RouteTable,
+        'instance': EC2,
     }
+    drawn = {}
+    clusters = []
 
     with Diagram(
-            "Cloud Networking Lab - Current Architecture",
+            title or f"Cloud Networking Lab - {topology.name}",
             show=False,
             direction="TB",
-            filename="diagrams/current_architecture",
-            graph_attr=graph_attr
+            filename=str(filename),
+            graph_attr={
+                "fontsize": "16", "bgcolor": "white", "pad": "0.5", "splines": choose_splines(topology)
+            }
     ):
-
-        with Cluster("Internet"):
-            internet = InternetGateway("Internet Gateway")
-
-        with Cluster(f"AWS Cloud (LocalStack)\nVPC: {outputs.get('vpc_cidr', '10.0.0.0/16')}"):
-
-            igw = InternetGateway("IGW")
-            rt = RouteTable("Route Table")
-
-            # Connect internet to IGW
-            internet >> Edge(color="darkgreen", style="bold") >> igw
-            igw >> Edge(label="0.0.0.0/0") >> rt
-
-            with Cluster("Availability Zone: us-east-1a"):
-                subnet_a = PublicSubnet(
-                    f"Public Subnet A\n{outputs.get('public_subnet_a_cidr', '10.0.1.0/24')}"
-                )
-
-                if 'web_server_id' in outputs:
-                    web_a = EC2(
-                        f"Web Server\n{outputs.get('web_server_private_ip', 'N/A')}"
-                    )
-                    rt >> subnet_a >> web_a
+        for event, item in walk_topology(topology):
+            if event == 'cluster':
+                clusters.append(Cluster(item))
+                clusters[-1].__enter__()
+            elif event == 'end':
+                clusters.pop().__exit__(None, None, None)
+            elif event == 'node':
+                if item.kind in ('subnet', 'subnet_group'):
+                    icon = PublicSubnet if item.attrs.get('tier') == 'public' else PrivateSubnet
                 else:
-                    rt >> subnet_a
-
-            with Cluster("Availability Zone: us-east-1b"):
-                subnet_b = PublicSubnet(
-                    f"Public Subnet B\n{outputs.get('public_subnet_b_cidr', '10.0.2.0/24')}"
-                )
-                rt >> subnet_b
+                    icon = icons[item.kind]
+                drawn[item.id] = icon(node_label(item))
+            else:
+                drawn[item.source] >> Edge(label=item.label or "") >> drawn[item.target]
+
+    write_png_hash(png, digest)
+    return True
+
+
+def _safe(name):
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+
 
-            # Check for subnet C
-            if 'public_subnet_c_cidr' in outputs:
-                with Cluster("Availability Zone: us-east-1c"):
-                    subnet_c = PublicSubnet(
-                        f"Public Subnet C\n{outputs.get('public_subnet_c_cidr', '10.0.3.0/24')}"
-                    )
-                    rt >> subnet_c
+def diagram_filename(stack=None, az=None, tier=None, intent=None):
+    """Deterministic output path (without extension) for a stack's or intent file's diagram."""
+    if intent:
+        base = f"diagrams/intent_{_safe(Path(intent).stem)}"
+    elif stack:
+        base = f"diagrams/architecture_{_safe(stack)}"
+    else:
+        base = "diagrams/current_architecture"
+    focus = '_'.join(_safe(part) for part in (az, tier) if part)
+    return f"{base}_{focus}" if focus else base
+
+
+def list_stacks():
+    """Names of all stacks in the Pulumi project."""
+    result = subprocess.run(
+        ['pulumi', 'stack', 'ls', '--json'],
+        cwd=_pulumi_dir(), capture_output=True, text=True, check=True
+    )
+    return sorted(stack['name'] for stack in json.loads(result.stdout))
+
+
+def diagram_title(stack=None, az=None, tier=None):
+    """Title for a stack's diagram, noting any drill-down."""
+    title = f"Cloud Networking Lab - {stack}" if stack else "Cloud Networking Lab - Current Architecture"
+    focus = ' / '.join(part for part in (az, tier) if part)
+    return f"{title} ({focus})" if focus else title
+
+
+def current_topology(stack=None, threshold=DEFAULT_COLLAPSE_THRESHOLD, az=None, tier=None):
+    """
+    Topology of a deployed stack, at the requested level of detail.
+
+    Raises:
+        RuntimeError: If the stack has no state or no network resources
+    """
+    state = get_stack_state(stack)
+    if not state:
+        raise RuntimeError("No Pulumi state available")
+
+    topology = Topology.from_state_export(state, name=stack or 'current')
+    if not topology.nodes:
+        raise RuntimeError("Stack state contains no network resources")
+
+    return level_of_detail(topology, threshold, az=az, tier=tier)
+
+
+def generate_current_architecture(stack=None, force=False, threshold=DEFAULT_COLLAPSE_THRESHOLD,
+                                  az=None, tier=None):
+    """
+    Generate diagram of current deployed infrastructure.
+
+    Large stacks are drawn collapsed (see level_of_detail); pass ``az``
+    and/or ``tier`` to render one slice of the stack at full detail.
+    """
+
+    print(f"📊 Generating architecture diagram{f' for {stack}' if stack else ''}...")
+
+    topology = current_topology(stack, threshold, az=az, tier=tier)
+    filename = diagram_filename(stack, az=az, tier=tier)
+    if render_topology(topology, filename, diagram_title(stack, az, tier), force=force):
+        print(f"✅ Diagram generated: {filename}.png")
+
+
+def generate_text_diagrams(stacks=None, fmt='mermaid', output=None, detail=None):
+    """
+    Write text diagrams (Mermaid, DOT or SVG) of deployed stacks.
+
+    Never imports the diagrams library, so it is cheap to run in CI.
+
+    Args:
+        stacks: Stacks to draw (default: the selected stack)
+        fmt: One of TEXT_FORMATS
+        output: "-" to print to stdout (default: diagrams/<name><ext>)
+        detail: Level-of-detail options (threshold, az, tier)
+
+    Returns:
+        list: Paths written (empty when printing to stdout)
+    """
+    detail = detail or {}
+    az, tier = detail.get('az'), detail.get('tier')
+    written = []
+    for stack in stacks or [None]:
+        topology = current_topology(stack, **detail)
+        text = render_text(topology, fmt, diagram_title(stack, az, tier))
+        if output == '-':
+            print(text, end='')
+            continue
+        path = Path(f"{diagram_filename(stack, az=az, tier=tier)}{TEXT_FORMATS[fmt]}")
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(text)
+        written.append(path)
+    return written
+
+
+def generate_intent_diagram(path, fmt='png', output=None, force=False, detail=None):
+    """
+    Draw the network an intent YAML file describes, before deploying it.
+
+    Needs no Pulumi state or cloud credentials.
+
+    Args:
+        path: Intent YAML file (e.g. examples/vpc_with_vpn.yaml)
+        fmt: "png" or one of TEXT_FORMATS
+        output: With a text format, "-" prints to stdout
+        force: Re-render an up-to-date PNG
+        detail: Level-of-detail options (threshold, az, tier)
+
+    Returns:
+        Path: File written, or None if printed or skipped
+    """
+    from models.aws_intent import AWSNetworkIntent
+
+    detail = detail or {}
+    az, tier = detail.get('az'), detail.get('tier')
+    intent = AWSNetworkIntent.from_yaml(path)
+    topology = level_of_detail(Topology.from_intent(intent), **detail)
+
+    base = diagram_filename(az=az, tier=tier, intent=path)
+    title = diagram_title(f"{intent.project_name} (intent)", az, tier)
 
-    print("✅ Diagram generated: diagrams/current_architecture.png")
+    if fmt == 'png':
+        return Path(f"{base}.png") if render_topology(topology, base, title, force=force) else None
+
+    text = render_text(topology, fmt, title)
+    if output == '-':
+        print(text, end='')
+        return None
+    target = Path(f"{base}{TEXT_FORMATS[fmt]}")
+    target.parent.mkdir(exist_ok=True)
+    target.write_text(text)
+    return target
 
 
 def generate_basic_vpc_diagram():
     """Generate diagram showing basic VPC architecture."""
 
+    from diagrams import Cluster, Diagram
+    from diagrams.aws.compute import EC2
+    from diagrams.aws.network import InternetGateway
+
     print("📊 Generating basic VPC diagram...")
 
     with Diagram(
@@ -144,6 +548,10 @@ def generate_basic_vpc_diagram():
 def generate_ha_web_diagram():
     """Generate HA web application with load balancer."""
 
+    from diagrams import Cluster, Diagram, Edge
+    from diagrams.aws.compute import EC2
+    from diagrams.aws.network import ELB, InternetGateway
+
     print("📊 Generating HA web application diagram...")
 
     with Diagram(
@@ -177,6 +585,11 @@ def generate_ha_web_diagram():
 def generate_multi_tier_diagram():
     """Generate multi-tier architecture diagram."""
 
+    from diagrams import Cluster, Diagram
+    from diagrams.aws.compute import EC2
+    from diagrams.aws.database import RDS
+    from diagrams.aws.network import ELB, InternetGateway, NATGateway
+
     print("📊 Generating multi-tier architecture diagram...")
 
     with Diagram(
@@ -222,8 +635,70 @@ def generate_multi_tier_diagram():
     print("✅ Diagram generated: diagrams/solution_03_multi_tier.png")
 
 
-def generate_all_diagrams():
-    """Generate all architecture diagrams."""
+# Solution template diagrams, by CLI name
+SOLUTION_DIAGRAMS = {
+    'basic_vpc': generate_basic_vpc_diagram,
+    'ha_web': generate_ha_web_diagram,
+    'multi_tier': generate_multi_tier_diagram,
+}
+
+
+def _render_job(job):
+    """
+    Render one diagram in a worker process.
+
+    Args:
+        job: (name, stack, force, detail) - name is "current" or a
+            SOLUTION_DIAGRAMS key; detail holds level-of-detail options
+            for "current"
+
+    Returns:
+        tuple: (label, seconds, error message or None)
+
+    Raises:
+        ImportError: The diagrams library is missing (fails the whole run)
+    """
+    name, stack, force, detail = job
+    label = f"{name}:{stack}" if stack else name
+    started = time.perf_counter()
+    try:
+        if name == 'current':
+            generate_current_architecture(stack, force=force, **detail)
+        else:
+            SOLUTION_DIAGRAMS[name]()
+        error = None
+    except ImportError:
+        raise
+    except Exception as e:
+        error = str(e)
+    return label, time.perf_counter() - started, error
+
+
+def generate_all_diagrams(names=None, stacks=None, force=False, workers=None, detail=None):
+    """
+    Generate architecture diagrams in parallel.
+
+    Every diagram is an independent Graphviz layout, so each one renders
+    in its own process.
+
+    Args:
+        names: Diagrams to render ("current" and/or SOLUTION_DIAGRAMS keys;
+            default: all)
+        stacks: Stacks to draw for "current" (default: the selected stack)
+        force: Re-render even if a diagram is up to date
+        workers: Worker processes (default: one per CPU)
+        detail: Level-of-detail options for "current" diagrams
+            (threshold, az, tier; see generate_current_architecture)
+
+    Returns:
+        list: (label, seconds, error) per diagram
+    """
+    names = names or ['current', *SOLUTION_DIAGRAMS]
+    detail = detail or {}
+    jobs = [
+        ('current', stack, force, detail)
+        for stack in (stacks or [None]) if 'current' in names
+    ] + [(name, None, force, {}) for name in names if name != 'current']
 
     # Create diagrams directory
     Path("diagrams").mkdir(exist_ok=True)
@@ -231,38 +706,111 @@ def generate_all_diagrams():
     print("\n🎨 AWS Architecture Diagram Generator")
     print("=" * 50)
 
-    # Generate current architecture
-    try:
-        generate_current_architecture()
-    except Exception as e:
-        print(f"⚠️  Could not generate current architecture: {e}")
-        print("    (Make sure you've run 'pulumi up' first)")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_render_job, jobs))
+    elapsed = time.perf_counter() - started
 
-    # Generate solution templates
-    generate_basic_vpc_diagram()
-    generate_ha_web_diagram()
-    generate_multi_tier_diagram()
+    print("\n⏱️  Render times:")
+    for label, seconds, error in results:
+        status = f"❌ {error}" if error else "✓"
+        print(f"  {label:<30} {seconds:6.2f}s  {status}")
+    print(f"  {'total (wall clock)':<30} {elapsed:6.2f}s")
 
-    print("\n✅ All diagrams generated successfully!")
-    print("\n📂 Diagrams saved to: ./diagrams/")
-    print("\nGenerated diagrams:")
-    print("  • current_architecture.png - Your deployed infrastructure")
-    print("  • solution_01_basic_vpc.png - Basic VPC pattern")
-    print("  • solution_02_ha_web.png - HA web application")
-    print("  • solution_03_multi_tier.png - Multi-tier architecture")
+    if any(error for label, _, error in results if label.startswith('current')):
+        print("\n⚠️  Could not generate current architecture")
+        print("    (Make sure you've run 'pulumi up' first)")
 
+    print("\n📂 Diagrams saved to: ./diagrams/")
     print("\n💡 Open diagrams with:")
     print("  xdg-open diagrams/current_architecture.png")
     print("  # or")
     print("  nautilus diagrams/")
+    return results
 
 
 def main():
     """Main entry point."""
+    import argparse
     import sys
 
+    parser = argparse.ArgumentParser(description='Generate AWS architecture diagrams')
+    parser.add_argument(
+        'diagrams',
+        nargs='*',
+        metavar='DIAGRAM',
+        help=f"Diagrams to render: {', '.join(['current', *SOLUTION_DIAGRAMS])} (default: all)"
+    )
+    parser.add_argument(
+        '--stack',
+        action='append',
+        help='Stack to draw (repeatable; writes diagrams/architecture_<stack>.png)'
+    )
+    parser.add_argument(
+        '--intent',
+        action='append',
+        metavar='YAML',
+        help='Draw an intent file instead of a deployed stack (repeatable; no Pulumi or AWS needed)'
+    )
+    parser.add_argument(
+        '--all-stacks',
+        action='store_true',
+        help='Draw every stack in the project'
+    )
+    parser.add_argument('--workers', type=int, help='Parallel render processes (default: CPUs)')
+    parser.add_argument('--force', action='store_true', help='Re-render unchanged diagrams')
+    parser.add_argument(
+        '--collapse-threshold',
+        type=int,
+        default=DEFAULT_COLLAPSE_THRESHOLD,
+        help='Collapse VPCs with more subnets than this into per-AZ/tier groups '
+             f'(0: never; default: {DEFAULT_COLLAPSE_THRESHOLD})'
+    )
+    parser.add_argument('--az', help='Drill down: draw only this availability zone at full detail')
+    parser.add_argument('--tier', help='Drill down: draw only this subnet tier at full detail')
+    parser.add_argument(
+        '--format',
+        choices=['png', *TEXT_FORMATS],
+        default='png',
+        help='Output format; mermaid/dot/svg draw deployed stacks without the diagrams library'
+    )
+    parser.add_argument(
+        '--output',
+        metavar='PATH',
+        help='With a text format: "-" prints to stdout (default: diagrams/<name>.<ext>)'
+    )
+
+    args = parser.parse_args()
+    unknown = set(args.diagrams) - {'current', *SOLUTION_DIAGRAMS}
+    if unknown:
+        parser.error(f"unknown diagram(s): {', '.join(sorted(unknown))}")
+    if args.format != 'png' and set(args.diagrams) - {'current'}:
+        parser.error(f"--format {args.format} only supports the 'current' diagram")
+    if args.output and args.format == 'png':
+        parser.error("--output requires a text --format")
+    if args.intent and (args.diagrams or args.stack or args.all_stacks):
+        parser.error("--intent cannot be combined with diagrams or stacks")
+
     try:
-        generate_all_diagrams()
+        stacks = list_stacks() if args.all_stacks else args.stack
+        names = args.diagrams or (['current'] if stacks else None)
+        detail = {'threshold': args.collapse_threshold, 'az': args.az, 'tier': args.tier}
+        if args.intent:
+            for path in args.intent:
+                written = generate_intent_diagram(path, args.format, args.output, args.force, detail)
+                if written:
+                    print(f"✅ Diagram generated: {written}", file=sys.stderr)
+            return
+        if args.format != 'png':
+            for path in generate_text_diagrams(stacks, args.format, args.output, detail):
+                print(f"✅ Diagram generated: {path}", file=sys.stderr)
+            return
+        results = generate_all_diagrams(names, stacks, args.force, args.workers, detail)
+        # A missing deployment only fails the run if its diagram was asked for
+        explicit = bool(args.diagrams or stacks)
+        if any(error and (explicit or not label.startswith('current'))
+               for label, _, error in results):
+            sys.exit(1)
     except ImportError as e:
         print("\n❌ Error: 'diagrams' library not installed")
         print("\nInstall with:")
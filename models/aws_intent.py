@@ -5,8 +5,41 @@ Intent-based configuration for AWS networking infrastructure.
 """
 
 import ipaddress
-from typing import Literal, Optional
-from pydantic import BaseModel, Field, field_validator
+import math
+from pathlib import Path
+from typing import Literal, Optional, Union
+
+import yaml
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+# Attachments per Transit Gateway (AWS default quota)
+MAX_TRANSIT_GATEWAY_ATTACHMENTS = 5000
+
+# Name the Pulumi program gives the project VPC's TGW attachment
+PROJECT_VPC_NAME = "project"
+
+# Throughput of one IPsec tunnel, and tunnels per VPN connection
+VPN_TUNNEL_BANDWIDTH_GBPS = 1.25
+VPN_TUNNELS_PER_CONNECTION = 2
+
+# Private ASN ranges AWS accepts for a Transit Gateway
+TRANSIT_GATEWAY_ASN_RANGES = ((64512, 65534), (4200000000, 4294967294))
+
+
+def _first_overlap(networks: list) -> Optional[tuple[int, int]]:
+    """
+    Indexes (in list order) of the first two overlapping networks, or None.
+    
+    CIDRs either nest or are disjoint, so after sorting by start address an
+    overlap always involves neighbours (O(n log n) instead of comparing
+    every pair).
+    """
+    order = sorted(range(len(networks)), key=lambda i: networks[i].network_address)
+    for previous, i in zip(order, order[1:]):
+        if networks[i].network_address <= networks[previous].broadcast_address:
+            return tuple(sorted((previous, i)))
+    return None
 
 
 class SubnetIntent(BaseModel):
@@ -69,6 +102,7 @@ class VPCIntent(BaseModel):
         vpc_network = ipaddress.ip_network(vpc_cidr_str, strict=False)
         
         # Check each subnet is within VPC CIDR
+        networks = []
         for subnet in v:
             subnet_network = ipaddress.ip_network(subnet.cidr_block, strict=False)
             if not subnet_network.subnet_of(vpc_network):
@@ -76,16 +110,14 @@ class VPCIntent(BaseModel):
                     f"Subnet {subnet.name} ({subnet.cidr_block}) is not within "
                     f"VPC CIDR {vpc_cidr_str}"
                 )
+            networks.append(subnet_network)
         
-        # Check for overlapping subnets
-        for i, subnet1 in enumerate(v):
-            net1 = ipaddress.ip_network(subnet1.cidr_block, strict=False)
-            for subnet2 in v[i+1:]:
-                net2 = ipaddress.ip_network(subnet2.cidr_block, strict=False)
-                if net1.overlaps(net2):
-                    raise ValueError(
-                        f"Subnets {subnet1.name} and {subnet2.name} have overlapping CIDR blocks"
-                    )
+        overlap = _first_overlap(networks)
+        if overlap:
+            first, second = overlap
+            raise ValueError(
+                f"Subnets {v[first].name} and {v[second].name} have overlapping CIDR blocks"
+            )
         
         return v
 
@@ -133,6 +165,47 @@ class VPNIntent(BaseModel):
         None, description="Amazon side BGP ASN (default: 64512)"
     )
     
+    # Aggregate bandwidth (ECMP over several connections on a Transit Gateway)
+    connections: int = Field(default=1, ge=1, description="Parallel VPN connections")
+    bandwidth_gbps: Optional[float] = Field(
+        None, gt=0, description="Aggregate bandwidth to provision tunnels for"
+    )
+    additional_customer_gateways: list[CustomerGatewayIntent] = Field(
+        default_factory=list, description="More on-prem devices to spread connections over"
+    )
+    
+    @property
+    def customer_gateways(self) -> list[CustomerGatewayIntent]:
+        """Every customer gateway, primary first."""
+        primary = [self.customer_gateway] if self.customer_gateway else []
+        return primary + list(self.additional_customer_gateways)
+    
+    @property
+    def connection_count(self) -> int:
+        """
+        VPN connections to create.
+        
+        Enough that the tunnels cover bandwidth_gbps at
+        VPN_TUNNEL_BANDWIDTH_GBPS each, and at least one per customer
+        gateway. A single flow still uses one tunnel, so only the
+        aggregate grows.
+        """
+        needed = self.connections
+        if self.bandwidth_gbps:
+            tunnels = math.ceil(self.bandwidth_gbps / VPN_TUNNEL_BANDWIDTH_GBPS)
+            needed = max(needed, math.ceil(tunnels / VPN_TUNNELS_PER_CONNECTION))
+        return max(needed, len(self.customer_gateways))
+    
+    @property
+    def tunnel_count(self) -> int:
+        """IPsec tunnels across all connections."""
+        return self.connection_count * VPN_TUNNELS_PER_CONNECTION
+    
+    @property
+    def ecmp(self) -> bool:
+        """Whether traffic is spread over several connections."""
+        return self.connection_count > 1
+    
     @field_validator('static_routes')
     def validate_static_routes(cls, v: list[str]) -> list[str]:
         """Validate static route CIDR blocks."""
@@ -151,6 +224,79 @@ class VPNIntent(BaseModel):
         return v
 
 
+class SpokeVPCIntent(VPCIntent):
+    """Intent for a spoke VPC attached to the Transit Gateway."""
+    
+    name: str = Field(..., description="Spoke name/identifier")
+    subnets: list[SubnetIntent] = Field(
+        ..., min_length=1, description="Subnets (the TGW attachment uses one per AZ)"
+    )
+
+
+class TransitGatewayIntent(BaseModel):
+    """
+    Intent for a Transit Gateway hub.
+    
+    The project VPC and every spoke attach to one TGW and share a single
+    set of VPN tunnels and TGW route tables, so resources grow linearly
+    with the number of VPCs instead of one VPN (or peering mesh) per VPC.
+    """
+    
+    enabled: bool = Field(default=False, description="Enable Transit Gateway")
+    amazon_side_asn: Optional[int] = Field(
+        None, description="Transit Gateway BGP ASN (default: 64512)"
+    )
+    spokes: list[SpokeVPCIntent] = Field(
+        default_factory=list, description="Additional VPCs attached to the TGW"
+    )
+    isolate_spokes: bool = Field(
+        default=False, description="VPCs reach on-prem but not each other"
+    )
+    vpn_ecmp_support: bool = Field(
+        default=True, description="Spread traffic across VPN tunnels with equal BGP paths"
+    )
+    vpc_routes: list[str] = Field(
+        default_factory=lambda: ["10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"],
+        description="Destinations each VPC route table sends to the TGW"
+    )
+    
+    @field_validator('amazon_side_asn')
+    def validate_amazon_asn(cls, v: Optional[int]) -> Optional[int]:
+        """Validate the Transit Gateway ASN is in a private range."""
+        if v is not None and not any(low <= v <= high for low, high in TRANSIT_GATEWAY_ASN_RANGES):
+            raise ValueError(
+                f"Transit Gateway ASN must be 64512-65534 or 4200000000-4294967294, got: {v}"
+            )
+        return v
+    
+    @field_validator('spokes')
+    def validate_spokes(cls, v: list[SpokeVPCIntent]) -> list[SpokeVPCIntent]:
+        """Validate spoke names are unique, not reserved, and fit the attachment quota."""
+        # One attachment per spoke, plus the project VPC and the VPN
+        if len(v) + 2 > MAX_TRANSIT_GATEWAY_ATTACHMENTS:
+            raise ValueError(
+                f"{len(v)} spokes exceed {MAX_TRANSIT_GATEWAY_ATTACHMENTS} TGW attachments"
+            )
+        seen = set()
+        for spoke in v:
+            if spoke.name == PROJECT_VPC_NAME:
+                raise ValueError(f"Spoke name '{PROJECT_VPC_NAME}' is reserved for the project VPC")
+            if spoke.name in seen:
+                raise ValueError(f"Duplicate spoke name: {spoke.name}")
+            seen.add(spoke.name)
+        return v
+    
+    @field_validator('vpc_routes')
+    def validate_vpc_routes(cls, v: list[str]) -> list[str]:
+        """Validate VPC route destinations."""
+        for route in v:
+            try:
+                ipaddress.ip_network(route, strict=False)
+            except ValueError as err:
+                raise ValueError(f"Invalid TGW route CIDR: {route}") from err
+        return v
+
+
 class AWSNetworkIntent(BaseModel):
     """
     Complete AWS network intent.
@@ -172,6 +318,11 @@ class AWSNetworkIntent(BaseModel):
     # VPN configuration (optional)
     vpn: Optional[VPNIntent] = Field(None, description="VPN configuration")
     
+    # Transit Gateway hub (optional; the VPN terminates on it when enabled)
+    transit_gateway: Optional[TransitGatewayIntent] = Field(
+        None, description="Transit Gateway configuration"
+    )
+    
     # Features
     enable_nat_gateway: bool = Field(
         default=False, description="Enable NAT gateway for private subnets"
@@ -196,8 +347,77 @@ class AWSNetworkIntent(BaseModel):
                 raise ValueError("VPN enabled but customer_gateway not configured")
             if v.static_routes_only and not v.static_routes:
                 raise ValueError("static_routes_only enabled but no static_routes provided")
+            ips = [cgw.ip_address for cgw in v.customer_gateways]
+            if len(set(ips)) != len(ips):
+                raise ValueError("Customer gateways must have distinct ip_address values")
+            if v.ecmp and v.static_routes_only:
+                raise ValueError(
+                    f"{v.connection_count} VPN connections need BGP for ECMP "
+                    f"(set static_routes_only: false)"
+                )
         return v
     
+    @field_validator('transit_gateway')
+    def validate_transit_gateway(
+        cls, v: Optional[TransitGatewayIntent], info
+    ) -> Optional[TransitGatewayIntent]:
+        """Validate spoke VPCs do not overlap each other or the project VPC."""
+        if not (v and v.enabled and v.spokes):
+            return v
+        
+        vpc = info.data.get('vpc')
+        names = [spoke.name for spoke in v.spokes]
+        cidrs = [spoke.cidr_block for spoke in v.spokes]
+        if vpc:
+            names.insert(0, "project VPC")
+            cidrs.insert(0, vpc.cidr_block)
+        
+        overlap = _first_overlap([ipaddress.ip_network(c, strict=False) for c in cidrs])
+        if overlap:
+            first, second = overlap
+            raise ValueError(
+                f"VPCs {names[first]} and {names[second]} have overlapping CIDR blocks"
+            )
+        return v
+    
+    @model_validator(mode='after')
+    def validate_ecmp(self) -> "AWSNetworkIntent":
+        """Validate multi-connection VPNs terminate on an ECMP-enabled TGW."""
+        if not (self.vpn and self.vpn.enabled and self.vpn.ecmp):
+            return self
+        # A VGW uses one connection at a time; only a TGW spreads over several
+        if not self.transit_gateway_enabled:
+            raise ValueError(
+                f"{self.vpn.connection_count} VPN connections need an enabled transit_gateway"
+            )
+        if not self.transit_gateway.vpn_ecmp_support:
+            raise ValueError("Multiple VPN connections need transit_gateway.vpn_ecmp_support")
+        return self
+    
+    @property
+    def transit_gateway_enabled(self) -> bool:
+        """Whether VPCs (and the VPN) attach to a Transit Gateway."""
+        return bool(self.transit_gateway and self.transit_gateway.enabled)
+    
+    @classmethod
+    def from_yaml(cls, path: Union[str, Path]) -> "AWSNetworkIntent":
+        """
+        Load intent from a YAML file.
+        
+        Accepts the layout used in examples/ (intent nested under a
+        top-level ``network`` key) as well as a bare intent mapping.
+        
+        Args:
+            path: Path to the intent YAML file
+            
+        Returns:
+            AWSNetworkIntent: The validated intent
+        """
+        with open(path) as f:
+            data = yaml.safe_load(f) or {}
+        
+        return cls.model_validate(data.get("network", data))
+    
     def to_pulumi_config(self) -> dict:
         """
         Convert intent to Pulumi configuration format.
@@ -215,6 +435,21 @@ class AWSNetworkIntent(BaseModel):
         if self.vpn and self.vpn.enabled and self.vpn.customer_gateway:
             config["customer_gateway_ip"] = self.vpn.customer_gateway.ip_address
             config["customer_bgp_asn"] = self.vpn.customer_gateway.bgp_asn
+            config["vpn_connection_count"] = self.vpn.connection_count
+            if self.vpn.additional_customer_gateways:
+                config["vpn_additional_customer_gateways"] = [
+                    cgw.model_dump() for cgw in self.vpn.additional_customer_gateways
+                ]
+        
+        config["enable_transit_gateway"] = self.transit_gateway_enabled
+        if self.transit_gateway_enabled:
+            tgw = self.transit_gateway
+            if tgw.amazon_side_asn:
+                config["transit_gateway_asn"] = tgw.amazon_side_asn
+            config["transit_gateway_isolate_spokes"] = tgw.isolate_spokes
+            config["transit_gateway_vpn_ecmp"] = tgw.vpn_ecmp_support
+            config["transit_gateway_vpc_routes"] = list(tgw.vpc_routes)
+            config["transit_gateway_spokes"] = [spoke.model_dump() for spoke in tgw.spokes]
         
         return config
 
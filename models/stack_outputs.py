@@ -0,0 +1,279 @@
+"""
+Local cache of Pulumi stack outputs.
+
+`pulumi stack output` takes seconds per call, so deploy.py writes the
+outputs of every successful deploy to a versioned JSON file that other
+tools (status checks, ad-hoc scripts) read instantly. The CLI is
+only consulted when the cache is missing or stale: too old, or captured
+before the deploy record deploy.py writes after each update. Comparing the
+cached update version with `pulumi stack history` (to catch a manual
+`pulumi up`) is opt-in, since it costs a CLI call on every cache hit.
+"""
+
+import json
+import os
+import subprocess
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+# Bump when the cache file layout changes; older files are treated as stale
+CACHE_SCHEMA_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".stack-cache"
+DEFAULT_PULUMI_DIR = Path(__file__).resolve().parent.parent / "pulumi"
+DEFAULT_MAX_AGE = timedelta(hours=1)
+
+
+class StackOutputsCache(BaseModel):
+    """Cached outputs of a single Pulumi stack."""
+
+    schema_version: int = Field(default=CACHE_SCHEMA_VERSION, description="Cache file format")
+    stack: str = Field(..., description="Stack name")
+    update_version: Optional[int] = Field(None, description="Pulumi update version")
+    timestamp: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="When the outputs were captured"
+    )
+    outputs: dict[str, Any] = Field(default_factory=dict, description="Stack outputs")
+
+    def age(self) -> timedelta:
+        """Time since the outputs were captured."""
+        return datetime.now(timezone.utc) - self.timestamp
+
+    def is_stale(
+        self,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+        latest_version: Optional[int] = None,
+        deployed_at: Optional[datetime] = None
+    ) -> bool:
+        """
+        Check whether the cache should be refreshed from the CLI.
+
+        Args:
+            max_age: Maximum age of the outputs
+            latest_version: The stack's latest update version, if known;
+                outputs recorded for any other update are stale
+            deployed_at: When the stack was last deployed, if known;
+                outputs captured before then are stale
+        """
+        if latest_version is not None and latest_version != self.update_version:
+            return True
+        if deployed_at is not None and deployed_at > self.timestamp:
+            return True
+        return self.schema_version != CACHE_SCHEMA_VERSION or self.age() > max_age
+
+
+def cache_path(stack: str, cache_dir: Optional[Path] = None) -> Path:
+    """Path of the cache file for a stack."""
+    return (cache_dir or DEFAULT_CACHE_DIR) / f"{stack}.outputs.json"
+
+
+def deploy_record_path(stack: str, cache_dir: Optional[Path] = None) -> Path:
+    """Path of the deploy record deploy.py writes after each update."""
+    return (cache_dir or DEFAULT_CACHE_DIR) / f"{stack}.deployed.json"
+
+
+def last_deployed(stack: str, cache_dir: Optional[Path] = None) -> Optional[datetime]:
+    """
+    When deploy.py last updated a stack, from its deploy record's mtime.
+
+    Returns:
+        The deploy time, or None if no deploy is recorded
+    """
+    try:
+        mtime = deploy_record_path(stack, cache_dir).stat().st_mtime
+    except OSError:
+        return None
+    return datetime.fromtimestamp(mtime, timezone.utc)
+
+
+def write_stack_outputs(
+    stack: str,
+    outputs: dict,
+    update_version: Optional[int] = None,
+    cache_dir: Optional[Path] = None
+) -> StackOutputsCache:
+    """
+    Write stack outputs to the cache.
+
+    The file is replaced atomically so concurrent readers never see a
+    partial write.
+
+    Args:
+        stack: Stack name
+        outputs: Stack outputs (as from `pulumi stack output --json`)
+        update_version: Pulumi update version the outputs belong to
+        cache_dir: Cache directory (default: .stack-cache/ in the repo root)
+
+    Returns:
+        StackOutputsCache: The cache entry that was written
+    """
+    entry = StackOutputsCache(stack=stack, update_version=update_version, outputs=outputs)
+    path = cache_path(stack, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(entry.model_dump_json(indent=2))
+    os.replace(tmp_path, path)
+
+    return entry
+
+
+def read_stack_outputs_cache(
+    stack: Optional[str] = None,
+    cache_dir: Optional[Path] = None
+) -> Optional[StackOutputsCache]:
+    """
+    Read a cache entry without any staleness check.
+
+    Args:
+        stack: Stack name (None = most recently written stack)
+        cache_dir: Cache directory
+
+    Returns:
+        The cache entry, or None if missing or unreadable
+    """
+    if stack is None:
+        candidates = sorted(
+            (cache_dir or DEFAULT_CACHE_DIR).glob("*.outputs.json"),
+            key=lambda p: p.stat().st_mtime
+        )
+        if not candidates:
+            return None
+        path = candidates[-1]
+    else:
+        path = cache_path(stack, cache_dir)
+
+    try:
+        return StackOutputsCache.model_validate_json(path.read_text())
+    except (OSError, ValidationError):
+        return None
+
+
+def invalidate_stack_outputs(stack: str, cache_dir: Optional[Path] = None) -> None:
+    """Remove the cache entry for a stack (e.g. after destroy)."""
+    cache_path(stack, cache_dir).unlink(missing_ok=True)
+
+
+def fetch_stack_outputs(
+    stack: Optional[str] = None,
+    pulumi_dir: Optional[Path] = None
+) -> tuple[dict, Optional[int]]:
+    """
+    Fetch stack outputs and update version from the Pulumi CLI.
+
+    Args:
+        stack: Stack name (None = currently selected stack)
+        pulumi_dir: Pulumi project directory
+
+    Returns:
+        Tuple of (outputs, update version)
+
+    Raises:
+        subprocess.CalledProcessError: If `pulumi stack output` fails
+    """
+    stack_args = ["--stack", stack] if stack else []
+
+    result = subprocess.run(
+        ["pulumi", "stack", "output", "--json", *stack_args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=pulumi_dir or DEFAULT_PULUMI_DIR
+    )
+    outputs = json.loads(result.stdout or "{}")
+
+    return outputs, latest_update_version(stack, pulumi_dir)
+
+
+def latest_update_version(
+    stack: Optional[str] = None,
+    pulumi_dir: Optional[Path] = None
+) -> Optional[int]:
+    """
+    Version of the stack's most recent update, from `pulumi stack history`.
+
+    Returns:
+        The update version, or None if the history is unavailable
+    """
+    stack_args = ["--stack", stack] if stack else []
+    try:
+        history = subprocess.run(
+            ["pulumi", "stack", "history", "--json", "--page-size", "1", *stack_args],
+            capture_output=True,
+            text=True,
+            cwd=pulumi_dir or DEFAULT_PULUMI_DIR
+        )
+    except OSError:
+        return None
+    if history.returncode != 0:
+        return None
+
+    try:
+        updates = json.loads(history.stdout or "[]")
+    except json.JSONDecodeError:
+        return None
+    return updates[0].get("version") if updates else None
+
+
+def refresh_stack_outputs(
+    stack: str,
+    pulumi_dir: Optional[Path] = None,
+    cache_dir: Optional[Path] = None
+) -> StackOutputsCache:
+    """Fetch outputs from the CLI and write them to the cache."""
+    outputs, update_version = fetch_stack_outputs(stack, pulumi_dir)
+    return write_stack_outputs(stack, outputs, update_version, cache_dir)
+
+
+def get_stack_outputs(
+    stack: Optional[str] = None,
+    pulumi_dir: Optional[Path] = None,
+    max_age: timedelta = DEFAULT_MAX_AGE,
+    refresh: bool = False,
+    cache_dir: Optional[Path] = None,
+    check_version: bool = False
+) -> dict:
+    """
+    Get stack outputs, preferring the local cache.
+
+    A cache entry is used only while it is younger than max_age and newer
+    than the stack's deploy record, both checked with local file reads.
+    With check_version it must also be recorded for the stack's latest
+    update, which costs one `pulumi stack history` call per lookup but
+    catches updates made outside deploy.py; the check is skipped when the
+    history is unavailable.
+
+    Args:
+        stack: Stack name (None = most recently cached stack, or the
+            currently selected stack if nothing is cached)
+        pulumi_dir: Pulumi project directory for the CLI fallback
+        max_age: Maximum cache age before falling back to the CLI
+        refresh: Always query the CLI and rewrite the cache
+        cache_dir: Cache directory
+        check_version: Also compare the cached update version with the
+            stack's latest from the CLI
+
+    Returns:
+        dict: Stack outputs
+
+    Raises:
+        subprocess.CalledProcessError: If the CLI fallback fails
+    """
+    entry = None if refresh else read_stack_outputs_cache(stack, cache_dir)
+    if entry is not None and not entry.is_stale(
+        max_age, deployed_at=last_deployed(entry.stack, cache_dir)
+    ):
+        latest = latest_update_version(entry.stack, pulumi_dir) if check_version else None
+        if not entry.is_stale(max_age, latest):
+            return entry.outputs
+
+    stack = stack or (entry.stack if entry else None)
+    outputs, update_version = fetch_stack_outputs(stack, pulumi_dir)
+    if stack:
+        write_stack_outputs(stack, outputs, update_version, cache_dir)
+
+    return outputs
@@ -0,0 +1,280 @@
+"""
+Seeded synthetic network intents for scale, load and fuzz testing.
+
+Generates fleets of AWSNetworkIntent documents (one VPC each) with a
+configurable number of AZs, tiers, subnets and VPN static routes, and can
+deliberately inject overlapping subnets or invalid values. The same seed
+always produces the same fleet.
+
+Addresses are computed with integer arithmetic rather than ipaddress, so
+100k subnets generate in well under a second.
+"""
+
+import ipaddress
+import random
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import yaml
+from pydantic import BaseModel, Field
+
+from models.aws_intent import (
+    AWSNetworkIntent,
+    CustomerGatewayIntent,
+    SubnetIntent,
+    VPCIntent,
+    VPNIntent,
+)
+
+# Address pools carved into one /16 per VPC, in order
+VPC_POOLS = ('10.0.0.0/8', '100.64.0.0/10', '172.16.0.0/12')
+
+# On-prem address space for VPN static routes
+STATIC_ROUTE_POOL = '192.168.0.0/16'
+
+# Smallest subnet AWS allows
+MAX_SUBNET_PREFIX = 28
+
+# Ways to break an otherwise valid intent (see inject_fault)
+FAULTS = ('overlap', 'outside_vpc', 'bad_cidr', 'bad_az', 'bad_route', 'vpn_without_cgw')
+
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+class SyntheticSpec(BaseModel):
+    """Shape of a synthetic fleet."""
+
+    vpcs: int = Field(default=1, ge=1, description="Number of VPCs (one intent each)")
+    azs: int = Field(default=3, ge=1, le=6, description="Availability zones per VPC")
+    tiers: list[str] = Field(
+        default_factory=lambda: ['public', 'app', 'data'],
+        description="Subnet tiers; 'public' subnets get public IPs"
+    )
+    subnets_per_tier: int = Field(default=1, ge=1, description="Subnets per tier per AZ")
+    static_routes: int = Field(default=0, ge=0, description="VPN static routes per VPC")
+    overlap_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Fraction of VPCs with an overlapping subnet"
+    )
+    error_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Fraction of VPCs with another injected fault"
+    )
+    seed: int = Field(default=0, description="Random seed")
+    region: str = Field(default='us-east-1', description="AWS region")
+    project_prefix: str = Field(default='synth', description="Project name prefix")
+
+    @property
+    def subnets_per_vpc(self) -> int:
+        return self.azs * len(self.tiers) * self.subnets_per_tier
+
+
+class SyntheticIntent(BaseModel):
+    """A generated intent document and the faults injected into it."""
+
+    data: dict = Field(..., description="Intent mapping, as under 'network:' in YAML")
+    faults: list[str] = Field(default_factory=list, description="Injected faults")
+
+    @property
+    def valid(self) -> bool:
+        """Whether the intent is expected to pass validation."""
+        return not self.faults
+
+    def to_intent(self, validate: bool = True) -> AWSNetworkIntent:
+        """
+        Build the intent model.
+
+        Args:
+            validate: Run full validation. ``False`` uses model_construct,
+                which skips validators and is much faster for known-good
+                data; only use it on valid intents.
+
+        Raises:
+            pydantic.ValidationError: If validating a faulty intent
+        """
+        if validate:
+            return AWSNetworkIntent.model_validate(self.data)
+        return _construct(self.data)
+
+
+def _ip(value: int) -> str:
+    return f"{value >> 24 & 255}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}"
+
+
+def _prefix_for(count: int, base_prefix: int) -> int:
+    """Longest prefix that fits ``count`` equal blocks in a /base_prefix."""
+    return base_prefix + max(0, (count - 1).bit_length())
+
+
+def _blocks(base: int, prefix: int, count: int) -> list[str]:
+    """The first ``count`` consecutive /prefix blocks starting at ``base``."""
+    step = 1 << (32 - prefix)
+    return [f"{_ip(base + i * step)}/{prefix}" for i in range(count)]
+
+
+def vpc_cidrs(count: int) -> Iterator[str]:
+    """Non-overlapping /16 VPC CIDRs drawn from VPC_POOLS."""
+    produced = 0
+    for pool in VPC_POOLS:
+        for network in ipaddress.ip_network(pool).subnets(new_prefix=16):
+            if produced == count:
+                return
+            yield str(network)
+            produced += 1
+    if produced < count:
+        raise ValueError(f"At most {produced} VPCs fit in the synthetic address pools")
+
+
+def static_routes(count: int) -> list[str]:
+    """``count`` non-overlapping on-prem routes from STATIC_ROUTE_POOL."""
+    pool = ipaddress.ip_network(STATIC_ROUTE_POOL)
+    prefix = max(24, _prefix_for(count, pool.prefixlen))
+    if prefix > 32:
+        raise ValueError(f"{count} static routes do not fit in {STATIC_ROUTE_POOL}")
+    return _blocks(int(pool.network_address), prefix, count)
+
+
+def generate_vpc(spec: SyntheticSpec, index: int, vpc_cidr: str, routes: list[str]) -> dict:
+    """Valid intent mapping for the ``index``-th VPC of a fleet."""
+    vpc = ipaddress.ip_network(vpc_cidr)
+    count = spec.subnets_per_vpc
+    prefix = max(24, _prefix_for(count, vpc.prefixlen))
+    if prefix > MAX_SUBNET_PREFIX:
+        raise ValueError(
+            f"{count} subnets per VPC do not fit in a /{vpc.prefixlen} "
+            f"at /{MAX_SUBNET_PREFIX} or larger"
+        )
+
+    cidrs = _blocks(int(vpc.network_address), prefix, count)
+    azs = [f"{spec.region}{chr(ord('a') + i)}" for i in range(spec.azs)]
+    subnets = []
+    for tier in spec.tiers:
+        for az in azs:
+            for n in range(spec.subnets_per_tier):
+                subnets.append({
+                    'name': f"{tier}-{az[-1]}-{n}",
+                    'cidr_block': cidrs[len(subnets)],
+                    'availability_zone': az,
+                    'public': tier == 'public',
+                })
+
+    data = {
+        'project_name': f"{spec.project_prefix}-{index:04d}",
+        'region': spec.region,
+        'vpc': {'cidr_block': vpc_cidr, 'subnets': subnets},
+        'enable_nat_gateway': 'public' in spec.tiers and len(spec.tiers) > 1,
+    }
+    if routes:
+        data['vpn'] = {
+            'enabled': True,
+            'customer_gateway': {
+                'ip_address': f"203.0.113.{index % 254 + 1}",
+                'bgp_asn': 65000 + index % 500,
+            },
+            'static_routes_only': True,
+            'static_routes': list(routes),
+        }
+    return data
+
+
+def inject_fault(data: dict, fault: str, rng: random.Random) -> None:
+    """Break a valid intent mapping in place with one of FAULTS."""
+    subnets = data['vpc']['subnets']
+    victim = subnets[rng.randrange(len(subnets))]
+
+    if fault == 'overlap':
+        if len(subnets) < 2:
+            subnets.append(dict(victim, name=f"{victim['name']}-dup"))
+        else:
+            other = rng.choice([s for s in subnets if s is not victim])
+            victim['cidr_block'] = other['cidr_block']
+    elif fault == 'outside_vpc':
+        victim['cidr_block'] = '198.51.100.0/24'
+    elif fault == 'bad_cidr':
+        victim['cidr_block'] = victim['cidr_block'].split('/')[0] + '/40'
+    elif fault == 'bad_az':
+        victim['availability_zone'] = 'bad'
+    elif fault == 'bad_route':
+        vpn = data.setdefault('vpn', {
+            'enabled': True,
+            'customer_gateway': {'ip_address': '203.0.113.1', 'bgp_asn': 65000},
+            'static_routes_only': True,
+            'static_routes': [],
+        })
+        vpn['static_routes'] = [*vpn['static_routes'], '192.168.0.0/33']
+    elif fault == 'vpn_without_cgw':
+        data['vpn'] = {'enabled': True, 'static_routes_only': False}
+    else:
+        raise ValueError(f"Unknown fault: {fault}")
+
+
+def generate_fleet(spec: Optional[SyntheticSpec] = None, **kwargs) -> list[SyntheticIntent]:
+    """
+    Generate a synthetic fleet.
+
+    Args:
+        spec: Fleet shape (or pass SyntheticSpec fields as keyword args)
+
+    Returns:
+        One SyntheticIntent per VPC, in a seed-determined order
+    """
+    spec = spec or SyntheticSpec(**kwargs)
+    rng = random.Random(spec.seed)
+    routes = static_routes(spec.static_routes)
+    other_faults = [f for f in FAULTS if f != 'overlap']
+
+    fleet = []
+    for index, vpc_cidr in enumerate(vpc_cidrs(spec.vpcs)):
+        data = generate_vpc(spec, index, vpc_cidr, routes)
+        faults = []
+        if rng.random() < spec.overlap_rate:
+            faults.append('overlap')
+        if rng.random() < spec.error_rate:
+            faults.append(rng.choice(other_faults))
+        for fault in faults:
+            inject_fault(data, fault, rng)
+        fleet.append(SyntheticIntent(data=data, faults=faults))
+    return fleet
+
+
+def generate_intent(spec: Optional[SyntheticSpec] = None, **kwargs) -> AWSNetworkIntent:
+    """Generate and validate a single synthetic intent (the first VPC of a fleet)."""
+    spec = spec or SyntheticSpec(**kwargs)
+    return generate_fleet(spec.model_copy(update={'vpcs': 1}))[0].to_intent()
+
+
+def write_fleet(fleet: list[SyntheticIntent], directory: Union[str, Path]) -> list[Path]:
+    """
+    Write each intent to ``<directory>/<project_name>.yaml``.
+
+    Files use the examples/ layout, so AWSNetworkIntent.from_yaml and
+    deploy.py --intent read them directly.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for synthetic in fleet:
+        path = directory / f"{synthetic.data['project_name']}.yaml"
+        with open(path, 'w') as f:
+            yaml.dump({'network': synthetic.data}, f, Dumper=_YAML_DUMPER, sort_keys=False)
+        paths.append(path)
+    return paths
+
+
+def _construct(data: dict) -> AWSNetworkIntent:
+    """Build an intent from trusted data without running validators."""
+    vpc = data['vpc']
+    vpn = data.get('vpn')
+    fields = {k: v for k, v in data.items() if k not in ('vpc', 'vpn')}
+    if vpn:
+        cgw = vpn.get('customer_gateway')
+        vpn = VPNIntent.model_construct(
+            **{k: v for k, v in vpn.items() if k != 'customer_gateway'},
+            customer_gateway=CustomerGatewayIntent.model_construct(**cgw) if cgw else None
+        )
+    return AWSNetworkIntent.model_construct(
+        **fields,
+        vpc=VPCIntent.model_construct(
+            cidr_block=vpc['cidr_block'],
+            subnets=[SubnetIntent.model_construct(**s) for s in vpc['subnets']]
+        ),
+        vpn=vpn
+    )
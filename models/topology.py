@@ -0,0 +1,463 @@
+"""
+Network topology model for architecture diagrams.
+
+A Topology is a backend-neutral graph of VPCs, subnets, gateways,
+instances and VPN links, built from a Pulumi state export or straight
+from an AWSNetworkIntent. Diagram renderers draw it; its content hash
+lets them skip unchanged renders.
+"""
+
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+if TYPE_CHECKING:
+    from models.aws_intent import AWSNetworkIntent
+
+# Pulumi resource type -> topology node kind
+RESOURCE_KINDS = {
+    'aws:ec2/vpc:Vpc': 'vpc',
+    'aws:ec2/subnet:Subnet': 'subnet',
+    'aws:ec2/routeTable:RouteTable': 'route_table',
+    'aws:ec2/internetGateway:InternetGateway': 'igw',
+    'aws:ec2/natGateway:NatGateway': 'nat',
+    'aws:ec2/vpnGateway:VpnGateway': 'vgw',
+    'aws:ec2/customerGateway:CustomerGateway': 'cgw',
+    'aws:ec2/instance:Instance': 'instance',
+    'aws:ec2transitgateway/transitGateway:TransitGateway': 'tgw',
+}
+
+# Route targets in route table outputs -> attribute holding the target ID
+ROUTE_TARGETS = ('gatewayId', 'natGatewayId', 'transitGatewayId', 'vpcPeeringConnectionId')
+
+# Collapse subnets into per-AZ/tier groups above this many per VPC
+DEFAULT_COLLAPSE_THRESHOLD = 12
+
+# Subnet tiers, from name keywords, in match order
+TIER_KEYWORDS = (
+    ('data', ('data', 'db', 'database')),
+    ('app', ('app', 'application')),
+    ('private', ('private',)),
+    ('public', ('public', 'dmz', 'web')),
+)
+
+
+class TopologyNode(BaseModel):
+    """A resource in the topology."""
+
+    id: str = Field(..., description="Cloud resource ID (or URN if not deployed)")
+    kind: str = Field(..., description="Node kind, e.g. vpc, subnet, igw")
+    label: str = Field(..., description="Display name")
+    parent: Optional[str] = Field(None, description="Containing node (VPC or subnet)")
+    attrs: Dict[str, str] = Field(default_factory=dict, description="CIDR, AZ, tier, ...")
+
+
+class TopologyEdge(BaseModel):
+    """A connection between two nodes."""
+
+    source: str
+    target: str
+    label: Optional[str] = None
+
+
+class Topology(BaseModel):
+    """Graph of network resources for one stack."""
+
+    name: str = Field(..., description="Stack or intent name")
+    nodes: List[TopologyNode] = Field(default_factory=list)
+    edges: List[TopologyEdge] = Field(default_factory=list)
+
+    # Lookup indexes, built once so tree walks stay linear in the node count
+    _by_id: Dict[str, TopologyNode] = PrivateAttr(default_factory=dict)
+    _children: Dict[Optional[str], List[TopologyNode]] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, context: Any) -> None:
+        """Index nodes by ID and by parent."""
+        for node in sorted(self.nodes, key=lambda n: (n.label, n.id)):
+            self._children.setdefault(node.parent, []).append(node)
+        for node in self.nodes:
+            self._by_id.setdefault(node.id, node)
+
+    def node(self, node_id: str) -> Optional[TopologyNode]:
+        """Look up a node by ID."""
+        return self._by_id.get(node_id)
+
+    def of_kind(self, *kinds: str) -> List[TopologyNode]:
+        """Nodes of the given kinds, in a stable order."""
+        return sorted((n for n in self.nodes if n.kind in kinds), key=lambda n: (n.label, n.id))
+
+    def children(self, parent_id: str, *kinds: str) -> List[TopologyNode]:
+        """Nodes contained in a parent, optionally filtered by kind."""
+        children = self._children.get(parent_id, [])
+        return [n for n in children if n.kind in kinds] if kinds else list(children)
+
+    def graph_hash(self) -> str:
+        """
+        Content hash of the graph.
+
+        Independent of node/edge order, so the same infrastructure always
+        hashes the same regardless of how the state was exported.
+        """
+        canonical = {
+            'name': self.name,
+            'nodes': sorted(
+                (n.model_dump() for n in self.nodes), key=lambda n: (n['kind'], n['id'])
+            ),
+            'edges': sorted(
+                (e.model_dump() for e in self.edges),
+                key=lambda e: (e['source'], e['target'], e['label'] or '')
+            ),
+        }
+        return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+    def collapse(self, threshold: int = DEFAULT_COLLAPSE_THRESHOLD) -> 'Topology':
+        """
+        Level-of-detail view: fold subnets into per-AZ, per-tier groups.
+
+        Only VPCs with more than ``threshold`` subnets are collapsed.
+        Instances inside folded subnets become counts on the group node;
+        NAT gateways stay visible. Edges are rewired to the groups.
+
+        Args:
+            threshold: Maximum subnets per VPC drawn individually
+
+        Returns:
+            A new, smaller Topology (or this one if nothing was folded)
+        """
+        subnets_by_vpc: Dict[str, List[TopologyNode]] = {}
+        for node in self.nodes:
+            if node.kind == 'subnet':
+                subnets_by_vpc.setdefault(node.parent, []).append(node)
+
+        mapping: Dict[str, str] = {}
+        groups: Dict[str, TopologyNode] = {}
+        for vpc_id, subnets in subnets_by_vpc.items():
+            if len(subnets) <= threshold:
+                continue
+            for subnet in subnets:
+                az, tier = subnet.attrs.get('az', ''), subnet.attrs.get('tier', '')
+                group_id = f"{vpc_id}/{az}/{tier}"
+                group = groups.setdefault(group_id, TopologyNode(
+                    id=group_id, kind='subnet_group', label=f"{tier} subnets",
+                    parent=vpc_id, attrs={'az': az, 'tier': tier, 'count': '0', 'instances': '0'}
+                ))
+                group.attrs['count'] = str(int(group.attrs['count']) + 1)
+                mapping[subnet.id] = group_id
+
+        if not groups:
+            return self
+
+        nodes = []
+        for node in self.nodes:
+            if node.id in mapping:
+                continue
+            group_id = mapping.get(node.parent)
+            if group_id and node.kind == 'instance':
+                group = groups[group_id]
+                group.attrs['instances'] = str(int(group.attrs['instances']) + 1)
+                mapping[node.id] = group_id
+                continue
+            if group_id:
+                node = node.model_copy(update={'parent': group_id})
+            nodes.append(node)
+
+        edges = []
+        for edge in self.edges:
+            source = mapping.get(edge.source, edge.source)
+            target = mapping.get(edge.target, edge.target)
+            if source != target:
+                edges.append(TopologyEdge(source=source, target=target, label=edge.label))
+
+        return Topology(
+            name=self.name,
+            nodes=nodes + sorted(groups.values(), key=lambda n: n.id),
+            edges=_dedupe(edges)
+        )
+
+    def focus(self, az: Optional[str] = None, tier: Optional[str] = None) -> 'Topology':
+        """
+        Drill-down view: only the subnets in one AZ and/or tier.
+
+        Gateways, route tables and on-prem nodes are kept for context;
+        other subnets and everything inside them are dropped.
+
+        Args:
+            az: Availability zone to keep (e.g. us-east-1a)
+            tier: Subnet tier to keep (e.g. private)
+
+        Returns:
+            A new Topology
+        """
+        dropped = {
+            n.id for n in self.nodes
+            if n.kind == 'subnet' and (
+                (az and n.attrs.get('az') != az) or (tier and n.attrs.get('tier') != tier)
+            )
+        }
+        nodes = []
+        for node in self.nodes:
+            if node.id in dropped or node.parent in dropped:
+                dropped.add(node.id)
+            else:
+                nodes.append(node)
+
+        return Topology(
+            name=self.name,
+            nodes=nodes,
+            edges=[e for e in self.edges if e.source not in dropped and e.target not in dropped]
+        )
+
+    @classmethod
+    def from_intent(cls, intent: 'AWSNetworkIntent', name: Optional[str] = None) -> 'Topology':
+        """
+        Build the planned topology for an intent, without deploying it.
+
+        Mirrors what the Pulumi program creates: an IGW and public route
+        table when any subnet is public, one NAT gateway (in the first
+        public subnet) with a private route table, and a VGW/CGW pair
+        with BGP propagation or static routes when the VPN is enabled.
+        With a Transit Gateway, the VPN terminates on the TGW instead and
+        every spoke VPC is drawn with its attachment and route table; ECMP
+        VPN edges are labelled with their connection count.
+        Node IDs are derived from intent names since nothing exists yet.
+
+        Args:
+            intent: Validated network intent
+            name: Topology name (default: the intent's project name)
+
+        Returns:
+            Topology of the intended network
+        """
+        nodes: List[TopologyNode] = []
+        edges: List[TopologyEdge] = []
+        vpc_id = f"vpc:{intent.project_name}"
+        nodes.append(TopologyNode(
+            id=vpc_id, kind='vpc', label=f"{intent.project_name}-{intent.environment}",
+            attrs={'cidr': intent.vpc.cidr_block}
+        ))
+
+        public, private = [], []
+        for subnet in intent.vpc.subnets:
+            subnet_id = f"subnet:{subnet.name}"
+            (public if subnet.public else private).append(subnet_id)
+            nodes.append(TopologyNode(
+                id=subnet_id, kind='subnet', label=subnet.name, parent=vpc_id,
+                attrs={
+                    'cidr': subnet.cidr_block,
+                    'az': subnet.availability_zone,
+                    'tier': subnet_tier(subnet.name, subnet.public),
+                }
+            ))
+
+        route_tables = []
+        if public:
+            nodes.append(TopologyNode(id='igw', kind='igw', label='internet-gateway', parent=vpc_id))
+            nodes.append(TopologyNode(
+                id='rtb:public', kind='route_table', label='public-rt', parent=vpc_id
+            ))
+            edges.append(TopologyEdge(source='rtb:public', target='igw', label='0.0.0.0/0'))
+            edges.extend(TopologyEdge(source='rtb:public', target=s) for s in public)
+            route_tables.append('rtb:public')
+
+        if private and intent.enable_nat_gateway and public:
+            nodes.append(TopologyNode(id='nat', kind='nat', label='nat-gateway', parent=public[0]))
+            nodes.append(TopologyNode(
+                id='rtb:private', kind='route_table', label='private-rt', parent=vpc_id
+            ))
+            edges.append(TopologyEdge(source='rtb:private', target='nat', label='0.0.0.0/0'))
+            edges.extend(TopologyEdge(source='rtb:private', target=s) for s in private)
+            route_tables.append('rtb:private')
+
+        vpn_gateway = 'vgw'
+        if intent.transit_gateway_enabled:
+            tgw = intent.transit_gateway
+            vpn_gateway = 'tgw'
+            nodes.append(TopologyNode(
+                id='tgw', kind='tgw', label='transit-gateway',
+                attrs={'amazon_asn': str(tgw.amazon_side_asn or 64512)}
+            ))
+            edges.append(TopologyEdge(source='tgw', target=vpc_id, label='attachment'))
+            edges.extend(
+                TopologyEdge(source=route_table, target='tgw', label=cidr)
+                for route_table in route_tables for cidr in tgw.vpc_routes
+            )
+            for spoke in tgw.spokes:
+                spoke_id = f"vpc:{spoke.name}"
+                spoke_rtb = f"rtb:{spoke.name}"
+                nodes.append(TopologyNode(
+                    id=spoke_id, kind='vpc', label=spoke.name, attrs={'cidr': spoke.cidr_block}
+                ))
+                nodes.append(TopologyNode(
+                    id=spoke_rtb, kind='route_table', label=f"{spoke.name}-rt", parent=spoke_id
+                ))
+                for subnet in spoke.subnets:
+                    subnet_id = f"subnet:{spoke.name}/{subnet.name}"
+                    nodes.append(TopologyNode(
+                        id=subnet_id, kind='subnet', label=subnet.name, parent=spoke_id,
+                        attrs={
+                            'cidr': subnet.cidr_block,
+                            'az': subnet.availability_zone,
+                            'tier': subnet_tier(subnet.name, subnet.public),
+                        }
+                    ))
+                    edges.append(TopologyEdge(source=spoke_rtb, target=subnet_id))
+                edges.append(TopologyEdge(source='tgw', target=spoke_id, label='attachment'))
+                edges.extend(
+                    TopologyEdge(source=spoke_rtb, target='tgw', label=cidr)
+                    for cidr in tgw.vpc_routes
+                )
+            # VPCs route to the TGW directly; VPN routes live in TGW route tables
+            route_tables = []
+
+        vpn = intent.vpn
+        if vpn and vpn.enabled and vpn.customer_gateway:
+            if vpn_gateway == 'vgw':
+                nodes.append(TopologyNode(
+                    id='vgw', kind='vgw', label='vpn-gateway', parent=vpc_id,
+                    attrs={'amazon_asn': str(vpn.amazon_side_asn or 64512)}
+                ))
+            # Connections are spread round-robin over the customer gateways
+            gateways = vpn.customer_gateways
+            for i, cgw in enumerate(gateways):
+                cgw_id = f"cgw:{i}" if i else 'cgw'
+                nodes.append(TopologyNode(
+                    id=cgw_id, kind='cgw', label=cgw.device_name or 'customer-gateway',
+                    attrs={'ip': cgw.ip_address, 'bgp_asn': str(cgw.bgp_asn)}
+                ))
+                connections = len(range(i, vpn.connection_count, len(gateways)))
+                label = f"IPsec VPN x{connections} (ECMP)" if vpn.ecmp else 'IPsec VPN'
+                edges.append(TopologyEdge(source=vpn_gateway, target=cgw_id, label=label))
+            for route_table in route_tables:
+                if vpn.static_routes_only:
+                    edges.extend(
+                        TopologyEdge(source=route_table, target='vgw', label=cidr)
+                        for cidr in vpn.static_routes
+                    )
+                else:
+                    edges.append(TopologyEdge(source='vgw', target=route_table, label='propagation'))
+
+        return cls(name=name or intent.project_name, nodes=nodes, edges=_dedupe(edges))
+
+    @classmethod
+    def from_state_export(cls, state: dict, name: str = 'stack') -> 'Topology':
+        """
+        Build the topology from a `pulumi stack export` document.
+
+        Args:
+            state: Parsed output of `pulumi stack export`
+            name: Topology name (usually the stack name)
+
+        Returns:
+            Topology with every VPC, subnet, route table, gateway,
+            instance and VPN connection in the state
+        """
+        resources = state.get('deployment', {}).get('resources') or []
+        nodes: Dict[str, TopologyNode] = {}
+        edges: List[TopologyEdge] = []
+
+        def rid(resource: dict) -> str:
+            return (resource.get('outputs') or {}).get('id') or resource.get('id') or resource['urn']
+
+        for resource in resources:
+            kind = RESOURCE_KINDS.get(resource.get('type'))
+            if not kind:
+                continue
+            out = resource.get('outputs') or resource.get('inputs') or {}
+            tags = out.get('tags') or {}
+            node_id = rid(resource)
+            label = tags.get('Name') or resource['urn'].rsplit('::', 1)[-1]
+            attrs: Dict[str, str] = {}
+            parent = None
+
+            if kind == 'vpc':
+                attrs['cidr'] = out.get('cidrBlock', '')
+            elif kind == 'subnet':
+                parent = out.get('vpcId')
+                attrs['cidr'] = out.get('cidrBlock', '')
+                attrs['az'] = out.get('availabilityZone', '')
+                attrs['tier'] = subnet_tier(label, bool(out.get('mapPublicIpOnLaunch')), tags)
+            elif kind in ('route_table', 'igw', 'vgw'):
+                parent = out.get('vpcId')
+            elif kind == 'nat':
+                parent = out.get('subnetId')
+            elif kind == 'instance':
+                parent = out.get('subnetId')
+                attrs['private_ip'] = out.get('privateIp', '')
+                attrs['instance_type'] = out.get('instanceType', '')
+            elif kind == 'cgw':
+                attrs['ip'] = out.get('ipAddress', '')
+                attrs['bgp_asn'] = str(out.get('bgpAsn', ''))
+
+            if kind == 'route_table':
+                for route in out.get('routes') or []:
+                    target = next((route[k] for k in ROUTE_TARGETS if route.get(k)), None)
+                    if target and target != 'local':
+                        edges.append(TopologyEdge(
+                            source=node_id, target=target, label=route.get('cidrBlock')
+                        ))
+
+            nodes[node_id] = TopologyNode(
+                id=node_id, kind=kind, label=label, parent=parent, attrs=attrs
+            )
+
+        # Relationship-only resources
+        for resource in resources:
+            rtype = resource.get('type')
+            out = resource.get('outputs') or resource.get('inputs') or {}
+            if rtype == 'aws:ec2/routeTableAssociation:RouteTableAssociation' and out.get('subnetId'):
+                edges.append(TopologyEdge(source=out['routeTableId'], target=out['subnetId']))
+            elif rtype == 'aws:ec2/route:Route':
+                target = next((out[k] for k in ROUTE_TARGETS if out.get(k)), None)
+                if target:
+                    edges.append(TopologyEdge(
+                        source=out['routeTableId'], target=target,
+                        label=out.get('destinationCidrBlock')
+                    ))
+            elif rtype == 'aws:ec2/vpnConnection:VpnConnection':
+                gateway = out.get('vpnGatewayId') or out.get('transitGatewayId')
+                if gateway and out.get('customerGatewayId'):
+                    edges.append(TopologyEdge(
+                        source=gateway, target=out['customerGatewayId'], label='IPsec VPN'
+                    ))
+            elif rtype == 'aws:ec2/vpnGatewayRoutePropagation:VpnGatewayRoutePropagation':
+                edges.append(TopologyEdge(
+                    source=out['vpnGatewayId'], target=out['routeTableId'], label='propagation'
+                ))
+            elif rtype == 'aws:ec2transitgateway/vpcAttachment:VpcAttachment':
+                edges.append(TopologyEdge(
+                    source=out['transitGatewayId'], target=out['vpcId'], label='attachment'
+                ))
+
+        # Drop edges to resources outside the model (e.g. deleted gateways)
+        edges = [e for e in edges if e.source in nodes and e.target in nodes]
+        return cls(name=name, nodes=list(nodes.values()), edges=_dedupe(edges))
+
+
+def subnet_tier(name: str, public: bool, tags: Optional[dict] = None) -> str:
+    """
+    Classify a subnet as public, private, app or data.
+
+    Uses a ``Tier`` tag when present, then keywords in the name, then
+    whether instances get public IPs.
+    """
+    if tags and tags.get('Tier'):
+        return tags['Tier'].lower()
+    lowered = name.lower()
+    for tier, keywords in TIER_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return tier
+    return 'public' if public else 'private'
+
+
+def _dedupe(edges: Iterable[TopologyEdge]) -> List[TopologyEdge]:
+    """Remove duplicate edges, keeping the first occurrence."""
+    seen = set()
+    unique = []
+    for edge in edges:
+        key = (edge.source, edge.target, edge.label)
+        if key not in seen:
+            seen.add(key)
+            unique.append(edge)
+    return unique
@@ -24,6 +24,9 @@ Scaling Path:
 - Solution 1C: Add private subnets + RDS (~$250/mo)
 """
 
+import ipaddress
+from itertools import islice
+
 import pulumi
 import pulumi_aws as aws
 from typing import Dict, Any
@@ -32,8 +35,21 @@ import yaml
 
 # Import our modules
 from vpc import create_vpc, enable_vpc_flow_logs
-from networking import create_subnets, create_internet_gateway, create_route_tables
-from vpn import create_vpn_gateway, create_customer_gateway, create_vpn_connection
+from networking import (
+    create_subnets,
+    create_internet_gateway,
+    create_nat_gateway,
+    create_route,
+    create_route_tables,
+)
+from vpn import (
+    create_customer_gateway,
+    create_ecmp_vpn_connections,
+    create_hub_and_spoke,
+    create_transit_gateway,
+    create_vpn_connection,
+    create_vpn_gateway,
+)
 
 # Configuration
 config = pulumi.Config()
@@ -43,9 +59,17 @@ aws_config = pulumi.Config("aws")
 vpc_cidr = config.get("vpc_cidr") or "10.0.0.0/16"
 enable_vpn = config.get_bool("enable_vpn") or False
 enable_flow_logs = config.get_bool("enable_flow_logs") or False
+enable_nat_gateway = config.get_bool("enable_nat_gateway") or False
+private_subnet_count = config.get_int("private_subnet_count") or 0
+enable_transit_gateway = config.get_bool("enable_transit_gateway") or False
+vpn_connection_count = config.get_int("vpn_connection_count") or 1
 project_name = pulumi.get_project()
 stack_name = pulumi.get_stack()
 
+# Hub attachment name of the project VPC (spokes may not use it; matches
+# models.aws_intent.PROJECT_VPC_NAME)
+PROJECT_VPC_NAME = "project"
+
 # Tags for all resources
 common_tags = {
     "Project": project_name,
@@ -156,6 +180,123 @@ public_rt_assoc_b = aws.ec2.RouteTableAssociation(
     route_table_id=public_route_table.id
 )
 
+# ==========================================
+# Private Subnets (Optional)
+# ==========================================
+
+# Spread across the three AZs, carved from the VPC CIDR after the first
+# sixteen /24s (which are left for the public tier)
+private_subnets = []
+private_route_table = None
+
+if private_subnet_count:
+    private_cidrs = [
+        str(cidr) for cidr in islice(
+            ipaddress.ip_network(vpc_cidr).subnets(new_prefix=24), 16, 16 + private_subnet_count
+        )
+    ]
+    if len(private_cidrs) < private_subnet_count:
+        raise ValueError(
+            f"private_subnet_count {private_subnet_count} does not fit in {vpc_cidr} "
+            f"(room for {len(private_cidrs)} /24s after the public tier)"
+        )
+    private_subnets = create_subnets(
+        name_prefix=f"{project_name}-private",
+        vpc_id=vpc.id,
+        cidr_blocks=private_cidrs,
+        availability_zones=[f"us-east-1{'abc'[i % 3]}" for i in range(private_subnet_count)],
+        public=False,
+        tags=common_tags
+    )
+
+    private_route_table = create_route_tables(
+        name_prefix=f"{project_name}-private-rt",
+        vpc_id=vpc.id,
+        tags=common_tags
+    )[0]
+
+    for i, subnet in enumerate(private_subnets):
+        aws.ec2.RouteTableAssociation(
+            f"{project_name}-private-rt-assoc-{i}",
+            subnet_id=subnet.id,
+            route_table_id=private_route_table.id
+        )
+
+# The NAT gateway lives in the public tier, so it is created even without
+# private subnets to route through it
+if enable_nat_gateway:
+    nat_gateway = create_nat_gateway(
+        name=f"{project_name}-nat",
+        subnet_id=public_subnet_a.id,
+        tags=common_tags
+    )
+    if private_route_table:
+        create_route(
+            name=f"{project_name}-private-nat-route",
+            route_table_id=private_route_table.id,
+            destination_cidr_block="0.0.0.0/0",
+            nat_gateway_id=nat_gateway.id
+        )
+
+# ==========================================
+# Transit Gateway (Optional)
+# ==========================================
+
+# Hub for the project VPC, any spoke VPCs and the VPN: one set of tunnels
+# and TGW route tables shared by every VPC instead of a VGW per VPC
+transit_gateway = None
+spoke_vpcs = {}
+
+if enable_transit_gateway:
+    pulumi.log.info(f"Enabling Transit Gateway for {project_name}")
+
+    transit_gateway = create_transit_gateway(
+        name=f"{project_name}-tgw",
+        amazon_side_asn=config.get_int("transit_gateway_asn"),
+        vpn_ecmp_support=config.get_bool("transit_gateway_vpn_ecmp") is not False,
+        tags={**common_tags, "Name": f"{project_name}-tgw-{stack_name}"}
+    )
+
+    # Spoke VPCs (name, CIDR and subnets from the intent); each gets one
+    # route table sending the TGW routes to the hub
+    for spoke in config.get_object("transit_gateway_spokes") or []:
+        if spoke["name"] == PROJECT_VPC_NAME:
+            raise ValueError(f"Spoke name '{PROJECT_VPC_NAME}' is reserved for the project VPC")
+        spoke_name = f"{project_name}-{spoke['name']}"
+        spoke_vpc = create_vpc(
+            name=f"{spoke_name}-vpc",
+            cidr_block=spoke["cidr_block"],
+            enable_dns_hostnames=spoke.get("enable_dns_hostnames", True),
+            enable_dns_support=spoke.get("enable_dns_support", True),
+            tags={**common_tags, "Name": f"{spoke_name}-vpc-{stack_name}"}
+        )
+        spoke_subnets = create_subnets(
+            name_prefix=f"{spoke_name}-subnet",
+            vpc_id=spoke_vpc.id,
+            cidr_blocks=[subnet["cidr_block"] for subnet in spoke["subnets"]],
+            availability_zones=[subnet["availability_zone"] for subnet in spoke["subnets"]],
+            tags=common_tags
+        )
+        spoke_route_table = create_route_tables(
+            name_prefix=f"{spoke_name}-rt",
+            vpc_id=spoke_vpc.id,
+            tags=common_tags
+        )[0]
+        for i, subnet in enumerate(spoke_subnets):
+            aws.ec2.RouteTableAssociation(
+                f"{spoke_name}-rt-assoc-{i}",
+                subnet_id=subnet.id,
+                route_table_id=spoke_route_table.id
+            )
+
+        # The attachment takes one subnet per AZ
+        attachment_subnets = {}
+        for subnet, intent in zip(spoke_subnets, spoke["subnets"]):
+            attachment_subnets.setdefault(intent["availability_zone"], subnet.id)
+        spoke_vpcs[spoke["name"]] = (
+            spoke_vpc, list(attachment_subnets.values()), [spoke_route_table]
+        )
+
 # ==========================================
 # VPN Gateway (Optional)
 # ==========================================
@@ -163,16 +304,18 @@ public_rt_assoc_b = aws.ec2.RouteTableAssociation(
 vpn_gateway = None
 customer_gateway = None
 vpn_connection = None
+vpn_connections = []
 
 if enable_vpn:
-    pulumi.log.info(f"Enabling VPN Gateway for {project_name}-vpc")
-
-    # VPN Gateway
-    vpn_gateway = create_vpn_gateway(
-        name=f"{project_name}-vgw",
-        vpc_id=vpc.id,
-        tags={**common_tags, "Name": f"{project_name}-vgw-{stack_name}"}
-    )
+    pulumi.log.info(f"Enabling VPN for {project_name}-vpc")
+
+    # VPN Gateway (the VPN terminates on the Transit Gateway instead, if enabled)
+    if not transit_gateway:
+        vpn_gateway = create_vpn_gateway(
+            name=f"{project_name}-vgw",
+            vpc_id=vpc.id,
+            tags={**common_tags, "Name": f"{project_name}-vgw-{stack_name}"}
+        )
 
     # Customer Gateway (on-prem side)
     # Note: Replace with your actual public IP
@@ -186,23 +329,84 @@ if enable_vpn:
         tags={**common_tags, "Name": f"{project_name}-cgw-{stack_name}"}
     )
 
-    # VPN Connection
-    vpn_connection = create_vpn_connection(
-        name=f"{project_name}-vpn",
-        vpn_gateway_id=vpn_gateway.id,
-        customer_gateway_id=customer_gateway.id,
-        type="ipsec.1",
-        static_routes_only=False,  # Use BGP
-        tags={**common_tags, "Name": f"{project_name}-vpn-{stack_name}"}
-    )
+    # More on-prem devices to spread ECMP connections over
+    customer_gateways = [customer_gateway]
+    for i, cgw in enumerate(config.get_object("vpn_additional_customer_gateways") or [], 1):
+        customer_gateways.append(create_customer_gateway(
+            name=f"{project_name}-cgw-{i}",
+            ip_address=cgw["ip_address"],
+            bgp_asn=cgw["bgp_asn"],
+            device_name=cgw.get("device_name"),
+            tags={**common_tags, "Name": f"{project_name}-cgw-{i}-{stack_name}"}
+        ))
+
+    # VPN Connection(s): on a Transit Gateway, enough parallel BGP
+    # connections for the requested bandwidth, load-shared with ECMP
+    if transit_gateway:
+        vpn_connections = create_ecmp_vpn_connections(
+            name=f"{project_name}-vpn",
+            transit_gateway_id=transit_gateway.id,
+            customer_gateway_ids=[cgw.id for cgw in customer_gateways],
+            connection_count=vpn_connection_count,
+            tags=common_tags
+        )
+    else:
+        vpn_connections = [create_vpn_connection(
+            name=f"{project_name}-vpn",
+            vpn_gateway_id=vpn_gateway.id,
+            customer_gateway_id=customer_gateway.id,
+            type="ipsec.1",
+            static_routes_only=False,  # Use BGP
+            tags={**common_tags, "Name": f"{project_name}-vpn-{stack_name}"}
+        )]
+    vpn_connection = vpn_connections[0]
 
     # Enable route propagation for VPN
-    vpn_route_propagation = aws.ec2.VpnGatewayRoutePropagation(
-        f"{project_name}-vpn-route-propagation",
-        vpn_gateway_id=vpn_gateway.id,
-        route_table_id=public_route_table.id
+    if vpn_gateway:
+        vpn_route_propagation = aws.ec2.VpnGatewayRoutePropagation(
+            f"{project_name}-vpn-route-propagation",
+            vpn_gateway_id=vpn_gateway.id,
+            route_table_id=public_route_table.id
+        )
+
+# ==========================================
+# Hub-and-Spoke Routing (Transit Gateway)
+# ==========================================
+
+hub = None
+
+if transit_gateway:
+    project_route_tables = [public_route_table]
+    if private_route_table:
+        project_route_tables.append(private_route_table)
+    project_subnet_ids = [public_subnet_a.id, public_subnet_b.id, public_subnet_c.id]
+    hub_vpcs = {PROJECT_VPC_NAME: (vpc, project_subnet_ids, project_route_tables), **spoke_vpcs}
+
+    hub = create_hub_and_spoke(
+        name=f"{project_name}-hub",
+        transit_gateway_id=transit_gateway.id,
+        vpcs={
+            name: (hub_vpc.id, subnet_ids) for name, (hub_vpc, subnet_ids, _) in hub_vpcs.items()
+        },
+        vpn_attachment_ids=[c.transit_gateway_attachment_id for c in vpn_connections],
+        isolate_spokes=config.get_bool("transit_gateway_isolate_spokes") or False,
+        tags=common_tags
     )
 
+    # A fixed set of summary routes per VPC route table (not one per VPC),
+    # so route tables stay within quota however many VPCs attach
+    vpc_routes = config.get_object("transit_gateway_vpc_routes") or ["10.0.0.0/8"]
+    for name, (hub_vpc, _, route_tables) in hub_vpcs.items():
+        for i, route_table in enumerate(route_tables):
+            for j, destination in enumerate(vpc_routes):
+                create_route(
+                    name=f"{project_name}-{name}-tgw-route-{i}-{j}",
+                    route_table_id=route_table.id,
+                    destination_cidr_block=destination,
+                    transit_gateway_id=transit_gateway.id,
+                    opts=pulumi.ResourceOptions(depends_on=[hub["attachments"][name]])
+                )
+
 # ==========================================
 # Security Groups
 # ==========================================
@@ -414,6 +618,8 @@ pulumi.export("public_subnet_c_id", public_subnet_c.id)
 pulumi.export("public_subnet_c_cidr", public_subnet_c.cidr_block)
 pulumi.export("public_subnet_c_az", public_subnet_c.availability_zone)
 
+pulumi.export("private_subnet_ids", [subnet.id for subnet in private_subnets])
+
 # Gateway information
 pulumi.export("internet_gateway_id", igw.id)
 
@@ -446,12 +652,24 @@ if enable_vpn and customer_gateway:
 if enable_vpn and vpn_connection:
     pulumi.export("vpn_connection_id", vpn_connection.id)
     pulumi.export("vpn_connection_type", vpn_connection.type)
+    pulumi.export("vpn_connection_ids", [c.id for c in vpn_connections])
     # Note: VPN configuration details available via CLI: pulumi stack output --show-secrets
 
+# Transit Gateway information (if enabled)
+if transit_gateway:
+    pulumi.export("transit_gateway_id", transit_gateway.id)
+    pulumi.export("transit_gateway_route_table_ids", {
+        role: route_table.id for role, route_table in hub["route_tables"].items()
+    })
+    pulumi.export("spoke_vpc_ids", {
+        name: spoke_vpc.id for name, (spoke_vpc, _, _) in spoke_vpcs.items()
+    })
+
 # Summary message
 summary_parts = [
     f"✓ VPC deployed successfully in {stack_name} environment.",
     f"VPN {'enabled' if enable_vpn else 'disabled'}.",
+    f"Transit Gateway {'enabled' if enable_transit_gateway else 'disabled'}.",
     f"Flow logs {'enabled' if enable_flow_logs else 'disabled'}.",
     f"Web server {'enabled' if enable_web_server else 'disabled'}."
 ]
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Deploy-scaling benchmark against LocalStack.
+
+Deploys a matrix of configurations (private subnets x NAT x VPN x flow
+logs), one throwaway stack per case, and records how long the initial
+``pulumi up``, a no-op ``pulumi up`` and the ``pulumi destroy`` take along
+with the number of resources. Results go to a CSV file, a summary with the
+fitted scaling exponent per feature combination, and optional plots.
+
+An exponent well above 1 (time growing faster than resource count) points
+at superlinear behaviour in the program or its modules.
+"""
+
+import csv
+import ipaddress
+import math
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from itertools import product
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from deploy import (
+    PROJECT_NAME,
+    PULUMI_DIR,
+    STATE_DIR,
+    _pulumi_json,
+    check_localstack_health,
+    set_stack_config,
+)
+
+BENCHMARK_DIR = STATE_DIR / 'benchmarks'
+
+# Exponent of time vs resource count above which growth is flagged
+SUPERLINEAR_EXPONENT = 1.2
+
+# Pulumi bookkeeping resources, not counted
+INTERNAL_TYPES = ('pulumi:pulumi:Stack', 'pulumi:providers:')
+
+TOGGLES = {'off': (False,), 'on': (True,), 'both': (False, True)}
+
+# __main__.py's VPC default, and the /24s it leaves for the public tier
+# before carving private subnets
+DEFAULT_VPC_CIDR = '10.0.0.0/16'
+PUBLIC_SUBNET_SLOTS = 16
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """One point of the configuration matrix."""
+    private_subnets: int
+    nat: bool
+    vpn: bool
+    flow_logs: bool
+
+    @property
+    def features(self) -> str:
+        """Feature combination label, e.g. "nat+vpn" or "base"."""
+        enabled = [name for name in ('nat', 'vpn', 'flow_logs') if getattr(self, name)]
+        return '+'.join(enabled) or 'base'
+
+    @property
+    def name(self) -> str:
+        return f"{self.private_subnets}-{self.features.replace('+', '-').replace('_', '')}"
+
+    def config(self) -> Dict[str, object]:
+        """Stack config for this case (keys read by __main__.py)."""
+        return {
+            'private_subnet_count': self.private_subnets,
+            'enable_nat_gateway': self.nat,
+            'enable_vpn': self.vpn,
+            'enable_flow_logs': self.flow_logs,
+        }
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings and resource count for one case."""
+    private_subnets: int
+    nat: bool
+    vpn: bool
+    flow_logs: bool
+    resources: int = 0
+    deploy_seconds: Optional[float] = None
+    update_seconds: Optional[float] = None
+    destroy_seconds: Optional[float] = None
+    error: str = ''
+
+    @property
+    def case(self) -> BenchmarkCase:
+        return BenchmarkCase(self.private_subnets, self.nat, self.vpn, self.flow_logs)
+
+
+def build_matrix(
+    subnet_counts: List[int],
+    nat: Tuple[bool, ...] = (False, True),
+    vpn: Tuple[bool, ...] = (False, True),
+    flow_logs: Tuple[bool, ...] = (False, True)
+) -> List[BenchmarkCase]:
+    """Every combination of subnet count and feature toggles."""
+    return [BenchmarkCase(*values) for values in product(subnet_counts, nat, vpn, flow_logs)]
+
+
+def max_private_subnets(vpc_cidr: str) -> int:
+    """Private /24 subnets __main__.py can carve from a VPC CIDR."""
+    prefix = ipaddress.ip_network(vpc_cidr).prefixlen
+    return max(0, 2 ** (24 - prefix) - PUBLIC_SUBNET_SLOTS) if prefix <= 24 else 0
+
+
+def stack_vpc_cidr(stack_name: str) -> str:
+    """VPC CIDR configured on a stack, or the program default."""
+    config = _pulumi_json(['config', '--json', '--stack', stack_name], PULUMI_DIR) or {}
+    return config.get(f'{PROJECT_NAME}:vpc_cidr', {}).get('value') or DEFAULT_VPC_CIDR
+
+
+def count_resources(stack_name: str) -> int:
+    """Number of cloud resources in a stack's state."""
+    state = _pulumi_json(['stack', 'export', '--stack', stack_name], PULUMI_DIR) or {}
+    resources = state.get('deployment', {}).get('resources') or []
+    return sum(1 for r in resources if not r.get('type', '').startswith(INTERNAL_TYPES))
+
+
+def prepare_stack(stack_name: str, base_stack: str = 'local') -> bool:
+    """Create a benchmark stack with the base stack's (LocalStack) config."""
+    subprocess.run(['pulumi', 'stack', 'init', stack_name], cwd=PULUMI_DIR, capture_output=True)
+    try:
+        subprocess.run(
+            ['pulumi', 'config', 'cp', '--stack', base_stack, '--dest', stack_name],
+            cwd=PULUMI_DIR,
+            check=True
+        )
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Could not copy config to {stack_name}: {e}")
+        return False
+
+
+def remove_stack(stack_name: str) -> None:
+    """Delete a benchmark stack and its config."""
+    subprocess.run(
+        ['pulumi', 'stack', 'rm', stack_name, '--yes', '--force'],
+        cwd=PULUMI_DIR,
+        capture_output=True
+    )
+
+
+def run_pulumi(operation: str, stack_name: str) -> bool:
+    """
+    Run ``pulumi up`` or ``pulumi destroy`` without a preview or prompt.
+
+    Called directly rather than through deploy.py so the timing covers the
+    operation only, not stack selection, previews or output caching.
+    """
+    result = subprocess.run(
+        ['pulumi', operation, '--yes', '--skip-preview', '--stack', stack_name],
+        cwd=PULUMI_DIR
+    )
+    return result.returncode == 0
+
+
+def _timed(action: Callable[[], bool]) -> Tuple[bool, float]:
+    started = time.perf_counter()
+    ok = action()
+    return ok, time.perf_counter() - started
+
+
+def run_case(case: BenchmarkCase, base_stack: str = 'local', keep_stack: bool = False) -> BenchmarkResult:
+    """
+    Deploy, re-deploy (no-op) and destroy one case on its own stack.
+
+    Args:
+        case: Configuration to benchmark
+        base_stack: Stack whose config points at LocalStack
+        keep_stack: Leave the (destroyed) stack behind for inspection
+
+    Returns:
+        BenchmarkResult; ``error`` names the step that failed, if any
+    """
+    stack = f"{base_stack}-bench-{case.name}"
+    result = BenchmarkResult(**asdict(case))
+    print(f"\n⏱️  Benchmark {stack}")
+
+    if not (prepare_stack(stack, base_stack) and set_stack_config(stack, case.config())):
+        result.error = 'setup'
+        return result
+
+    try:
+        ok, result.deploy_seconds = _timed(lambda: run_pulumi('up', stack))
+        if not ok:
+            result.error = 'deploy'
+        else:
+            result.resources = count_resources(stack)
+            ok, result.update_seconds = _timed(lambda: run_pulumi('up', stack))
+            if not ok:
+                result.error = 'update'
+
+        ok, result.destroy_seconds = _timed(lambda: run_pulumi('destroy', stack))
+        if not ok and not result.error:
+            result.error = 'destroy'
+    finally:
+        if not keep_stack:
+            remove_stack(stack)
+    return result
+
+
+def write_csv(results: List[BenchmarkResult], path: Path) -> Path:
+    """Write results as CSV, one row per case."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=[field.name for field in fields(BenchmarkResult)])
+        writer.writeheader()
+        for result in results:
+            writer.writerow(asdict(result))
+    return path
+
+
+def scaling_exponent(points: List[Tuple[float, float]]) -> Optional[float]:
+    """
+    Least-squares slope of log(seconds) against log(resources).
+
+    1.0 means time grows linearly with resource count; clearly above 1
+    means superlinear growth.
+    """
+    logs = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y and y > 0]
+    if len({x for x, _ in logs}) < 2:
+        return None
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    spread = sum((x - mean_x) ** 2 for x, _ in logs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in logs) / spread
+
+
+def summarize(results: List[BenchmarkResult]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Scaling exponent per feature combination and phase."""
+    by_features: Dict[str, List[BenchmarkResult]] = {}
+    for result in results:
+        if not result.error:
+            by_features.setdefault(result.case.features, []).append(result)
+
+    return {
+        features: {
+            phase: scaling_exponent([(r.resources, getattr(r, f'{phase}_seconds')) for r in group])
+            for phase in ('deploy', 'update', 'destroy')
+        }
+        for features, group in sorted(by_features.items())
+    }
+
+
+def print_summary(results: List[BenchmarkResult]) -> None:
+    """Print per-case timings and scaling exponents."""
+    def seconds(value):
+        return f"{value:8.1f}s" if value is not None else f"{'-':>9}"
+
+    print("\n📊 Deploy scaling")
+    print(f"  {'case':<28} {'resources':>9} {'deploy':>9} {'no-op':>9} {'destroy':>9}")
+    for r in results:
+        status = f"  ❌ {r.error}" if r.error else ''
+        print(f"  {r.case.name:<28} {r.resources:>9} {seconds(r.deploy_seconds)} "
+              f"{seconds(r.update_seconds)} {seconds(r.destroy_seconds)}{status}")
+
+    print("\n📈 Scaling exponent (time ~ resources^k)")
+    for features, exponents in summarize(results).items():
+        cells = []
+        for phase, k in exponents.items():
+            flag = ' ⚠️' if k is not None and k > SUPERLINEAR_EXPONENT else ''
+            cells.append(f"{phase} {k:.2f}{flag}" if k is not None else f"{phase} -")
+        print(f"  {features:<20} {', '.join(cells)}")
+
+
+def plot_results(results: List[BenchmarkResult], path: Path) -> Optional[Path]:
+    """
+    Plot each phase's duration against resource count, per feature combination.
+
+    Requires matplotlib; returns None if it is not installed.
+    """
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️  matplotlib not installed - skipping plots (pip install matplotlib)")
+        return None
+
+    phases = ('deploy', 'update', 'destroy')
+    figure, axes = plt.subplots(1, len(phases), figsize=(15, 4.5))
+    for axis, phase in zip(axes, phases):
+        groups: Dict[str, List[BenchmarkResult]] = {}
+        for result in results:
+            if getattr(result, f'{phase}_seconds') is not None and result.resources:
+                groups.setdefault(result.case.features, []).append(result)
+        for features, group in sorted(groups.items()):
+            group.sort(key=lambda r: r.resources)
+            axis.plot(
+                [r.resources for r in group],
+                [getattr(r, f'{phase}_seconds') for r in group],
+                marker='o', label=features
+            )
+        axis.set_title('no-op update' if phase == 'update' else phase)
+        axis.set_xlabel('resources')
+        axis.set_ylabel('seconds')
+        axis.grid(True, alpha=0.3)
+    axes[0].legend(fontsize=8)
+    figure.tight_layout()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    figure.savefig(path)
+    plt.close(figure)
+    return path
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark deploy time scaling on LocalStack')
+    parser.add_argument(
+        '--subnets',
+        type=int,
+        nargs='+',
+        default=[0, 8, 32, 64],
+        help='Private subnet counts to deploy (default: 0 8 32 64)'
+    )
+    for toggle in ('nat', 'vpn', 'flow-logs'):
+        parser.add_argument(
+            f'--{toggle}',
+            choices=list(TOGGLES),
+            default='both',
+            help=f'Benchmark with {toggle.replace("-", " ")} off, on or both (default: both)'
+        )
+    parser.add_argument('--base-stack', default='local', help='Stack whose LocalStack config is copied')
+    parser.add_argument('--output-dir', type=Path, default=BENCHMARK_DIR, help='Where to write results')
+    parser.add_argument('--plot', action='store_true', help='Also write summary plots (needs matplotlib)')
+    parser.add_argument('--keep-stacks', action='store_true', help='Do not remove benchmark stacks')
+
+    args = parser.parse_args()
+
+    if not check_localstack_health():
+        print("\n❌ LocalStack is not running (start it with: docker compose up -d)")
+        return 1
+
+    vpc_cidr = stack_vpc_cidr(args.base_stack)
+    too_many = [n for n in args.subnets if n > max_private_subnets(vpc_cidr)]
+    if too_many:
+        parser.error(f"--subnets {too_many[0]} does not fit in {vpc_cidr} "
+                     f"(at most {max_private_subnets(vpc_cidr)} private /24 subnets)")
+
+    matrix = build_matrix(
+        args.subnets, TOGGLES[args.nat], TOGGLES[args.vpn], TOGGLES[args.flow_logs]
+    )
+    print(f"🧪 Running {len(matrix)} deploy benchmark(s)")
+
+    results = [run_case(case, args.base_stack, args.keep_stacks) for case in matrix]
+
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    csv_path = write_csv(results, args.output_dir / f'deploy-scaling-{stamp}.csv')
+    print_summary(results)
+    print(f"\n📂 Results: {csv_path}")
+    if args.plot:
+        plot = plot_results(results, args.output_dir / f'deploy-scaling-{stamp}.png')
+        if plot:
+            print(f"📂 Plots:   {plot}")
+
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,10 +6,44 @@ Pure Python deployment script using Pulumi Automation API.
 No shell scripts required!
 """
 
+import hashlib
+import json
+import shutil
 import subprocess
 import sys
 import time
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# deploy.py may sit in the repo root or next to the Pulumi program
+ROOT_DIR = Path(__file__).resolve().parent
+if (ROOT_DIR / 'Pulumi.yaml').exists():
+    ROOT_DIR = ROOT_DIR.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+PULUMI_DIR = ROOT_DIR / 'pulumi'
+
+# Local record of what was last deployed to each stack
+STATE_DIR = ROOT_DIR / '.stack-cache'
+
+# LocalStack persistence volume (see docker-compose.yml) and saved copies of it
+LOCALSTACK_DATA = ROOT_DIR / 'localstack-data'
+SNAPSHOT_DIR = STATE_DIR / 'snapshots'
+
+PROJECT_NAME = 'cloud-networking-lab'
+
+# Config keys whose effect is confined to known resources in __main__.py.
+# Anything not listed here (feature toggles, provider settings) changes the
+# shape of the stack and always falls back to a full update.
+TARGETABLE_CONFIG = {
+    f'{PROJECT_NAME}:vpc_cidr': [
+        f'{PROJECT_NAME}-vpc',
+        f'{PROJECT_NAME}-default-sg',
+    ],
+    f'{PROJECT_NAME}:customer_gateway_ip': [f'{PROJECT_NAME}-cgw'],
+    f'{PROJECT_NAME}:customer_bgp_asn': [f'{PROJECT_NAME}-cgw'],
+}
 
 
 def check_localstack_health() -> bool:
@@ -85,12 +119,254 @@ def start_localstack() -> bool:
         return False
 
 
-def deploy_stack(stack_name: str, auto_approve: bool = False) -> bool:
-    """Deploy Pulumi stack."""
+def config_value(value: object) -> str:
+    """
+    Encode a config value the way the program reads it back.
+    
+    Booleans become "true"/"false" (config.get_bool) and lists and dicts
+    JSON (config.get_object); anything else is stored as its string form.
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(',', ':'))
+    return str(value)
+
+
+def set_stack_config(stack_name: str, values: Dict[str, object]) -> bool:
+    """Set plaintext config values on a stack in one `pulumi config set-all` call."""
+    args = ['pulumi', 'config', 'set-all', '--stack', stack_name]
+    for key, value in values.items():
+        args += ['--plaintext', f'{key}={config_value(value)}']
+
+    try:
+        subprocess.run(args, cwd=PULUMI_DIR, check=True)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Failed to set stack config: {e}")
+        return False
+
+
+def apply_intent(stack_name: str, intent_path: Path) -> bool:
+    """Write an intent YAML file into the stack configuration."""
+    from models.aws_intent import AWSNetworkIntent
+
+    try:
+        intent = AWSNetworkIntent.from_yaml(intent_path)
+    except Exception as e:
+        print(f"❌ Invalid intent {intent_path}: {e}")
+        return False
+
+    print(f"📝 Applying intent {intent_path} to stack {stack_name}")
+    return set_stack_config(stack_name, intent.to_pulumi_config())
+
+
+def _pulumi_json(args: List[str], pulumi_dir: Path) -> Optional[dict]:
+    """Run a pulumi command that prints JSON and parse its output."""
+    try:
+        result = subprocess.run(
+            ['pulumi', *args],
+            cwd=pulumi_dir,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return json.loads(result.stdout)
+    except (subprocess.CalledProcessError, json.JSONDecodeError):
+        return None
+
+
+def get_config_fingerprint(stack_name: str, pulumi_dir: Path) -> Optional[Dict[str, str]]:
+    """
+    Get a hashed view of the stack configuration.
+
+    Values are hashed so secrets never end up in the local state record.
+    """
+    config = _pulumi_json(
+        ['config', '--json', '--show-secrets', '--stack', stack_name],
+        pulumi_dir
+    )
+    if config is None:
+        return None
+
+    return {
+        key: hashlib.sha256(
+            json.dumps(entry.get('value'), sort_keys=True).encode()
+        ).hexdigest()
+        for key, entry in config.items()
+    }
+
+
+def get_program_fingerprint(pulumi_dir: Path) -> str:
+    """Hash the Pulumi program sources."""
+    digest = hashlib.sha256()
+    for path in sorted([*pulumi_dir.glob('*.py'), pulumi_dir / 'Pulumi.yaml']):
+        if path.is_file():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_deploy_record(stack_name: str) -> Optional[dict]:
+    """Load the record of the last successful deploy for a stack."""
+    path = STATE_DIR / f'{stack_name}.deployed.json'
+    try:
+        return json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_deploy_record(stack_name: str, pulumi_dir: Path) -> None:
+    """Record the configuration and program that were just deployed."""
+    config = get_config_fingerprint(stack_name, pulumi_dir)
+    if config is None:
+        return
+
+    STATE_DIR.mkdir(exist_ok=True)
+    record = {
+        'stack': stack_name,
+        'config': config,
+        'program': get_program_fingerprint(pulumi_dir),
+        'deployed_at': time.time()
+    }
+    (STATE_DIR / f'{stack_name}.deployed.json').write_text(json.dumps(record, indent=2))
+
+
+def changed_config_keys(old: Dict[str, str], new: Dict[str, str]) -> Set[str]:
+    """Return config keys that were added, removed or changed."""
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def dependency_closure(resources: List[dict], seeds: Iterable[str]) -> Optional[Set[str]]:
+    """
+    Expand resource URNs to include everything that depends on them.
+
+    Args:
+        resources: Resource list from `pulumi stack export`
+        seeds: URNs of directly affected resources
+
+    Returns:
+        Set of URNs, or None if a seed is not present in the state
+    """
+    known = {r['urn'] for r in resources}
+    dependents: Dict[str, Set[str]] = {}
+
+    for resource in resources:
+        deps = set(resource.get('dependencies') or [])
+        for prop_deps in (resource.get('propertyDependencies') or {}).values():
+            deps.update(prop_deps)
+        if resource.get('parent'):
+            deps.add(resource['parent'])
+        if resource.get('provider'):
+            # Provider references look like "<urn>::<id>"
+            deps.add(resource['provider'].rsplit('::', 1)[0])
+
+        for dep in deps:
+            dependents.setdefault(dep, set()).add(resource['urn'])
+
+    closure = set()
+    pending = list(seeds)
+    while pending:
+        urn = pending.pop()
+        if urn not in known:
+            return None
+        if urn in closure:
+            continue
+        closure.add(urn)
+        pending.extend(dependents.get(urn, ()))
+
+    return closure
+
+
+def plan_targeted_update(stack_name: str, pulumi_dir: Path) -> Optional[List[str]]:
+    """
+    Work out which resources need updating since the last deploy.
+
+    Returns:
+        List of URNs to target (empty if nothing changed), or None when
+        a full update is required
+    """
+    record = load_deploy_record(stack_name)
+    if record is None:
+        print("ℹ️  No previous deploy recorded - running full update")
+        return None
+
+    if record.get('program') != get_program_fingerprint(pulumi_dir):
+        print("ℹ️  Pulumi program changed - running full update")
+        return None
+
+    config = get_config_fingerprint(stack_name, pulumi_dir)
+    if config is None:
+        print("⚠️  Could not read stack config - running full update")
+        return None
+
+    changed = changed_config_keys(record.get('config', {}), config)
+    if not changed:
+        return []
+
+    untargetable = sorted(key for key in changed if key not in TARGETABLE_CONFIG)
+    if untargetable:
+        print(f"ℹ️  {', '.join(untargetable)} changed - running full update")
+        return None
+
+    state = _pulumi_json(['stack', 'export', '--stack', stack_name], pulumi_dir)
+    if not state:
+        print("⚠️  Could not export stack state - running full update")
+        return None
+
+    deployment = state.get('deployment', {})
+    if deployment.get('pending_operations'):
+        print("⚠️  Stack has pending operations - running full update")
+        return None
+
+    resources = deployment.get('resources') or []
+    seeds = set()
+    for key in changed:
+        for name in TARGETABLE_CONFIG[key]:
+            matches = [r['urn'] for r in resources if r['urn'].endswith(f'::{name}')]
+            if not matches:
+                print(f"ℹ️  Resource {name} not in state - running full update")
+                return None
+            seeds.update(matches)
+
+    closure = dependency_closure(resources, seeds)
+    if closure is None:
+        print("⚠️  Could not resolve dependencies - running full update")
+        return None
+
+    print(f"🎯 Config changed: {', '.join(sorted(changed))}")
+    print(f"   Targeting {len(closure)} of {len(resources)} resources")
+    return sorted(closure)
+
+
+def print_outputs(outputs: Dict) -> None:
+    """Print stack outputs in `pulumi stack output` style."""
+    if not outputs:
+        print("  (no outputs)")
+        return
+
+    width = max(len(key) for key in outputs)
+    for key, value in sorted(outputs.items()):
+        if not isinstance(value, str):
+            value = json.dumps(value)
+        print(f"    {key:<{width}}  {value}")
+
+
+def deploy_stack(
+    stack_name: str,
+    auto_approve: bool = False,
+    changed_only: bool = False
+) -> bool:
+    """
+    Deploy Pulumi stack.
+
+    With changed_only, only resources affected by config changes since the
+    last deploy (and their dependents) are updated via --target.
+    """
     print(f"\n📦 Deploying stack: {stack_name}")
 
     # Change to pulumi directory
-    pulumi_dir = Path(__file__).parent / 'pulumi'
+    pulumi_dir = PULUMI_DIR
 
     try:
         # Select stack
@@ -101,10 +377,21 @@ def deploy_stack(stack_name: str, auto_approve: bool = False) -> bool:
             check=True
         )
 
+        target_args = []
+        if changed_only:
+            targets = plan_targeted_update(stack_name, pulumi_dir)
+            if targets == []:
+                print("\n✅ No changes since last deploy")
+                return True
+            if targets:
+                target_args = ['--target-dependents']
+                for urn in targets:
+                    target_args += ['--target', urn]
+
         # Preview changes
         print("\n📋 Previewing changes...")
         subprocess.run(
-            ['pulumi', 'preview'],
+            ['pulumi', 'preview', '--stack', stack_name, *target_args],
             cwd=pulumi_dir,
             check=True
         )
@@ -113,25 +400,26 @@ def deploy_stack(stack_name: str, auto_approve: bool = False) -> bool:
         if auto_approve:
             print("\n🚀 Deploying (auto-approved)...")
             subprocess.run(
-                ['pulumi', 'up', '--yes'],
+                ['pulumi', 'up', '--yes', '--stack', stack_name, *target_args],
                 cwd=pulumi_dir,
                 check=True
             )
         else:
             print("\n🚀 Deploying...")
             subprocess.run(
-                ['pulumi', 'up'],
+                ['pulumi', 'up', '--stack', stack_name, *target_args],
                 cwd=pulumi_dir,
                 check=True
             )
 
-        # Show outputs
+        save_deploy_record(stack_name, pulumi_dir)
+
+        # Show outputs and cache them for other tools
+        from models.stack_outputs import refresh_stack_outputs
+
         print("\n📊 Stack outputs:")
-        subprocess.run(
-            ['pulumi', 'stack', 'output'],
-            cwd=pulumi_dir,
-            check=True
-        )
+        cached = refresh_stack_outputs(stack_name, pulumi_dir, STATE_DIR)
+        print_outputs(cached.outputs)
 
         print("\n✅ Deployment successful!")
         return True
@@ -145,7 +433,7 @@ def destroy_stack(stack_name: str, auto_approve: bool = False) -> bool:
     """Destroy Pulumi stack resources."""
     print(f"\n🗑️  Destroying stack: {stack_name}")
 
-    pulumi_dir = Path(__file__).parent / 'pulumi'
+    pulumi_dir = PULUMI_DIR
 
     try:
         # Select stack
@@ -159,18 +447,22 @@ def destroy_stack(stack_name: str, auto_approve: bool = False) -> bool:
         if auto_approve:
             print("Destroying resources (auto-approved)...")
             subprocess.run(
-                ['pulumi', 'destroy', '--yes'],
+                ['pulumi', 'destroy', '--yes', '--stack', stack_name],
                 cwd=pulumi_dir,
                 check=True
             )
         else:
             print("Destroying resources...")
             subprocess.run(
-                ['pulumi', 'destroy'],
+                ['pulumi', 'destroy', '--stack', stack_name],
                 cwd=pulumi_dir,
                 check=True
             )
 
+        from models.stack_outputs import invalidate_stack_outputs
+
+        invalidate_stack_outputs(stack_name, STATE_DIR)
+
         print("\n✅ Resources destroyed!")
         return True
 
@@ -179,6 +471,305 @@ def destroy_stack(stack_name: str, auto_approve: bool = False) -> bool:
         return False
 
 
+def wait_for_localstack(timeout: float = 60.0) -> bool:
+    """Poll the LocalStack health endpoint until it responds."""
+    import urllib.request
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(
+                'http://localhost:4566/_localstack/health', timeout=2
+            ) as response:
+                if response.status == 200:
+                    return check_localstack_health()
+        except Exception:
+            pass
+        time.sleep(0.5)
+
+    print(f"❌ LocalStack not healthy after {timeout:.0f}s")
+    return False
+
+
+def _stack_outputs_from_checkpoint(checkpoint: dict) -> Dict:
+    """Extract stack outputs from a `pulumi stack export` document."""
+    for resource in checkpoint.get('deployment', {}).get('resources') or []:
+        if resource.get('type') == 'pulumi:pulumi:Stack':
+            return resource.get('outputs') or {}
+    return {}
+
+
+def list_snapshots() -> List[str]:
+    """List saved LocalStack snapshots."""
+    if not SNAPSHOT_DIR.exists():
+        return []
+    return sorted(p.name for p in SNAPSHOT_DIR.iterdir() if (p / 'snapshot.json').exists())
+
+
+def snapshot_stack(stack_name: str, snapshot_name: str = 'baseline') -> bool:
+    """
+    Save LocalStack state and the matching Pulumi checkpoint.
+
+    LocalStack is stopped briefly so the persistence volume is flushed and
+    copied in a consistent state.
+    """
+    print(f"\n📸 Snapshotting stack {stack_name} as '{snapshot_name}'")
+
+    pulumi_dir = PULUMI_DIR
+    target = SNAPSHOT_DIR / snapshot_name
+    staging = SNAPSHOT_DIR / f'.{snapshot_name}.tmp'
+
+    try:
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        subprocess.run(
+            ['pulumi', 'stack', 'export', '--stack', stack_name,
+             '--file', str(staging / 'checkpoint.json')],
+            cwd=pulumi_dir,
+            check=True
+        )
+
+        record = STATE_DIR / f'{stack_name}.deployed.json'
+        if record.exists():
+            shutil.copy2(record, staging / 'deployed.json')
+
+        subprocess.run(['docker', 'compose', 'stop', 'localstack'], cwd=ROOT_DIR, check=True)
+        try:
+            shutil.copytree(LOCALSTACK_DATA, staging / 'localstack-data', symlinks=True)
+        finally:
+            subprocess.run(['docker', 'compose', 'start', 'localstack'], cwd=ROOT_DIR, check=True)
+
+        (staging / 'snapshot.json').write_text(json.dumps({
+            'stack': stack_name,
+            'name': snapshot_name,
+            'created_at': time.time()
+        }, indent=2))
+
+        shutil.rmtree(target, ignore_errors=True)
+        staging.rename(target)
+
+        if not wait_for_localstack():
+            return False
+
+        print(f"✅ Snapshot saved: {target}")
+        return True
+
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"❌ Snapshot failed: {e}")
+        shutil.rmtree(staging, ignore_errors=True)
+        return False
+
+
+def restore_snapshot(stack_name: str, snapshot_name: str = 'baseline') -> bool:
+    """
+    Reset LocalStack and the Pulumi stack to a saved snapshot.
+
+    Replaces the LocalStack persistence volume and imports the matching
+    checkpoint, so no resources are re-created.
+    """
+    print(f"\n⏪ Restoring stack {stack_name} from '{snapshot_name}'")
+
+    source = SNAPSHOT_DIR / snapshot_name
+    if not (source / 'snapshot.json').exists():
+        print(f"❌ Snapshot not found: {snapshot_name}")
+        print(f"   Available: {', '.join(list_snapshots()) or 'none'}")
+        return False
+
+    meta = json.loads((source / 'snapshot.json').read_text())
+    if meta.get('stack') != stack_name:
+        print(f"❌ Snapshot '{snapshot_name}' belongs to stack {meta.get('stack')}")
+        return False
+
+    pulumi_dir = PULUMI_DIR
+    started = time.monotonic()
+
+    try:
+        subprocess.run(['docker', 'compose', 'stop', 'localstack'], cwd=ROOT_DIR, check=True)
+        try:
+            shutil.rmtree(LOCALSTACK_DATA, ignore_errors=True)
+            shutil.copytree(source / 'localstack-data', LOCALSTACK_DATA, symlinks=True)
+        finally:
+            subprocess.run(['docker', 'compose', 'start', 'localstack'], cwd=ROOT_DIR, check=True)
+
+        subprocess.run(
+            ['pulumi', 'stack', 'import', '--stack', stack_name,
+             '--file', str(source / 'checkpoint.json')],
+            cwd=pulumi_dir,
+            check=True
+        )
+
+        STATE_DIR.mkdir(exist_ok=True)
+        if (source / 'deployed.json').exists():
+            shutil.copy2(source / 'deployed.json', STATE_DIR / f'{stack_name}.deployed.json')
+
+        from models.stack_outputs import write_stack_outputs
+
+        checkpoint = json.loads((source / 'checkpoint.json').read_text())
+        write_stack_outputs(
+            stack_name, _stack_outputs_from_checkpoint(checkpoint), cache_dir=STATE_DIR
+        )
+
+        if not wait_for_localstack():
+            return False
+
+        print(f"✅ Restored in {time.monotonic() - started:.1f}s")
+        return True
+
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"❌ Restore failed: {e}")
+        return False
+
+
+def _watch_fingerprint(paths: List[Path]) -> Dict[str, float]:
+    """Modification times of the watched files."""
+    fingerprint = {}
+    for path in paths:
+        try:
+            fingerprint[str(path)] = path.stat().st_mtime
+        except OSError:
+            fingerprint[str(path)] = 0.0
+    return fingerprint
+
+
+def _watched_files(stack_name: str, intent_paths: List[Path]) -> List[Path]:
+    """Pulumi program, project/stack config and intent files to watch."""
+    return sorted({
+        *PULUMI_DIR.glob('*.py'),
+        PULUMI_DIR / 'Pulumi.yaml',
+        PULUMI_DIR / f'Pulumi.{stack_name}.yaml',
+        *intent_paths
+    })
+
+
+def _print_preview_event(event) -> None:
+    """Print one line per resource that the preview would change."""
+    pre = getattr(event, 'resource_pre_event', None)
+    if pre is None:
+        return
+
+    metadata = pre.metadata
+    op = getattr(metadata.op, 'value', str(metadata.op))
+    if op in ('same', 'read'):
+        return
+
+    symbols = {'create': '+', 'delete': '-', 'update': '~', 'replace': '+-'}
+    name = metadata.urn.rsplit('::', 1)[-1]
+    diffs = f"  [{', '.join(metadata.diffs)}]" if metadata.diffs else ''
+    print(f"  {symbols.get(op, '*'):>2} {op:<8} {metadata.type}  {name}{diffs}")
+
+
+def watch_stack(
+    stack_name: str,
+    intent_paths: Optional[List[Path]] = None,
+    debounce: float = 1.0,
+    poll_interval: float = 0.5
+) -> bool:
+    """
+    Continuously preview the stack as the program or intent files change.
+
+    Keeps one Automation API workspace open and runs the Pulumi program
+    in-process, so each preview skips CLI and interpreter startup. Only the
+    resource diff is printed.
+    """
+    import runpy
+
+    from pulumi import automation as auto
+
+    from models.aws_intent import AWSNetworkIntent
+
+    intent_paths = [Path(p).resolve() for p in intent_paths or []]
+    program_modules: Set[str] = set()
+
+    def run_program():
+        # Drop program modules from the previous run so edits are picked up
+        for name in program_modules:
+            sys.modules.pop(name, None)
+        before = set(sys.modules)
+
+        if str(PULUMI_DIR) not in sys.path:
+            sys.path.insert(0, str(PULUMI_DIR))
+        runpy.run_path(str(PULUMI_DIR / '__main__.py'), run_name='__pulumi__')
+
+        program_modules.clear()
+        program_modules.update(
+            name for name in set(sys.modules) - before
+            if str(getattr(sys.modules[name], '__file__', '') or '').startswith(str(PULUMI_DIR))
+        )
+
+    print(f"\n👀 Watching stack {stack_name} (Ctrl+C to stop)")
+    stack = auto.select_stack(
+        stack_name=stack_name,
+        project_name=PROJECT_NAME,
+        program=run_program,
+        opts=auto.LocalWorkspaceOptions(work_dir=str(PULUMI_DIR))
+    )
+
+    def apply_intents():
+        for path in intent_paths:
+            try:
+                config = AWSNetworkIntent.from_yaml(path).to_pulumi_config()
+            except Exception as e:
+                print(f"❌ Invalid intent {path}: {e}")
+                return False
+            stack.set_all_config({
+                key: auto.ConfigValue(value=config_value(value)) for key, value in config.items()
+            })
+        return True
+
+    def preview():
+        started = time.monotonic()
+        print(f"\n📋 Preview ({time.strftime('%H:%M:%S')})")
+        try:
+            result = stack.preview(on_event=_print_preview_event)
+        except auto.errors.CommandError as e:
+            print(f"❌ Preview failed:\n{e}")
+            return
+        changes = {op: n for op, n in result.change_summary.items() if op != 'same' and n}
+        summary = ', '.join(f"{n} to {op}" for op, n in changes.items()) or 'no changes'
+        print(f"   {summary} ({time.monotonic() - started:.1f}s)")
+
+    files = _watched_files(stack_name, intent_paths)
+    if apply_intents():
+        preview()
+    last = _watch_fingerprint(files)
+
+    try:
+        while True:
+            time.sleep(poll_interval)
+            files = _watched_files(stack_name, intent_paths)
+            current = _watch_fingerprint(files)
+            if current == last:
+                continue
+
+            # Debounce: wait until files stop changing
+            while True:
+                time.sleep(debounce)
+                settled = _watch_fingerprint(files)
+                if settled == current:
+                    break
+                current = settled
+
+            changed = sorted(
+                Path(path).name for path in current.keys() | last.keys()
+                if current.get(path) != last.get(path)
+            )
+            print(f"\n🔄 Changed: {', '.join(changed)}")
+
+            if any(path.name in changed for path in intent_paths):
+                if not apply_intents():
+                    last = _watch_fingerprint(files)
+                    continue
+
+            preview()
+            # Config writes from apply_intents touch the stack file; don't re-trigger
+            last = _watch_fingerprint(_watched_files(stack_name, intent_paths))
+
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+        return True
+
+
 def main():
     """Main entry point."""
     import argparse
@@ -188,7 +779,7 @@ def main():
     )
     parser.add_argument(
         'action',
-        choices=['deploy', 'destroy', 'status'],
+        choices=['deploy', 'destroy', 'status', 'snapshot', 'restore', 'watch'],
         help='Action to perform'
     )
     parser.add_argument(
@@ -207,6 +798,32 @@ def main():
         action='store_true',
         help='Start LocalStack if deploying to local stack'
     )
+    parser.add_argument(
+        '--intent',
+        type=Path,
+        help='Intent YAML file to apply to the stack config (watched in watch mode)'
+    )
+    parser.add_argument(
+        '--changed-only',
+        action='store_true',
+        help='Only update resources affected by changes since the last deploy'
+    )
+    parser.add_argument(
+        '--snapshot-name',
+        default='baseline',
+        help='Snapshot name for snapshot/restore (default: baseline)'
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=1.0,
+        help='Seconds to wait for edits to settle in watch mode (default: 1.0)'
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Bypass the local stack output cache for status'
+    )
 
     args = parser.parse_args()
 
@@ -233,24 +850,49 @@ def main():
 
     # Perform action
     if args.action == 'deploy':
-        success = deploy_stack(args.stack, args.yes)
+        if args.intent and not apply_intent(args.stack, args.intent):
+            sys.exit(1)
+        success = deploy_stack(args.stack, args.yes, args.changed_only)
         sys.exit(0 if success else 1)
 
     elif args.action == 'destroy':
         success = destroy_stack(args.stack, args.yes)
         sys.exit(0 if success else 1)
 
+    elif args.action == 'watch':
+        intents = [args.intent] if args.intent else []
+        success = watch_stack(args.stack, intents, debounce=args.debounce)
+        sys.exit(0 if success else 1)
+
+    elif args.action in ('snapshot', 'restore'):
+        if args.stack != 'local':
+            print("\n❌ Snapshots are only supported for the local (LocalStack) stack")
+            sys.exit(1)
+
+        if args.action == 'snapshot':
+            success = snapshot_stack(args.stack, args.snapshot_name)
+        else:
+            success = restore_snapshot(args.stack, args.snapshot_name)
+        sys.exit(0 if success else 1)
+
     elif args.action == 'status':
         print(f"\nStack: {args.stack}")
 
         if args.stack == 'local':
             check_localstack_health()
 
-        pulumi_dir = Path(__file__).parent / 'pulumi'
-        subprocess.run(
-            ['pulumi', 'stack', 'output'],
-            cwd=pulumi_dir
-        )
+        from models.stack_outputs import get_stack_outputs
+
+        pulumi_dir = PULUMI_DIR
+        try:
+            outputs = get_stack_outputs(
+                args.stack, pulumi_dir, refresh=args.refresh, cache_dir=STATE_DIR
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Could not get stack outputs: {e}")
+            sys.exit(1)
+
+        print_outputs(outputs)
 
 
 if __name__ == '__main__':
@@ -117,9 +117,16 @@ def create_route(
     destination_cidr_block: str,
     gateway_id: Optional[pulumi.Input[str]] = None,
     nat_gateway_id: Optional[pulumi.Input[str]] = None,
-    vpc_peering_connection_id: Optional[pulumi.Input[str]] = None
+    vpc_peering_connection_id: Optional[pulumi.Input[str]] = None,
+    transit_gateway_id: Optional[pulumi.Input[str]] = None,
+    opts: Optional[pulumi.ResourceOptions] = None
 ) -> aws.ec2.Route:
-    """Create a route in a route table."""
+    """
+    Create a route in a route table.
+    
+    Routes to a Transit Gateway should pass opts with depends_on set to
+    the VPC attachment; AWS rejects them until the attachment exists.
+    """
     route_args = {
         "route_table_id": route_table_id,
         "destination_cidr_block": destination_cidr_block
@@ -131,10 +138,15 @@ def create_route(
         route_args["nat_gateway_id"] = nat_gateway_id
     elif vpc_peering_connection_id:
         route_args["vpc_peering_connection_id"] = vpc_peering_connection_id
+    elif transit_gateway_id:
+        route_args["transit_gateway_id"] = transit_gateway_id
     else:
-        raise ValueError("Must specify gateway_id, nat_gateway_id, or vpc_peering_connection_id")
+        raise ValueError(
+            "Must specify gateway_id, nat_gateway_id, vpc_peering_connection_id "
+            "or transit_gateway_id"
+        )
     
-    route = aws.ec2.Route(name, **route_args)
+    route = aws.ec2.Route(name, **route_args, opts=opts)
     
     return route
 
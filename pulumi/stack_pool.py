@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Warm pool of pre-deployed LocalStack stacks for integration tests.
+
+Keeps N stacks (local-pool-0 .. local-pool-N-1) deployed and leases them to
+test workers, so parallel pytest-xdist workers never wait for a full deploy.
+Pool state lives in a JSON file guarded by a file lock, so every worker
+process shares the same view of which stacks are free. Stacks held by a
+process that died (or for longer than the lease TTL) are marked dirty and
+reset before they are leased again.
+"""
+
+import fcntl
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List
+
+from deploy import PULUMI_DIR, STATE_DIR, deploy_stack, destroy_stack
+
+POOL_DIR = STATE_DIR / 'pool'
+
+# Stack states
+PROVISIONING = 'provisioning'
+READY = 'ready'
+LEASED = 'leased'
+RESETTING = 'resetting'
+DIRTY = 'dirty'
+BROKEN = 'broken'
+
+# States owned by a single process until it finishes with the stack
+OWNED_STATES = (PROVISIONING, LEASED, RESETTING)
+
+# Number of recent wait/reset samples kept for metrics
+MAX_SAMPLES = 500
+
+
+@dataclass
+class PooledStack:
+    """A stack leased from the pool."""
+    name: str
+    outputs: Dict = field(default_factory=dict)
+    dirty: bool = False
+    wait_seconds: float = 0.0
+
+    def mark_dirty(self):
+        """Flag the stack as modified so it is reset on release."""
+        self.dirty = True
+
+
+class PoolTimeout(Exception):
+    """No stack became available within the lease timeout."""
+
+
+class StackPool:
+    """Manage a pool of warm LocalStack stacks."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        base_stack: str = 'local',
+        prefix: str = 'local-pool',
+        lease_ttl: float = 3600.0
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            size: Number of stacks to keep warm
+            base_stack: Stack whose config is copied to pool stacks
+            prefix: Pool stack name prefix
+            lease_ttl: Seconds after which a leased, provisioning or
+                resetting stack is assumed abandoned
+        """
+        self.size = size
+        self.lease_ttl = lease_ttl
+        self.base_stack = base_stack
+        self.prefix = prefix
+        self.state_file = POOL_DIR / f'{prefix}.json'
+        self.lock_file = POOL_DIR / f'{prefix}.lock'
+
+    @property
+    def stack_names(self) -> List[str]:
+        """Names of all stacks in the pool."""
+        return [f'{self.prefix}-{i}' for i in range(self.size)]
+
+    # ------------------------------------------
+    # Shared state
+    # ------------------------------------------
+
+    def _read_state(self) -> dict:
+        """
+        Read the pool state without locking.
+
+        Writers replace the file atomically, so this always sees a
+        complete state; use _locked_state to change it.
+        """
+        try:
+            state = json.loads(self.state_file.read_text())
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        state.setdefault('stacks', {})
+        state.setdefault('metrics', {'leases': 0, 'waits': [], 'resets': [], 'recycles': 0})
+        return state
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict]:
+        """Lock the pool and yield its state; changes are saved on exit."""
+        POOL_DIR.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                state = self._read_state()
+
+                yield state
+
+                tmp = self.state_file.with_suffix(f'.{os.getpid()}.tmp')
+                tmp.write_text(json.dumps(state, indent=2))
+                os.replace(tmp, self.state_file)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _entry(status: str, **extra) -> dict:
+        """State entry for a stack, owned by this process."""
+        return {'status': status, 'since': time.time(), 'pid': os.getpid(), **extra}
+
+    def _set_status(self, name: str, status: str, **extra):
+        """Update the status of one stack."""
+        with self._locked_state() as state:
+            state['stacks'][name] = self._entry(status, **extra)
+
+    def _is_abandoned(self, entry: dict) -> bool:
+        """Check whether an owned stack's process died or outlived the lease TTL."""
+        if entry.get('status') not in OWNED_STATES:
+            return False
+        if time.time() - entry.get('since', time.time()) > self.lease_ttl:
+            return True
+
+        pid = entry.get('pid')
+        if pid is None or pid == os.getpid():
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def _reclaim(self, state: dict) -> List[str]:
+        """Mark abandoned stacks dirty so they are reset before reuse."""
+        reclaimed = [
+            name for name in self.stack_names
+            if self._is_abandoned(state['stacks'].get(name, {}))
+        ]
+        for name in reclaimed:
+            previous = state['stacks'][name]
+            print(f"♻️  Reclaiming {name} ({previous['status']} by "
+                  f"{previous.get('leased_by', previous.get('pid'))})")
+            state['stacks'][name] = {'status': DIRTY, 'since': time.time()}
+        return reclaimed
+
+    @staticmethod
+    def _record(metrics: dict, key: str, value: float):
+        """Append a sample to a bounded metrics list."""
+        metrics[key] = (metrics.get(key, []) + [round(value, 3)])[-MAX_SAMPLES:]
+
+    # ------------------------------------------
+    # Provisioning
+    # ------------------------------------------
+
+    def _prepare_stack(self, name: str) -> bool:
+        """Create a pool stack with the base stack's config."""
+        subprocess.run(
+            ['pulumi', 'stack', 'init', name],
+            cwd=PULUMI_DIR,
+            capture_output=True
+        )
+        try:
+            subprocess.run(
+                ['pulumi', 'config', 'cp', '--stack', self.base_stack, '--dest', name],
+                cwd=PULUMI_DIR,
+                check=True
+            )
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Could not copy config to {name}: {e}")
+            return False
+
+    def _provision(self, name: str) -> bool:
+        """Deploy one pool stack from scratch."""
+        ok = self._prepare_stack(name) and deploy_stack(name, auto_approve=True)
+        self._set_status(name, READY if ok else BROKEN)
+        return ok
+
+    def _recover(self, name: str) -> bool:
+        """Reset a dirty stack left behind by another process."""
+        ok = self._reset(name)
+        self._set_status(name, READY if ok else BROKEN)
+        return ok
+
+    def ensure_warm(self) -> int:
+        """
+        Deploy any pool stacks that are missing or broken, and reset dirty ones.
+
+        Safe to call from every worker: stacks already being provisioned by
+        a live process are left alone, while those abandoned by a crashed
+        worker are reclaimed first.
+
+        Returns:
+            Number of stacks that are ready or leased
+        """
+        with self._locked_state() as state:
+            self._reclaim(state)
+            statuses = {
+                name: state['stacks'].get(name, {}).get('status') for name in self.stack_names
+            }
+            to_provision = [name for name, status in statuses.items() if status in (None, BROKEN)]
+            to_reset = [name for name, status in statuses.items() if status == DIRTY]
+            for name in to_provision:
+                state['stacks'][name] = self._entry(PROVISIONING)
+            for name in to_reset:
+                state['stacks'][name] = self._entry(RESETTING)
+
+        jobs = [(self._provision, name) for name in to_provision]
+        jobs += [(self._recover, name) for name in to_reset]
+        if jobs:
+            print(f"🔥 Warming {len(jobs)} stack(s): {', '.join(name for _, name in jobs)}")
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                list(executor.map(lambda job: job[0](job[1]), jobs))
+
+        stats = self.stats()
+        return stats['ready'] + stats['leased']
+
+    # ------------------------------------------
+    # Leasing
+    # ------------------------------------------
+
+    def lease(self, timeout: float = 600.0, poll_interval: float = 1.0) -> PooledStack:
+        """
+        Lease a ready stack, waiting until one is free.
+
+        A dirty stack reclaimed from a crashed worker is leased when no
+        ready one is free, and reset before it is returned.
+
+        Args:
+            timeout: Maximum seconds to wait
+            poll_interval: Seconds between availability checks
+
+        Returns:
+            PooledStack: The leased stack
+
+        Raises:
+            PoolTimeout: If no stack became ready in time
+        """
+        from models.stack_outputs import read_stack_outputs_cache
+
+        started = time.monotonic()
+        while True:
+            with self._locked_state() as state:
+                self._reclaim(state)
+                statuses = {
+                    n: state['stacks'].get(n, {}).get('status') for n in self.stack_names
+                }
+                name = next((n for n, s in statuses.items() if s == READY), None)
+                needs_reset = name is None
+                if needs_reset:
+                    name = next((n for n, s in statuses.items() if s == DIRTY), None)
+                if name:
+                    state['stacks'][name] = self._entry(
+                        LEASED,
+                        leased_by=os.environ.get('PYTEST_XDIST_WORKER', str(os.getpid()))
+                    )
+
+            if name and needs_reset and not self._reset(name):
+                self._set_status(name, BROKEN)
+                name = None
+
+            if name:
+                waited = time.monotonic() - started
+                with self._locked_state() as state:
+                    state['metrics']['leases'] += 1
+                    self._record(state['metrics'], 'waits', waited)
+                break
+
+            if time.monotonic() - started > timeout:
+                raise PoolTimeout(f"No pool stack available after {timeout:.0f}s")
+            time.sleep(poll_interval)
+
+        cached = read_stack_outputs_cache(name, cache_dir=STATE_DIR)
+        return PooledStack(name=name, outputs=cached.outputs if cached else {}, wait_seconds=waited)
+
+    def _reset(self, name: str) -> bool:
+        """Bring a stack back to its deployed state, recycling if that fails."""
+        started = time.monotonic()
+        try:
+            subprocess.run(
+                ['pulumi', 'up', '--yes', '--refresh', '--skip-preview', '--stack', name],
+                cwd=PULUMI_DIR,
+                check=True
+            )
+            ok = True
+        except subprocess.CalledProcessError:
+            print(f"⚠️  Reset of {name} failed - recycling")
+            destroy_stack(name, auto_approve=True)
+            ok = deploy_stack(name, auto_approve=True)
+            with self._locked_state() as state:
+                state['metrics']['recycles'] += 1
+
+        with self._locked_state() as state:
+            self._record(state['metrics'], 'resets', time.monotonic() - started)
+        return ok
+
+    def release(self, stack: PooledStack):
+        """
+        Return a leased stack to the pool.
+
+        Clean stacks are available again immediately; dirty ones are reset
+        (or recycled) first.
+        """
+        if stack.dirty:
+            self._set_status(stack.name, RESETTING)
+            ok = self._reset(stack.name)
+            self._set_status(stack.name, READY if ok else BROKEN)
+        else:
+            self._set_status(stack.name, READY)
+
+    @contextmanager
+    def leased(self, timeout: float = 600.0) -> Iterator[PooledStack]:
+        """Context manager that leases a stack and always releases it."""
+        stack = self.lease(timeout)
+        try:
+            yield stack
+        finally:
+            self.release(stack)
+
+    def drain(self) -> bool:
+        """Destroy every pool stack and forget the pool state."""
+        ok = all(destroy_stack(name, auto_approve=True) for name in self.stack_names)
+        self.state_file.unlink(missing_ok=True)
+        return ok
+
+    # ------------------------------------------
+    # Metrics
+    # ------------------------------------------
+
+    def stats(self) -> Dict:
+        """Pool size, per-state counts and lease wait-time metrics (read-only)."""
+        state = self._read_state()
+        statuses = [
+            state['stacks'].get(n, {}).get('status', 'missing') for n in self.stack_names
+        ]
+        metrics = state['metrics']
+
+        waits = metrics.get('waits', [])
+        resets = metrics.get('resets', [])
+        return {
+            'size': self.size,
+            **{s: statuses.count(s) for s in (READY, LEASED, PROVISIONING, RESETTING, DIRTY, BROKEN)},
+            'leases': metrics.get('leases', 0),
+            'recycles': metrics.get('recycles', 0),
+            'wait_mean_s': round(statistics.fmean(waits), 3) if waits else 0.0,
+            'wait_max_s': max(waits, default=0.0),
+            'reset_mean_s': round(statistics.fmean(resets), 3) if resets else 0.0,
+        }
+
+
+def print_stats(stats: Dict, write=print):
+    """Print pool metrics."""
+    write(f"Pool size: {stats['size']}")
+    write(f"  Ready: {stats['ready']}  Leased: {stats['leased']}  "
+          f"Provisioning: {stats['provisioning']}  Resetting: {stats['resetting']}  "
+          f"Dirty: {stats['dirty']}  Broken: {stats['broken']}")
+    write(f"  Leases: {stats['leases']}  Recycles: {stats['recycles']}")
+    write(f"  Lease wait: mean {stats['wait_mean_s']:.2f}s, max {stats['wait_max_s']:.2f}s")
+    write(f"  Reset time: mean {stats['reset_mean_s']:.2f}s")
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Manage the warm LocalStack stack pool'
+    )
+    parser.add_argument(
+        'action',
+        choices=['warm', 'status', 'drain'],
+        help='Action to perform'
+    )
+    parser.add_argument(
+        '--size',
+        type=int,
+        default=int(os.environ.get('LAB_STACK_POOL_SIZE', 2)),
+        help='Number of warm stacks (default: 2 or $LAB_STACK_POOL_SIZE)'
+    )
+
+    args = parser.parse_args()
+    pool = StackPool(size=args.size)
+
+    if args.action == 'warm':
+        ready = pool.ensure_warm()
+        print_stats(pool.stats())
+        return 0 if ready == args.size else 1
+
+    if args.action == 'drain':
+        return 0 if pool.drain() else 1
+
+    print_stats(pool.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
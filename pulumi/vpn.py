@@ -1,14 +1,15 @@
 """
 VPN module for AWS Cloud Networking Lab.
 
-Provides functions to create site-to-site VPN connections with BGP support.
+Provides functions to create site-to-site VPN connections with BGP support,
+terminated either on a per-VPC VPN gateway or on a Transit Gateway shared
+by many VPCs (hub-and-spoke).
 """
 
-from typing import Optional
-
-import pulumi_aws as aws
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import pulumi
+import pulumi_aws as aws
 
 
 def create_vpn_gateway(
@@ -89,7 +90,7 @@ def create_customer_gateway(
 
 def create_vpn_connection(
     name: str,
-    vpn_gateway_id: pulumi.Input[str],
+    vpn_gateway_id: Optional[pulumi.Input[str]],
     customer_gateway_id: pulumi.Input[str],
     type: str = "ipsec.1",
     static_routes_only: bool = False,
@@ -97,14 +98,15 @@ def create_vpn_connection(
     tunnel2_inside_cidr: Optional[str] = None,
     tunnel1_preshared_key: Optional[str] = None,
     tunnel2_preshared_key: Optional[str] = None,
-    tags: Optional[dict] = None
+    tags: Optional[dict] = None,
+    transit_gateway_id: Optional[pulumi.Input[str]] = None
 ) -> aws.ec2.VpnConnection:
     """
-    Create a VPN connection between VGW and CGW.
+    Create a VPN connection between a VGW (or Transit Gateway) and CGW.
     
     Args:
         name: Resource name
-        vpn_gateway_id: VPN gateway ID
+        vpn_gateway_id: VPN gateway ID (None when terminating on a TGW)
         customer_gateway_id: Customer gateway ID
         type: Connection type (always "ipsec.1")
         static_routes_only: Use static routes (False = BGP)
@@ -113,6 +115,9 @@ def create_vpn_connection(
         tunnel1_preshared_key: Pre-shared key for tunnel 1
         tunnel2_preshared_key: Pre-shared key for tunnel 2
         tags: Additional tags
+        transit_gateway_id: Transit Gateway ID, instead of vpn_gateway_id;
+            the connection's transit_gateway_attachment_id output is the
+            VPN attachment to associate with a TGW route table
         
     Returns:
         aws.ec2.VpnConnection: The VPN connection
@@ -120,14 +125,21 @@ def create_vpn_connection(
     if tags is None:
         tags = {}
     
+    if bool(vpn_gateway_id) == bool(transit_gateway_id):
+        raise ValueError("Must specify exactly one of vpn_gateway_id or transit_gateway_id")
+    
     vpn_args = {
-        "vpn_gateway_id": vpn_gateway_id,
         "customer_gateway_id": customer_gateway_id,
         "type": type,
         "static_routes_only": static_routes_only,
         "tags": {"Name": name, **tags}
     }
     
+    if vpn_gateway_id:
+        vpn_args["vpn_gateway_id"] = vpn_gateway_id
+    else:
+        vpn_args["transit_gateway_id"] = transit_gateway_id
+    
     # Optional tunnel configuration
     if tunnel1_inside_cidr:
         vpn_args["tunnel1_inside_cidr"] = tunnel1_inside_cidr
@@ -170,3 +182,273 @@ def create_vpn_connection_route(
     )
     
     return vpn_route
+
+
+def create_transit_gateway(
+    name: str,
+    amazon_side_asn: Optional[int] = None,
+    description: Optional[str] = None,
+    vpn_ecmp_support: bool = True,
+    dns_support: bool = True,
+    tags: Optional[dict] = None
+) -> aws.ec2transitgateway.TransitGateway:
+    """
+    Create a Transit Gateway to hub VPCs and VPNs.
+    
+    The default route table association/propagation is disabled: every
+    attachment is wired explicitly (see create_hub_and_spoke), so adding
+    a VPC never changes routing for the others by accident.
+    
+    Args:
+        name: Resource name
+        amazon_side_asn: Amazon side BGP ASN (default: 64512)
+        description: Transit Gateway description
+        vpn_ecmp_support: Spread traffic across VPN tunnels with equal BGP paths
+        dns_support: Resolve public DNS names to private IPs across attachments
+        tags: Additional tags
+        
+    Returns:
+        aws.ec2transitgateway.TransitGateway: The transit gateway
+    """
+    if tags is None:
+        tags = {}
+    
+    tgw_args = {
+        "description": description or name,
+        "default_route_table_association": "disable",
+        "default_route_table_propagation": "disable",
+        "vpn_ecmp_support": "enable" if vpn_ecmp_support else "disable",
+        "dns_support": "enable" if dns_support else "disable",
+        "tags": {"Name": name, **tags}
+    }
+    
+    if amazon_side_asn:
+        tgw_args["amazon_side_asn"] = amazon_side_asn
+    
+    transit_gateway = aws.ec2transitgateway.TransitGateway(name, **tgw_args)
+    
+    pulumi.log.info(f"Creating Transit Gateway: {name}")
+    
+    return transit_gateway
+
+
+def create_ecmp_vpn_connections(
+    name: str,
+    transit_gateway_id: pulumi.Input[str],
+    customer_gateway_ids: Sequence[pulumi.Input[str]],
+    connection_count: int,
+    tags: Optional[dict] = None
+) -> List[aws.ec2.VpnConnection]:
+    """
+    Create parallel BGP VPN connections on a Transit Gateway for ECMP.
+    
+    One tunnel carries about 1.25 Gbps; with vpn_ecmp_support enabled on
+    the TGW, equal-cost BGP paths over every tunnel of every connection
+    are used together, so aggregate bandwidth scales with the count.
+    Connections are spread round-robin over the customer gateways.
+    
+    Args:
+        name: Resource name prefix
+        transit_gateway_id: Transit Gateway ID (with vpn_ecmp_support)
+        customer_gateway_ids: Customer gateway IDs (at least one)
+        connection_count: Number of VPN connections (2 tunnels each)
+        tags: Additional tags
+        
+    Returns:
+        List[aws.ec2.VpnConnection]: The VPN connections; associate each
+        transit_gateway_attachment_id with the same TGW route table
+    """
+    if not customer_gateway_ids:
+        raise ValueError("At least one customer gateway is required")
+    
+    connections = [
+        create_vpn_connection(
+            name=f"{name}-{i}",
+            vpn_gateway_id=None,
+            customer_gateway_id=customer_gateway_ids[i % len(customer_gateway_ids)],
+            static_routes_only=False,  # ECMP needs BGP
+            tags=tags,
+            transit_gateway_id=transit_gateway_id
+        )
+        for i in range(connection_count)
+    ]
+    
+    pulumi.log.info(
+        f"Creating {connection_count} ECMP VPN connection(s): {connection_count * 2} tunnels"
+    )
+    
+    return connections
+
+
+def create_transit_gateway_route_table(
+    name: str,
+    transit_gateway_id: pulumi.Input[str],
+    tags: Optional[dict] = None
+) -> aws.ec2transitgateway.RouteTable:
+    """
+    Create a Transit Gateway route table (one routing domain).
+    
+    Args:
+        name: Resource name
+        transit_gateway_id: Transit Gateway ID
+        tags: Additional tags
+        
+    Returns:
+        aws.ec2transitgateway.RouteTable: The route table
+    """
+    if tags is None:
+        tags = {}
+    
+    route_table = aws.ec2transitgateway.RouteTable(
+        name,
+        transit_gateway_id=transit_gateway_id,
+        tags={"Name": name, **tags}
+    )
+    
+    return route_table
+
+
+def create_transit_gateway_vpc_attachment(
+    name: str,
+    transit_gateway_id: pulumi.Input[str],
+    vpc_id: pulumi.Input[str],
+    subnet_ids: Sequence[pulumi.Input[str]],
+    tags: Optional[dict] = None
+) -> aws.ec2transitgateway.VpcAttachment:
+    """
+    Attach a VPC to a Transit Gateway.
+    
+    Args:
+        name: Resource name
+        transit_gateway_id: Transit Gateway ID
+        vpc_id: VPC ID to attach
+        subnet_ids: One subnet per AZ the attachment should serve
+        tags: Additional tags
+        
+    Returns:
+        aws.ec2transitgateway.VpcAttachment: The VPC attachment
+    """
+    if tags is None:
+        tags = {}
+    
+    attachment = aws.ec2transitgateway.VpcAttachment(
+        name,
+        transit_gateway_id=transit_gateway_id,
+        vpc_id=vpc_id,
+        subnet_ids=list(subnet_ids),
+        transit_gateway_default_route_table_association=False,
+        transit_gateway_default_route_table_propagation=False,
+        tags={"Name": name, **tags}
+    )
+    
+    pulumi.log.info(f"Creating Transit Gateway VPC attachment: {name}")
+    
+    return attachment
+
+
+def route_transit_gateway_attachment(
+    name: str,
+    attachment_id: pulumi.Input[str],
+    association_route_table_id: pulumi.Input[str],
+    propagation_route_table_ids: Sequence[pulumi.Input[str]] = ()
+) -> aws.ec2transitgateway.RouteTableAssociation:
+    """
+    Associate an attachment with a TGW route table and propagate its routes.
+    
+    Args:
+        name: Resource name prefix
+        attachment_id: VPC or VPN attachment ID
+        association_route_table_id: Route table the attachment looks up
+        propagation_route_table_ids: Route tables that learn its routes
+        
+    Returns:
+        aws.ec2transitgateway.RouteTableAssociation: The association
+    """
+    association = aws.ec2transitgateway.RouteTableAssociation(
+        f"{name}-assoc",
+        transit_gateway_attachment_id=attachment_id,
+        transit_gateway_route_table_id=association_route_table_id
+    )
+    
+    for i, route_table_id in enumerate(propagation_route_table_ids):
+        aws.ec2transitgateway.RouteTablePropagation(
+            f"{name}-prop-{i}",
+            transit_gateway_attachment_id=attachment_id,
+            transit_gateway_route_table_id=route_table_id
+        )
+    
+    return association
+
+
+def create_hub_and_spoke(
+    name: str,
+    transit_gateway_id: pulumi.Input[str],
+    vpcs: Dict[str, Tuple[pulumi.Input[str], Sequence[pulumi.Input[str]]]],
+    vpn_attachment_ids: Sequence[pulumi.Input[str]] = (),
+    isolate_spokes: bool = False,
+    tags: Optional[dict] = None
+) -> Dict[str, dict]:
+    """
+    Attach VPCs and VPNs to a Transit Gateway in hub-and-spoke routing.
+    
+    By default every attachment shares one route table (one routing
+    domain): each VPC reaches the others and on-prem over the same VPN
+    tunnels. With isolate_spokes, VPCs use a "spokes" table that only
+    learns VPN routes and the VPNs use a "vpn" table that learns every
+    VPC, so VPCs reach on-prem but not each other.
+    
+    Each attachment gets exactly one association and one propagation, so
+    resource count grows linearly with the number of VPCs (no mesh).
+    
+    Args:
+        name: Resource name prefix
+        transit_gateway_id: Transit Gateway ID
+        vpcs: Spoke name -> (VPC ID, attachment subnet IDs)
+        vpn_attachment_ids: TGW attachment IDs of VPN connections
+        isolate_spokes: Keep VPCs from routing to each other
+        tags: Additional tags
+        
+    Returns:
+        dict: "route_tables" (role -> route table) and "attachments"
+        (spoke name -> VPC attachment)
+    """
+    if tags is None:
+        tags = {}
+    
+    if isolate_spokes:
+        route_tables = {
+            "spokes": create_transit_gateway_route_table(
+                f"{name}-spokes-rt", transit_gateway_id, tags
+            ),
+            "vpn": create_transit_gateway_route_table(f"{name}-vpn-rt", transit_gateway_id, tags),
+        }
+    else:
+        shared = create_transit_gateway_route_table(f"{name}-rt", transit_gateway_id, tags)
+        route_tables = {"spokes": shared, "vpn": shared}
+    
+    attachments = {}
+    for spoke, (vpc_id, subnet_ids) in vpcs.items():
+        attachment = create_transit_gateway_vpc_attachment(
+            f"{name}-{spoke}-attachment", transit_gateway_id, vpc_id, subnet_ids, tags
+        )
+        route_transit_gateway_attachment(
+            f"{name}-{spoke}",
+            attachment.id,
+            route_tables["spokes"].id,
+            [route_tables["vpn"].id]
+        )
+        attachments[spoke] = attachment
+    
+    for i, attachment_id in enumerate(vpn_attachment_ids):
+        route_transit_gateway_attachment(
+            f"{name}-vpn-{i}",
+            attachment_id,
+            route_tables["vpn"].id,
+            [route_tables["spokes"].id]
+        )
+    
+    pulumi.log.info(
+        f"Creating hub-and-spoke routing: {len(vpcs)} VPC(s), {len(vpn_attachment_ids)} VPN(s)"
+    )
+    
+    return {"route_tables": route_tables, "attachments": attachments}
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Shared boto3 client factory for the lab scripts.
+
+Creating a boto3 session and client is slow (endpoint and service model
+loading), so sessions and clients are built once per process and reused.
+Clients get a tuned botocore Config and are pointed at LocalStack
+automatically when the target stack is ``local``.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import boto3
+from botocore.config import Config
+
+LOCALSTACK_ENDPOINT = os.environ.get('LOCALSTACK_ENDPOINT', 'http://localhost:4566')
+
+# Stacks deployed to LocalStack (local and the warm pool's local-pool-N)
+LOCAL_STACK_PREFIX = 'local'
+
+DEFAULT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    connect_timeout=5,
+    read_timeout=30,
+    tcp_keepalive=True
+)
+
+
+@dataclass
+class ClientStats:
+    """Construction time and API call timing for one client."""
+    service: str
+    region: str
+    endpoint_url: Optional[str]
+    created_seconds: float
+    calls: int = 0
+    call_seconds: float = 0.0
+
+    @property
+    def mean_call_seconds(self) -> float:
+        """Average API call latency."""
+        return self.call_seconds / self.calls if self.calls else 0.0
+
+
+_clients: Dict[tuple, object] = {}
+_stats: List[ClientStats] = []
+_lock = threading.Lock()
+# Sessions are not thread-safe, so shared clients are created one at a time
+_create_lock = threading.Lock()
+
+
+def is_local_stack(stack: Optional[str]) -> bool:
+    """Whether a stack name targets LocalStack."""
+    return bool(stack) and (stack == LOCAL_STACK_PREFIX or stack.startswith(f'{LOCAL_STACK_PREFIX}-'))
+
+
+def endpoint_for(stack: Optional[str]) -> Optional[str]:
+    """LocalStack endpoint for local stacks, otherwise None (real AWS)."""
+    return LOCALSTACK_ENDPOINT if is_local_stack(stack) else None
+
+
+@lru_cache(maxsize=None)
+def get_session(profile: Optional[str] = None) -> boto3.Session:
+    """
+    Cached boto3 session for a profile.
+
+    Args:
+        profile: AWS profile name (default: environment credentials)
+    """
+    return boto3.Session(profile_name=profile)
+
+
+def _record_timing(stats: ClientStats, client):
+    """Time every API call made through a client."""
+    def before_call(context=None, **kwargs):
+        if context is not None:
+            context['lab_call_started'] = time.perf_counter()
+
+    def after_call(context=None, **kwargs):
+        started = (context or {}).get('lab_call_started')
+        if started is not None:
+            with _lock:
+                stats.calls += 1
+                stats.call_seconds += time.perf_counter() - started
+
+    client.meta.events.register('before-parameter-build', before_call)
+    client.meta.events.register('after-call', after_call)
+
+
+def create_client(
+    service: str,
+    region: str = 'us-east-1',
+    stack: Optional[str] = None,
+    session: Optional[boto3.Session] = None,
+    config: Optional[Config] = None
+):
+    """
+    Build a new client with the shared config and timing hooks.
+
+    Args:
+        service: AWS service name (e.g. "ec2")
+        region: AWS region
+        stack: Target stack; local stacks use the LocalStack endpoint
+        session: Session to build from (default: cached default session)
+        config: botocore Config merged over DEFAULT_CONFIG
+
+    Returns:
+        boto3 client
+    """
+    endpoint_url = endpoint_for(stack)
+    kwargs = {
+        'region_name': region,
+        'config': DEFAULT_CONFIG.merge(config) if config else DEFAULT_CONFIG
+    }
+    if endpoint_url:
+        kwargs['endpoint_url'] = endpoint_url
+        # LocalStack accepts any credentials
+        kwargs['aws_access_key_id'] = os.environ.get('AWS_ACCESS_KEY_ID', 'test')
+        kwargs['aws_secret_access_key'] = os.environ.get('AWS_SECRET_ACCESS_KEY', 'test')
+
+    started = time.perf_counter()
+    client = (session or get_session()).client(service, **kwargs)
+    stats = ClientStats(service, region, endpoint_url, time.perf_counter() - started)
+
+    if hasattr(client, 'meta'):
+        _record_timing(stats, client)
+    with _lock:
+        _stats.append(stats)
+    return client
+
+
+def get_client(
+    service: str,
+    region: str = 'us-east-1',
+    stack: Optional[str] = None,
+    profile: Optional[str] = None
+):
+    """
+    Shared client for a service/region/stack/profile.
+
+    Clients are thread-safe, so one instance is reused process-wide.
+
+    Args:
+        service: AWS service name (e.g. "ec2")
+        region: AWS region
+        stack: Target stack (default: $LAB_STACK); local stacks use LocalStack
+        profile: AWS profile name
+
+    Returns:
+        boto3 client
+    """
+    stack = stack or os.environ.get('LAB_STACK')
+    key = (service, region, endpoint_for(stack), profile)
+
+    with _lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _create_lock:
+        with _lock:
+            client = _clients.get(key)
+        if client is None:
+            client = create_client(service, region, stack, session=get_session(profile))
+            with _lock:
+                _clients[key] = client
+    return client
+
+
+def client_stats() -> List[ClientStats]:
+    """Timing for every client created in this process."""
+    with _lock:
+        return list(_stats)
+
+
+def print_client_stats(write=print):
+    """Print client construction and call timing."""
+    for stats in client_stats():
+        target = stats.endpoint_url or 'aws'
+        write(f"  {stats.service} ({stats.region}, {target}): "
+              f"created in {stats.created_seconds * 1000:.0f}ms, "
+              f"{stats.calls} call(s), mean {stats.mean_call_seconds * 1000:.0f}ms")
+
+
+def reset_clients():
+    """Forget cached sessions, clients and timings."""
+    with _lock:
+        _clients.clear()
+        _stats.clear()
+    get_session.cache_clear()
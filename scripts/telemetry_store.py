@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Local history of VPN tunnel telemetry.
+
+Samples are appended to a SQLite database and rolled up as they are
+written: raw samples are kept for a week, hourly rollups for 90 days and
+daily rollups forever. State changes are stored separately, so flap
+count, availability and mean time to recover can be answered for any
+window without scanning raw samples.
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / '.stack-cache' / 'telemetry.db'
+
+HOUR = 3600
+DAY = 86400
+
+# How long each resolution is kept
+RAW_RETENTION = 7 * DAY
+HOURLY_RETENTION = 90 * DAY
+
+# Run compaction at most this often
+COMPACT_INTERVAL = HOUR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tunnels (
+    id INTEGER PRIMARY KEY,
+    vpn_id TEXT NOT NULL,
+    outside_ip TEXT NOT NULL,
+    UNIQUE (vpn_id, outside_ip)
+);
+CREATE TABLE IF NOT EXISTS samples (
+    ts INTEGER NOT NULL,
+    tunnel INTEGER NOT NULL,
+    up INTEGER NOT NULL,
+    PRIMARY KEY (ts, tunnel)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    period INTEGER NOT NULL,
+    tunnel INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    up_samples INTEGER NOT NULL,
+    PRIMARY KEY (period, tunnel, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS transitions (
+    tunnel INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    up INTEGER NOT NULL,
+    change INTEGER NOT NULL,
+    PRIMARY KEY (tunnel, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def parse_duration(text: str) -> int:
+    """
+    Parse a duration like "90m", "24h", "30d" or "1y" into seconds.
+
+    Args:
+        text: Number with an optional s/m/h/d/w/y suffix
+
+    Returns:
+        Duration in seconds
+    """
+    units = {'s': 1, 'm': 60, 'h': HOUR, 'd': DAY, 'w': 7 * DAY, 'y': 365 * DAY}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _floor(ts: int, period: int) -> int:
+    return ts - ts % period
+
+
+def _ceil(ts: int, period: int) -> int:
+    return -(-ts // period) * period
+
+
+class TelemetryStore:
+    """Append-only tunnel telemetry history with automatic downsampling."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file (default: .stack-cache/telemetry.db)
+        """
+        self.path = Path(path or DEFAULT_DB)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+        self._tunnel_ids: Dict[Tuple[str, str], int] = {
+            (vpn_id, ip): tid for tid, vpn_id, ip in self.db.execute('SELECT * FROM tunnels')
+        }
+        # Last known state per tunnel, to detect transitions on write
+        self._last_state: Dict[int, int] = dict(self.db.execute(
+            'SELECT tunnel, up FROM transitions t WHERE ts = '
+            '(SELECT MAX(ts) FROM transitions WHERE tunnel = t.tunnel)'
+        ))
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_compaction'").fetchone()
+        self._last_compaction = int(row[0]) if row else 0
+
+    def close(self):
+        """Close the database."""
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _tunnel_id(self, vpn_id: str, outside_ip: str) -> int:
+        key = (vpn_id, outside_ip)
+        if key not in self._tunnel_ids:
+            cursor = self.db.execute(
+                'INSERT OR IGNORE INTO tunnels (vpn_id, outside_ip) VALUES (?, ?)', key
+            )
+            self._tunnel_ids[key] = cursor.lastrowid or self.db.execute(
+                'SELECT id FROM tunnels WHERE vpn_id = ? AND outside_ip = ?', key
+            ).fetchone()[0]
+        return self._tunnel_ids[key]
+
+    # ------------------------------------------
+    # Writing
+    # ------------------------------------------
+
+    def record(self, samples: Iterable[Tuple[str, str, float, bool]], compact: bool = True) -> int:
+        """
+        Append tunnel samples.
+
+        Args:
+            samples: (vpn_id, outside_ip, timestamp, is_up) tuples
+            compact: Downsample old data if compaction is due
+
+        Returns:
+            Number of samples written
+        """
+        count = 0
+        latest = 0
+        with self.db:
+            for vpn_id, outside_ip, ts, is_up in samples:
+                tunnel = self._tunnel_id(vpn_id, outside_ip)
+                ts, up = int(ts), int(bool(is_up))
+                cursor = self.db.execute(
+                    'INSERT OR IGNORE INTO samples (ts, tunnel, up) VALUES (?, ?, ?)',
+                    (ts, tunnel, up)
+                )
+                if not cursor.rowcount:
+                    continue  # duplicate sample
+
+                for period in (HOUR, DAY):
+                    self.db.execute(
+                        'INSERT INTO rollups VALUES (?, ?, ?, 1, ?) '
+                        'ON CONFLICT DO UPDATE SET samples = samples + 1, '
+                        'up_samples = up_samples + excluded.up_samples',
+                        (period, tunnel, _floor(ts, period), up)
+                    )
+
+                previous = self._last_state.get(tunnel)
+                if previous != up:
+                    self.db.execute(
+                        'INSERT OR REPLACE INTO transitions VALUES (?, ?, ?, ?)',
+                        (tunnel, ts, up, int(previous is not None))
+                    )
+                    self._last_state[tunnel] = up
+
+                count += 1
+                latest = max(latest, ts)
+
+        if compact and latest - self._last_compaction >= COMPACT_INTERVAL:
+            self.compact(now=latest)
+        return count
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Drop data past its retention; coarser rollups already cover it.
+
+        Args:
+            now: Reference time (default: current time)
+
+        Returns:
+            Rows deleted per resolution
+        """
+        now = int(now or time.time())
+        with self.db:
+            raw = self.db.execute(
+                'DELETE FROM samples WHERE ts < ?', (now - RAW_RETENTION,)
+            ).rowcount
+            hourly = self.db.execute(
+                'DELETE FROM rollups WHERE period = ? AND bucket < ?',
+                (HOUR, _floor(now - HOURLY_RETENTION, HOUR))
+            ).rowcount
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('last_compaction', ?)", (str(now),)
+            )
+        self._last_compaction = now
+        return {'raw': raw, 'hourly': hourly}
+
+    # ------------------------------------------
+    # Queries
+    # ------------------------------------------
+
+    def _segments(self, start: int, end: int, now: int) -> List[Tuple[int, int, int]]:
+        """
+        Split a window into (period, lo, hi) pieces, coarsest first.
+
+        Period 0 means raw samples. Window edges older than a resolution's
+        retention are widened to the next coarser bucket.
+        """
+        if start < now - HOURLY_RETENTION:
+            start = _floor(start, DAY)
+        elif start < now - RAW_RETENTION:
+            start = _floor(start, HOUR)
+        if end < now - HOURLY_RETENTION:
+            end = _ceil(end, DAY)
+        elif end < now - RAW_RETENTION:
+            end = _ceil(end, HOUR)
+
+        segments = []
+        pending = [(start, end)]
+        for period in (DAY, HOUR):
+            remaining = []
+            for lo, hi in pending:
+                full_lo, full_hi = _ceil(lo, period), _floor(hi, period)
+                if full_lo < full_hi:
+                    segments.append((period, full_lo, full_hi))
+                    remaining += [(lo, full_lo), (full_hi, hi)]
+                else:
+                    remaining.append((lo, hi))
+            pending = [(lo, hi) for lo, hi in remaining if lo < hi]
+        segments += [(0, lo, hi) for lo, hi in pending]
+        return segments
+
+    def tunnel_report(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        vpn_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Availability, flaps and MTTR per tunnel over a window.
+
+        Args:
+            start: Window start (epoch seconds)
+            end: Window end (default: now)
+            vpn_id: Only tunnels of this VPN connection
+
+        Returns:
+            One report per tunnel with samples in the window
+        """
+        now = int(time.time())
+        start, end = int(start), int(end) if end else now + 1
+        totals: Dict[int, List[int]] = {}
+
+        for period, lo, hi in self._segments(start, end, max(now, end)):
+            if period:
+                rows = self.db.execute(
+                    'SELECT tunnel, SUM(samples), SUM(up_samples) FROM rollups '
+                    'WHERE period = ? AND bucket >= ? AND bucket < ? GROUP BY tunnel',
+                    (period, lo, hi)
+                )
+            else:
+                rows = self.db.execute(
+                    'SELECT tunnel, COUNT(*), SUM(up) FROM samples '
+                    'WHERE ts >= ? AND ts < ? GROUP BY tunnel',
+                    (lo, hi)
+                )
+            for tunnel, samples, up_samples in rows:
+                entry = totals.setdefault(tunnel, [0, 0])
+                entry[0] += samples
+                entry[1] += up_samples
+
+        flaps = dict(self.db.execute(
+            'SELECT tunnel, COUNT(*) FROM transitions '
+            'WHERE change = 1 AND ts >= ? AND ts < ? GROUP BY tunnel',
+            (start, end)
+        ))
+        outages = {
+            tunnel: (count, mttr)
+            for tunnel, count, mttr in self.db.execute(
+                'SELECT tunnel, COUNT(*), AVG(recovered - ts) FROM ('
+                '  SELECT tunnel, ts, up, change,'
+                '         LEAD(ts) OVER (PARTITION BY tunnel ORDER BY ts) AS recovered'
+                '  FROM transitions'
+                ') WHERE up = 0 AND change = 1 AND ts >= ? AND ts < ? GROUP BY tunnel',
+                (start, end)
+            )
+        }
+
+        names = {tid: key for key, tid in self._tunnel_ids.items()}
+        report = []
+        for tunnel, (samples, up_samples) in sorted(totals.items(), key=lambda i: names[i[0]]):
+            name = names[tunnel]
+            if vpn_id and name[0] != vpn_id:
+                continue
+            outage_count, mttr = outages.get(tunnel, (0, None))
+            report.append({
+                'vpn_id': name[0],
+                'outside_ip': name[1],
+                'samples': samples,
+                'availability_pct': round(100.0 * up_samples / samples, 3) if samples else None,
+                'flaps': flaps.get(tunnel, 0),
+                'outages': outage_count,
+                'mttr_seconds': round(mttr, 1) if mttr is not None else None
+            })
+        return report
+
+
+def print_report(report: List[Dict]):
+    """Print a tunnel history report."""
+    if not report:
+        print("No telemetry recorded for this window")
+        return
+
+    print(f"\n{'VPN':<24} {'Tunnel':<16} {'Availability':>12} {'Flaps':>6} "
+          f"{'Outages':>8} {'MTTR':>9}")
+    for row in report:
+        mttr = f"{row['mttr_seconds']:.0f}s" if row['mttr_seconds'] is not None else "-"
+        print(f"{row['vpn_id']:<24} {row['outside_ip']:<16} "
+              f"{row['availability_pct']:>11.2f}% {row['flaps']:>6} "
+              f"{row['outages']:>8} {mttr:>9}")
+
+
+def main():
+    """Main entry point."""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Query recorded VPN tunnel telemetry')
+    parser.add_argument('action', choices=['report', 'compact'], help='Action to perform')
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB, help='Telemetry database')
+    parser.add_argument('--since', default='24h', help='Window length, e.g. 90m, 24h, 30d (default: 24h)')
+    parser.add_argument('--vpn-id', help='Only this VPN connection')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+
+    args = parser.parse_args()
+
+    with TelemetryStore(args.db) as store:
+        if args.action == 'compact':
+            print(f"🧹 Removed {store.compact()}")
+            return 0
+
+        report = store.tunnel_report(time.time() - parse_duration(args.since), vpn_id=args.vpn_id)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,14 +5,30 @@ VPN Connectivity Verification Script.
 Tests VPN tunnel status, BGP connectivity, and route propagation.
 """
 
+import asyncio
+import atexit
+import hashlib
+import io
 import json
+import os
+import random
 import sys
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import cached_property
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import iterparse
 
 import boto3
 
+from aws_clients import create_client, get_client, print_client_stats
+from telemetry_store import DEFAULT_DB, TelemetryStore
+
 
 @dataclass
 class TunnelStatus:
@@ -22,79 +38,396 @@ class TunnelStatus:
     status: str
     status_message: str
     last_status_change: Optional[datetime] = None
+    accepted_route_count: int = 0
+
+
+@dataclass
+class TunnelConfig:
+    """Tunnel parameters from the customer gateway configuration."""
+    tunnel_id: int
+    customer_outside_ip: Optional[str] = None
+    amazon_outside_ip: Optional[str] = None
+    customer_inside_cidr: Optional[str] = None
+    amazon_inside_cidr: Optional[str] = None
+    bgp_neighbor_ip: Optional[str] = None
+    bgp_hold_time: Optional[int] = None
+    ike: Dict[str, str] = field(default_factory=dict)
+    ipsec: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class GatewayConfig:
+    """Parsed CustomerGatewayConfiguration document."""
+    customer_asn: Optional[int] = None
+    amazon_asn: Optional[int] = None
+    tunnels: List[TunnelConfig] = field(default_factory=list)
+
+
+# BGP prefixes a customer gateway may advertise per tunnel; exceeding
+# the quota tears the BGP session down
+VGW_PREFIX_LIMIT = 100
+TGW_PREFIX_LIMIT = 1000
+
+# Fraction of the prefix limit at which tunnels are flagged
+NEAR_LIMIT_RATIO = 0.8
+
+# VPN connection IDs per describe call (EC2 allows up to 200 filter values)
+DESCRIBE_CHUNK_SIZE = 100
+
+# Never keep secrets from the configuration document in memory
+_SECRET_ELEMENTS = {'pre_shared_key'}
+
+# Parsed configurations keyed by VPN id: (config hash, parsed config),
+# least recently used first. Keyed by id rather than document so the
+# cache never holds the pre-shared keys in the raw XML.
+GATEWAY_CONFIG_CACHE_SIZE = 256
+_gateway_config_cache: OrderedDict[str, Tuple[str, GatewayConfig]] = OrderedDict()
+_gateway_config_lock = threading.Lock()
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    """Convert an XML text value to int when possible."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_gateway_config(document: str) -> GatewayConfig:
+    """
+    Parse a CustomerGatewayConfiguration XML document.
+    
+    Uses a streaming parser and only keeps the handful of values we
+    report on, so large documents are never held as a full tree.
+    
+    Args:
+        document: XML returned in CustomerGatewayConfiguration
+        
+    Returns:
+        GatewayConfig with ASNs and per-tunnel parameters
+    """
+    config = GatewayConfig()
+    path: List[str] = []
+    tunnel: Optional[TunnelConfig] = None
+    inside: Dict[str, Dict[str, str]] = {}
+    
+    for event, elem in iterparse(io.BytesIO(document.encode()), events=('start', 'end')):
+        if event == 'start':
+            path.append(elem.tag)
+            if elem.tag == 'ipsec_tunnel':
+                tunnel = TunnelConfig(tunnel_id=len(config.tunnels) + 1)
+                inside = {'customer_gateway': {}, 'vpn_gateway': {}}
+            continue
+        
+        text = (elem.text or '').strip()
+        tag = elem.tag
+        
+        if tunnel is not None and 'ipsec_tunnel' in path:
+            side = next((p for p in path if p in ('customer_gateway', 'vpn_gateway')), None)
+            parent = path[-2] if len(path) > 1 else ''
+            
+            if side and parent == 'tunnel_outside_address' and tag == 'ip_address':
+                if side == 'customer_gateway':
+                    tunnel.customer_outside_ip = text
+                else:
+                    tunnel.amazon_outside_ip = text
+            elif side and parent == 'tunnel_inside_address' and tag in ('ip_address', 'network_cidr'):
+                inside[side][tag] = text
+            elif side and parent == 'bgp' and tag == 'asn':
+                if side == 'customer_gateway':
+                    config.customer_asn = config.customer_asn or _int_or_none(text)
+                else:
+                    config.amazon_asn = config.amazon_asn or _int_or_none(text)
+            elif side and parent == 'bgp' and tag == 'hold_time':
+                tunnel.bgp_hold_time = tunnel.bgp_hold_time or _int_or_none(text)
+            elif parent in ('ike', 'ipsec') and tag not in _SECRET_ELEMENTS and text:
+                getattr(tunnel, parent)[tag] = text
+            elif parent == 'dead_peer_detection' and text:
+                tunnel.ipsec[f'dpd_{tag}'] = text
+            elif tag == 'ipsec_tunnel':
+                for side, values in inside.items():
+                    if 'ip_address' in values:
+                        cidr = f"{values['ip_address']}/{values.get('network_cidr', '30')}"
+                        if side == 'customer_gateway':
+                            tunnel.customer_inside_cidr = cidr
+                        else:
+                            tunnel.amazon_inside_cidr = cidr
+                            # The customer router peers with the Amazon inside address
+                            tunnel.bgp_neighbor_ip = values['ip_address']
+                config.tunnels.append(tunnel)
+                tunnel = None
+        
+        path.pop()
+        elem.clear()
+    
+    return config
+
+
+def get_gateway_config(vpn_id: str, document: str) -> GatewayConfig:
+    """
+    Parse a connection's configuration, reusing the last result if unchanged.
+    
+    Results for the GATEWAY_CONFIG_CACHE_SIZE most recently used
+    connections are kept.
+    
+    Args:
+        vpn_id: VPN connection ID
+        document: CustomerGatewayConfiguration XML
+        
+    Returns:
+        Parsed GatewayConfig
+    """
+    digest = hashlib.sha1(document.encode()).hexdigest()
+    with _gateway_config_lock:
+        cached = _gateway_config_cache.get(vpn_id)
+        if cached:
+            _gateway_config_cache.move_to_end(vpn_id)
+    if cached and cached[0] == digest:
+        return cached[1]
+    
+    config = parse_gateway_config(document)
+    with _gateway_config_lock:
+        _gateway_config_cache[vpn_id] = (digest, config)
+        _gateway_config_cache.move_to_end(vpn_id)
+        while len(_gateway_config_cache) > GATEWAY_CONFIG_CACHE_SIZE:
+            _gateway_config_cache.popitem(last=False)
+    return config
+
+
+def find_tunnel_config(
+    configs: List[TunnelConfig],
+    outside_ip: Optional[str]
+) -> Optional[TunnelConfig]:
+    """
+    Find a tunnel's configuration by its Amazon outside IP.
+    
+    VgwTelemetry and the configuration document do not list tunnels in a
+    guaranteed order, so the outside IP is the only safe key between them.
+    
+    Args:
+        configs: Tunnels parsed from the configuration document
+        outside_ip: OutsideIpAddress from VgwTelemetry
+        
+    Returns:
+        The matching TunnelConfig, or None
+    """
+    if not outside_ip:
+        return None
+    return next((c for c in configs if c.amazon_outside_ip == outside_ip), None)
 
 
 @dataclass
 class VPNConnectionInfo:
-    """VPN connection information."""
+    """
+    VPN connection information.
+    
+    Tunnels are parsed lazily from ``telemetry`` and BGP details from
+    ``gateway_config_document``; pass the raw VgwTelemetry list and
+    CustomerGatewayConfiguration XML rather than parsed objects.
+    """
     vpn_id: str
     state: str
     type: str
     customer_gateway_id: str
     vpn_gateway_id: str
-    tunnels: List[TunnelStatus]
-    bgp_asn: Optional[int] = None
+    transit_gateway_id: Optional[str] = None
+    telemetry: List[Dict] = field(default_factory=list, repr=False)
+    gateway_config_document: Optional[str] = field(default=None, repr=False)
+    
+    @cached_property
+    def gateway_config(self) -> GatewayConfig:
+        """Customer gateway configuration, parsed on first access."""
+        document, self.gateway_config_document = self.gateway_config_document, None
+        if not document:
+            return GatewayConfig()
+        try:
+            return get_gateway_config(self.vpn_id, document)
+        except Exception as e:
+            print(f"⚠️  Could not parse configuration for {self.vpn_id}: {e}")
+            return GatewayConfig()
+    
+    @property
+    def bgp_asn(self) -> Optional[int]:
+        """Customer gateway BGP ASN."""
+        return self.gateway_config.customer_asn
+    
+    @property
+    def amazon_asn(self) -> Optional[int]:
+        """Amazon side BGP ASN."""
+        return self.gateway_config.amazon_asn
+    
+    @property
+    def tunnel_configs(self) -> List[TunnelConfig]:
+        """Per-tunnel parameters from the configuration document."""
+        return self.gateway_config.tunnels
+    
+    @cached_property
+    def tunnels(self) -> List[TunnelStatus]:
+        """Tunnel status, parsed from VgwTelemetry on first access."""
+        return [
+            TunnelStatus(
+                tunnel_id=i,
+                outside_ip=tunnel.get('OutsideIpAddress', 'N/A'),
+                status=tunnel.get('Status', 'UNKNOWN'),
+                status_message=tunnel.get('StatusMessage', ''),
+                last_status_change=tunnel.get('LastStatusChange'),
+                accepted_route_count=tunnel.get('AcceptedRouteCount', 0)
+            )
+            for i, tunnel in enumerate(self.telemetry, 1)
+        ]
+    
+    @property
+    def prefix_limit(self) -> int:
+        """BGP prefix limit per tunnel for this connection's gateway type."""
+        return TGW_PREFIX_LIMIT if self.transit_gateway_id else VGW_PREFIX_LIMIT
+    
+    @property
+    def route_alerts(self) -> List[str]:
+        """Prefix-limit and route asymmetry warnings."""
+        return route_count_alerts(
+            [(t.tunnel_id, t.status, t.accepted_route_count) for t in self.tunnels],
+            self.prefix_limit
+        )
+
+
+def route_count_alerts(
+    tunnels: List[Tuple[int, str, int]],
+    limit: int = VGW_PREFIX_LIMIT,
+    near_ratio: float = NEAR_LIMIT_RATIO
+) -> List[str]:
+    """
+    Check BGP accepted route counts across a connection's tunnels.
+    
+    Args:
+        tunnels: (tunnel_id, status, accepted_route_count) per tunnel
+        limit: Prefix limit per tunnel
+        near_ratio: Fraction of the limit that counts as "near"
+        
+    Returns:
+        Warning messages (empty when healthy)
+    """
+    alerts = []
+    for tunnel_id, _, count in tunnels:
+        if count >= limit:
+            alerts.append(f"Tunnel {tunnel_id} at prefix limit ({count}/{limit}) - BGP session will reset")
+        elif count >= limit * near_ratio:
+            alerts.append(f"Tunnel {tunnel_id} near prefix limit ({count}/{limit})")
+    
+    # A DOWN tunnel naturally learns nothing; only compare tunnels that are UP
+    up_counts = {tid: count for tid, status, count in tunnels if (status or '').upper() == 'UP'}
+    if len(up_counts) > 1 and len(set(up_counts.values())) > 1:
+        counts = ', '.join(f"tunnel {tid}: {count}" for tid, count in sorted(up_counts.items()))
+        alerts.append(f"Asymmetric route counts ({counts}) - check CGW advertisements")
+    return alerts
 
 
 class VPNVerifier:
     """Verify VPN connectivity and status."""
     
-    def __init__(self, region: str = "us-east-1"):
+    def __init__(
+        self,
+        region: str = "us-east-1",
+        session: Optional[boto3.Session] = None,
+        stack: Optional[str] = None
+    ):
         """
         Initialize VPN verifier.
         
         Args:
             region: AWS region
+            session: boto3 session to use (default: the shared client)
+            stack: Target stack; local stacks are checked in LocalStack
         """
-        self.ec2 = boto3.client('ec2', region_name=region)
+        if session:
+            self.ec2 = create_client('ec2', region, stack, session=session)
+        else:
+            self.ec2 = get_client('ec2', region, stack)
         self.region = region
     
-    def get_vpn_connections(self) -> List[VPNConnectionInfo]:
+    @staticmethod
+    def build_filters(
+        states: Optional[List[str]] = None,
+        vpn_gateway_ids: Optional[List[str]] = None,
+        tags: Optional[Dict[str, str]] = None
+    ) -> List[Dict]:
         """
-        Get all VPN connections in the region.
+        Build server-side filters for describe_vpn_connections.
         
+        Args:
+            states: Connection states (e.g. ["available"])
+            vpn_gateway_ids: VPN gateway IDs
+            tags: Tag key/value pairs that must all match
+            
         Returns:
-            List of VPN connection information
+            List of EC2 API filters
         """
-        try:
-            response = self.ec2.describe_vpn_connections()
-            connections = []
+        filters = []
+        if states:
+            filters.append({'Name': 'state', 'Values': list(states)})
+        if vpn_gateway_ids:
+            filters.append({'Name': 'vpn-gateway-id', 'Values': list(vpn_gateway_ids)})
+        for key, value in (tags or {}).items():
+            filters.append({'Name': f'tag:{key}', 'Values': [value]})
+        return filters
+    
+    def _describe_pages(self, operation: str = 'describe_vpn_connections', **kwargs) -> Iterator[Dict]:
+        """
+        Yield response pages of an EC2 describe call.
+        
+        DescribeVpnConnections is not paginated today; use the paginator if
+        botocore has one, otherwise issue a single filtered call.
+        """
+        if self.ec2.can_paginate(operation):
+            yield from self.ec2.get_paginator(operation).paginate(**kwargs)
+        else:
+            yield getattr(self.ec2, operation)(**kwargs)
+    
+    def get_vpn_connections(
+        self,
+        states: Optional[List[str]] = None,
+        vpn_gateway_ids: Optional[List[str]] = None,
+        tags: Optional[Dict[str, str]] = None,
+        raise_errors: bool = False
+    ) -> Iterator[VPNConnectionInfo]:
+        """
+        Stream VPN connections in the region.
+        
+        Filtering happens server-side; tunnel telemetry and the gateway
+        configuration are only parsed when a connection's ``tunnels`` or
+        BGP details are accessed.
+        
+        Args:
+            states: Only connections in these states
+            vpn_gateway_ids: Only connections on these VPN gateways
+            tags: Only connections with all of these tags
+            raise_errors: Re-raise API errors instead of ending the stream
             
-            for vpn in response.get('VpnConnections', []):
-                # Parse tunnel information
-                tunnels = []
-                for i, tunnel in enumerate(vpn.get('VgwTelemetry', []), 1):
-                    tunnel_status = TunnelStatus(
-                        tunnel_id=i,
-                        outside_ip=tunnel.get('OutsideIpAddress', 'N/A'),
-                        status=tunnel.get('Status', 'UNKNOWN'),
-                        status_message=tunnel.get('StatusMessage', ''),
-                        last_status_change=tunnel.get('LastStatusChange')
+        Yields:
+            VPN connection information
+        """
+        kwargs = {}
+        filters = self.build_filters(states, vpn_gateway_ids, tags)
+        if filters:
+            kwargs['Filters'] = filters
+        
+        try:
+            for page in self._describe_pages(**kwargs):
+                for vpn in page.get('VpnConnections', []):
+                    yield VPNConnectionInfo(
+                        vpn_id=vpn['VpnConnectionId'],
+                        state=vpn['State'],
+                        type=vpn['Type'],
+                        customer_gateway_id=vpn['CustomerGatewayId'],
+                        vpn_gateway_id=vpn.get('VpnGatewayId', 'N/A'),
+                        transit_gateway_id=vpn.get('TransitGatewayId'),
+                        telemetry=vpn.get('VgwTelemetry', []),
+                        gateway_config_document=vpn.get('CustomerGatewayConfiguration')
                     )
-                    tunnels.append(tunnel_status)
-                
-                # Get BGP ASN if available
-                bgp_asn = None
-                if 'CustomerGatewayConfiguration' in vpn:
-                    # Parse from configuration (would need XML parsing)
-                    pass
-                
-                conn_info = VPNConnectionInfo(
-                    vpn_id=vpn['VpnConnectionId'],
-                    state=vpn['State'],
-                    type=vpn['Type'],
-                    customer_gateway_id=vpn['CustomerGatewayId'],
-                    vpn_gateway_id=vpn.get('VpnGatewayId', 'N/A'),
-                    tunnels=tunnels,
-                    bgp_asn=bgp_asn
-                )
-                connections.append(conn_info)
-            
-            return connections
         
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"❌ Error fetching VPN connections: {e}")
-            return []
     
     def check_tunnel_status(self, tunnel: TunnelStatus) -> bool:
         """
@@ -108,17 +441,90 @@ class VPNVerifier:
         """
         return tunnel.status.upper() == 'UP'
     
-    def verify_vpn_connection(self, vpn_id: str) -> Dict:
+    def verify_route_propagation(self, vpn_gateway_ids: List[str]) -> Dict[str, List[Dict]]:
         """
-        Verify a specific VPN connection.
+        Check route propagation from VPN gateways into VPC route tables.
+        
+        Resolves the VPCs the gateways are attached to, then fetches every
+        route table in those VPCs with one filtered (paginated)
+        describe_route_tables call and indexes them by gateway ID.
         
         Args:
-            vpn_id: VPN connection ID
+            vpn_gateway_ids: VPN gateway IDs
             
         Returns:
-            Verification results
+            Route table reports keyed by VPN gateway ID
         """
-        results = {
+        vpn_gateway_ids = list(dict.fromkeys(vpn_gateway_ids))
+        report = {vgw_id: [] for vgw_id in vpn_gateway_ids}
+        if not vpn_gateway_ids:
+            return report
+        
+        # VPCs each gateway is attached to
+        vpcs_by_gateway = {}
+        response = self.ec2.describe_vpn_gateways(VpnGatewayIds=vpn_gateway_ids)
+        for gateway in response.get('VpnGateways', []):
+            vpcs_by_gateway[gateway['VpnGatewayId']] = {
+                attachment['VpcId'] for attachment in gateway.get('VpcAttachments', [])
+                if attachment.get('State') == 'attached'
+            }
+        
+        vpc_ids = sorted(set().union(*vpcs_by_gateway.values())) if vpcs_by_gateway else []
+        if not vpc_ids:
+            return report
+        
+        tables_by_vpc: Dict[str, List[Dict]] = {}
+        pages = self._describe_pages(
+            'describe_route_tables',
+            Filters=[{'Name': 'vpc-id', 'Values': vpc_ids}]
+        )
+        for page in pages:
+            for table in page.get('RouteTables', []):
+                tables_by_vpc.setdefault(table['VpcId'], []).append(table)
+        
+        for vgw_id, vpc_ids in vpcs_by_gateway.items():
+            for vpc_id in sorted(vpc_ids):
+                for table in tables_by_vpc.get(vpc_id, []):
+                    report[vgw_id].append(self._route_table_report(vgw_id, table))
+        
+        return report
+    
+    @staticmethod
+    def _route_table_report(vgw_id: str, table: Dict) -> Dict:
+        """Summarize one route table's propagation from a VPN gateway."""
+        propagating = any(
+            p.get('GatewayId') == vgw_id for p in table.get('PropagatingVgws', [])
+        )
+        propagated = [
+            route.get('DestinationCidrBlock') for route in table.get('Routes', [])
+            if route.get('GatewayId') == vgw_id
+            and route.get('Origin') == 'EnableVgwRoutePropagation'
+        ]
+        blackholes = [
+            route.get('DestinationCidrBlock') or route.get('DestinationPrefixListId')
+            for route in table.get('Routes', [])
+            if route.get('State') == 'blackhole'
+        ]
+        
+        issues = []
+        if not propagating:
+            issues.append('route propagation not enabled')
+        if blackholes:
+            issues.append(f"{len(blackholes)} blackhole route(s)")
+        
+        return {
+            'route_table_id': table.get('RouteTableId'),
+            'vpc_id': table.get('VpcId'),
+            'propagating': propagating,
+            'propagated_routes': propagated,
+            'blackhole_routes': blackholes,
+            'issues': issues
+        }
+    
+    @staticmethod
+    def _empty_results(vpn_id: str) -> Dict:
+        """Verification result skeleton for one connection."""
+        return {
             'vpn_id': vpn_id,
             'overall_status': 'UNKNOWN',
             'tunnels': [],
@@ -126,61 +532,170 @@ class VPNVerifier:
             'bgp_status': 'UNKNOWN',
             'recommendations': []
         }
+    
+    def _verify_vpn(self, vpn: Dict, route_tables: Optional[Dict[str, List[Dict]]] = None) -> Dict:
+        """
+        Verify one connection from its describe_vpn_connections entry.
         
-        try:
-            # Get VPN connection details
-            response = self.ec2.describe_vpn_connections(
-                VpnConnectionIds=[vpn_id]
-            )
-            
-            if not response.get('VpnConnections'):
-                results['overall_status'] = 'NOT_FOUND'
-                return results
+        Args:
+            vpn: VpnConnections entry
+            route_tables: Output of verify_route_propagation for its gateway
             
-            vpn = response['VpnConnections'][0]
-            results['overall_status'] = vpn['State']
+        Returns:
+            Verification results
+        """
+        vpn_id = vpn['VpnConnectionId']
+        results = self._empty_results(vpn_id)
+        results['overall_status'] = vpn['State']
+        
+        # Check tunnel status
+        up_tunnels = 0
+        for i, tunnel in enumerate(vpn.get('VgwTelemetry', []), 1):
+            tunnel_info = {
+                'tunnel_id': i,
+                'outside_ip': tunnel.get('OutsideIpAddress'),
+                'status': tunnel.get('Status'),
+                'message': tunnel.get('StatusMessage', ''),
+                'last_change': str(tunnel.get('LastStatusChange', 'N/A')),
+                'accepted_route_count': tunnel.get('AcceptedRouteCount', 0)
+            }
+            results['tunnels'].append(tunnel_info)
             
-            # Check tunnel status
-            up_tunnels = 0
-            for i, tunnel in enumerate(vpn.get('VgwTelemetry', []), 1):
-                tunnel_info = {
-                    'tunnel_id': i,
-                    'outside_ip': tunnel.get('OutsideIpAddress'),
-                    'status': tunnel.get('Status'),
-                    'message': tunnel.get('StatusMessage', ''),
-                    'last_change': str(tunnel.get('LastStatusChange', 'N/A'))
-                }
-                results['tunnels'].append(tunnel_info)
-                
-                if tunnel.get('Status', '').upper() == 'UP':
-                    up_tunnels += 1
+            if tunnel.get('Status', '').upper() == 'UP':
+                up_tunnels += 1
+        
+        # Check BGP routes (if using BGP)
+        if not vpn.get('Options', {}).get('StaticRoutesOnly', False):
+            results['bgp_status'] = 'ENABLED'
+            if vpn.get('CustomerGatewayConfiguration'):
+                try:
+                    config = get_gateway_config(vpn_id, vpn['CustomerGatewayConfiguration'])
+                except Exception as e:
+                    results['recommendations'].append(
+                        f"⚠️  Could not parse customer gateway configuration: {e}"
+                    )
+                else:
+                    results['bgp_asn'] = config.customer_asn
+                    results['amazon_asn'] = config.amazon_asn
+                    for tunnel_info in results['tunnels']:
+                        tunnel_config = find_tunnel_config(
+                            config.tunnels, tunnel_info['outside_ip']
+                        )
+                        if tunnel_config:
+                            tunnel_info['bgp_neighbor_ip'] = tunnel_config.bgp_neighbor_ip
+                            tunnel_info['bgp_hold_time'] = tunnel_config.bgp_hold_time
+        
+        # Check accepted BGP prefixes against the per-tunnel limit
+        limit = TGW_PREFIX_LIMIT if vpn.get('TransitGatewayId') else VGW_PREFIX_LIMIT
+        for alert in route_count_alerts(
+            [(t['tunnel_id'], t['status'], t['accepted_route_count']) for t in results['tunnels']],
+            limit
+        ):
+            results['recommendations'].append(f"⚠️  {alert}")
+        
+        # Check route propagation into the VPC route tables
+        if route_tables is not None and vpn.get('VpnGatewayId') in route_tables:
+            tables = route_tables[vpn['VpnGatewayId']]
+            results['route_tables'] = tables
+            results['routes_learned'] = sum(len(t['propagated_routes']) for t in tables)
+            for table in tables:
+                for issue in table['issues']:
+                    results['recommendations'].append(
+                        f"⚠️  {table['route_table_id']}: {issue}"
+                    )
+        
+        # Recommendations
+        if up_tunnels == 0:
+            results['recommendations'].append(
+                "⚠️  All tunnels are DOWN - check customer gateway configuration"
+            )
+        elif up_tunnels == 1:
+            results['recommendations'].append(
+                "⚠️  Only 1 tunnel UP - check redundancy"
+            )
+        else:
+            results['recommendations'].append(
+                "✓ Both tunnels UP - good redundancy"
+            )
+        
+        return results
+    
+    def verify_vpn_connections(
+        self,
+        vpn_ids: List[str],
+        chunk_size: int = DESCRIBE_CHUNK_SIZE
+    ) -> Iterator[Dict]:
+        """
+        Verify many VPN connections with batched API calls.
+        
+        IDs are looked up in chunks with one describe_vpn_connections and one
+        route propagation check per chunk. A vpn-connection-id filter is used
+        rather than VpnConnectionIds so unknown IDs come back as NOT_FOUND
+        instead of failing the whole chunk.
+        
+        Args:
+            vpn_ids: VPN connection IDs
+            chunk_size: IDs per describe call
             
-            # Check BGP routes (if using BGP)
-            if not vpn.get('Options', {}).get('StaticRoutesOnly', False):
-                results['bgp_status'] = 'ENABLED'
-                # Note: Route count requires additional API calls
-                # or parsing of CustomerGatewayConfiguration
+        Yields:
+            Verification results, in the order the IDs were given
+        """
+        vpn_ids = list(dict.fromkeys(vpn_ids))
+        for start in range(0, len(vpn_ids), chunk_size):
+            chunk = vpn_ids[start:start + chunk_size]
             
-            # Recommendations
-            if up_tunnels == 0:
-                results['recommendations'].append(
-                    "⚠️  All tunnels are DOWN - check customer gateway configuration"
-                )
-            elif up_tunnels == 1:
-                results['recommendations'].append(
-                    "⚠️  Only 1 tunnel UP - check redundancy"
-                )
-            else:
-                results['recommendations'].append(
-                    "✓ Both tunnels UP - good redundancy"
+            try:
+                found = {}
+                pages = self._describe_pages(
+                    Filters=[{'Name': 'vpn-connection-id', 'Values': chunk}]
                 )
+                for page in pages:
+                    for vpn in page.get('VpnConnections', []):
+                        found[vpn['VpnConnectionId']] = vpn
+            except Exception as e:
+                for vpn_id in chunk:
+                    results = self._empty_results(vpn_id)
+                    results['overall_status'] = 'ERROR'
+                    results['error'] = str(e)
+                    yield results
+                continue
             
-            return results
+            route_tables, route_error = None, None
+            vgw_ids = [vpn['VpnGatewayId'] for vpn in found.values() if vpn.get('VpnGatewayId')]
+            if vgw_ids:
+                try:
+                    route_tables = self.verify_route_propagation(vgw_ids)
+                except Exception as e:
+                    route_error = str(e)
+            
+            for vpn_id in chunk:
+                if vpn_id not in found:
+                    results = self._empty_results(vpn_id)
+                    results['overall_status'] = 'NOT_FOUND'
+                    yield results
+                    continue
+                
+                try:
+                    results = self._verify_vpn(found[vpn_id], route_tables)
+                except Exception as e:
+                    results = self._empty_results(vpn_id)
+                    results['overall_status'] = 'ERROR'
+                    results['error'] = str(e)
+                if route_error:
+                    results['route_tables_error'] = route_error
+                yield results
+    
+    def verify_vpn_connection(self, vpn_id: str) -> Dict:
+        """
+        Verify a specific VPN connection.
         
-        except Exception as e:
-            results['overall_status'] = 'ERROR'
-            results['error'] = str(e)
-            return results
+        Args:
+            vpn_id: VPN connection ID
+            
+        Returns:
+            Verification results
+        """
+        return next(self.verify_vpn_connections([vpn_id]))
     
     def print_connection_summary(self, conn: VPNConnectionInfo):
         """Print a summary of VPN connection."""
@@ -191,6 +706,8 @@ class VPNVerifier:
         print(f"Type: {conn.type}")
         print(f"Customer Gateway: {conn.customer_gateway_id}")
         print(f"VPN Gateway: {conn.vpn_gateway_id}")
+        if conn.bgp_asn or conn.amazon_asn:
+            print(f"BGP ASN: customer {conn.bgp_asn or 'N/A'}, Amazon {conn.amazon_asn or 'N/A'}")
         
         print("\nTunnels:")
         up_count = 0
@@ -200,9 +717,17 @@ class VPNVerifier:
             print(f"    Outside IP: {tunnel.outside_ip}")
             if tunnel.status_message:
                 print(f"    Message: {tunnel.status_message}")
+            print(f"    Accepted routes: {tunnel.accepted_route_count}/{conn.prefix_limit}")
+            config = find_tunnel_config(conn.tunnel_configs, tunnel.outside_ip)
+            if config and config.bgp_neighbor_ip:
+                print(f"    Inside: {config.customer_inside_cidr} → BGP neighbor "
+                      f"{config.bgp_neighbor_ip} (hold {config.bgp_hold_time}s)")
             if tunnel.status.upper() == "UP":
                 up_count += 1
         
+        for alert in conn.route_alerts:
+            print(f"  ⚠️  {alert}")
+        
         # Overall health
         print(f"\nHealth: {up_count}/2 tunnels UP")
         if up_count == 2:
@@ -213,6 +738,772 @@ class VPNVerifier:
             print("❌ No tunnels UP - no connectivity")
 
 
+@dataclass
+class AccountTarget:
+    """An AWS account to verify, reached via a profile or an assumed role."""
+    label: str
+    profile: Optional[str] = None
+    credentials: Optional[Dict] = field(default=None, repr=False)
+    
+    def session(self) -> boto3.Session:
+        """
+        Create a new session for this account.
+        
+        boto3 sessions are not thread-safe, so every worker gets its own.
+        """
+        if self.credentials:
+            return boto3.Session(
+                aws_access_key_id=self.credentials['AccessKeyId'],
+                aws_secret_access_key=self.credentials['SecretAccessKey'],
+                aws_session_token=self.credentials['SessionToken']
+            )
+        return boto3.Session(profile_name=self.profile)
+
+
+def assume_role_target(role_arn: str, session_name: str = "vpn-verifier") -> AccountTarget:
+    """
+    Assume an IAM role and return it as a verification target.
+    
+    Args:
+        role_arn: ARN of the role to assume
+        session_name: STS role session name
+        
+    Returns:
+        AccountTarget labelled with the role's account ID
+    """
+    response = get_client('sts').assume_role(RoleArn=role_arn, RoleSessionName=session_name)
+    account_id = role_arn.split(':')[4] if role_arn.count(':') >= 5 else role_arn
+    return AccountTarget(label=account_id, credentials=response['Credentials'])
+
+
+def resolve_regions(regions: List[str], session: Optional[boto3.Session] = None) -> List[str]:
+    """
+    Expand a region list, where "all" means every enabled region.
+    
+    Args:
+        regions: Region names or ["all"]
+        session: Session used to list regions
+        
+    Returns:
+        Sorted list of region names
+    """
+    if 'all' not in regions:
+        return sorted(set(regions))
+    
+    ec2 = create_client('ec2', session=session) if session else get_client('ec2')
+    response = ec2.describe_regions()
+    return sorted(r['RegionName'] for r in response.get('Regions', []))
+
+
+def connection_to_dict(conn: VPNConnectionInfo) -> Dict:
+    """JSON-friendly summary of a VPN connection."""
+    tunnels = []
+    for t in conn.tunnels:
+        tunnel = {
+            'tunnel_id': t.tunnel_id,
+            'outside_ip': t.outside_ip,
+            'status': t.status,
+            'accepted_route_count': t.accepted_route_count
+        }
+        config = find_tunnel_config(conn.tunnel_configs, t.outside_ip)
+        if config:
+            tunnel.update({
+                'inside_cidr': config.customer_inside_cidr,
+                'bgp_neighbor_ip': config.bgp_neighbor_ip,
+                'bgp_hold_time': config.bgp_hold_time,
+                'ike': config.ike,
+                'ipsec': config.ipsec
+            })
+        tunnels.append(tunnel)
+    
+    return {
+        'vpn_id': conn.vpn_id,
+        'state': conn.state,
+        'bgp_asn': conn.bgp_asn,
+        'amazon_asn': conn.amazon_asn,
+        'tunnels': tunnels,
+        'prefix_limit': conn.prefix_limit,
+        'route_alerts': conn.route_alerts
+    }
+
+
+def check_region(account: AccountTarget, region: str, **filters) -> Dict:
+    """
+    List VPN connections for one account/region and time the query.
+    
+    Args:
+        account: Account to query
+        region: AWS region
+        **filters: Passed to VPNVerifier.get_vpn_connections
+        
+    Returns:
+        Per-region result with latency and connections
+    """
+    started = time.perf_counter()
+    result = {'account': account.label, 'region': region, 'connections': [], 'error': None}
+    
+    try:
+        verifier = VPNVerifier(region=region, session=account.session())
+        for conn in verifier.get_vpn_connections(raise_errors=True, **filters):
+            result['connections'].append(connection_to_dict(conn))
+    except Exception as e:
+        result['error'] = str(e)
+    
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def verify_estate(
+    accounts: List[AccountTarget],
+    regions: List[str],
+    max_workers: int = 16,
+    **filters
+) -> Dict:
+    """
+    Check VPN connections across accounts and regions concurrently.
+    
+    Args:
+        accounts: Accounts to check
+        regions: Regions to check in every account
+        max_workers: Thread pool size
+        **filters: Passed to VPNVerifier.get_vpn_connections
+        
+    Returns:
+        Merged report with per-region results and totals
+    """
+    started = time.perf_counter()
+    jobs = [(account, region) for account in accounts for region in regions]
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        results = list(executor.map(
+            lambda job: check_region(job[0], job[1], **filters), jobs
+        ))
+    
+    tunnels = [t for r in results for c in r['connections'] for t in c['tunnels']]
+    return {
+        'results': results,
+        'summary': {
+            'accounts': len(accounts),
+            'regions': len(regions),
+            'connections': sum(len(r['connections']) for r in results),
+            'tunnels_up': sum(1 for t in tunnels if str(t['status']).upper() == 'UP'),
+            'tunnels_total': len(tunnels),
+            'errors': sum(1 for r in results if r['error']),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+    }
+
+
+def print_estate_report(report: Dict):
+    """Print a multi-region, multi-account report."""
+    for result in report['results']:
+        if not result['connections'] and not result['error']:
+            continue
+        
+        header = f"{result['account']} / {result['region']} ({result['latency_ms']:.0f} ms)"
+        print(f"\n{header}")
+        if result['error']:
+            print(f"  ❌ {result['error']}")
+        for conn in result['connections']:
+            up = sum(1 for t in conn['tunnels'] if str(t['status']).upper() == 'UP')
+            icon = "✓" if up == len(conn['tunnels']) and up else ("⚠️ " if up else "✗")
+            print(f"  {icon} {conn['vpn_id']}  {conn['state']}  {up}/{len(conn['tunnels'])} tunnels UP")
+    
+    summary = report['summary']
+    slowest = max(report['results'], key=lambda r: r['latency_ms'], default=None)
+    print(f"\n{'='*60}")
+    print(f"Checked {summary['accounts']} account(s) x {summary['regions']} region(s) "
+          f"in {summary['elapsed_ms'] / 1000:.1f}s")
+    print(f"Connections: {summary['connections']}  "
+          f"Tunnels UP: {summary['tunnels_up']}/{summary['tunnels_total']}  "
+          f"Errors: {summary['errors']}")
+    if slowest:
+        print(f"Slowest: {slowest['account']} / {slowest['region']} ({slowest['latency_ms']:.0f} ms)")
+
+
+@dataclass
+class TunnelState:
+    """Last known state of a tunnel in monitor mode."""
+    vpn_id: str
+    tunnel_id: int
+    outside_ip: str
+    status: str
+    status_message: str
+    last_status_change: Optional[datetime]
+    first_seen: float
+    flaps: int = 0
+    accepted_route_count: int = 0
+
+
+class VPNMonitor:
+    """Poll tunnel telemetry and report only state transitions."""
+    
+    def __init__(
+        self,
+        verifier: VPNVerifier,
+        interval: float = 30.0,
+        jitter: float = 0.1,
+        store: Optional[TelemetryStore] = None,
+        **filters
+    ):
+        """
+        Initialize the monitor.
+        
+        Args:
+            verifier: Verifier used to fetch connections
+            interval: Seconds between polls
+            jitter: Random +/- fraction applied to each interval
+            store: Telemetry history to append every poll to
+            **filters: Passed to VPNVerifier.get_vpn_connections
+        """
+        self.verifier = verifier
+        self.interval = interval
+        self.jitter = jitter
+        self.store = store
+        self.filters = filters
+        self.tunnels: Dict[tuple, TunnelState] = {}
+        self.polls = 0
+        self.poll_errors = 0
+        self.last_poll: Optional[float] = None
+        self.last_poll_duration = 0.0
+        self._lock = threading.Lock()
+    
+    def poll(self) -> List[Dict]:
+        """
+        Fetch telemetry once and diff it against the last known state.
+        
+        Returns:
+            Transition events (empty when nothing changed)
+        """
+        started = time.perf_counter()
+        now = time.time()
+        events = []
+        seen = set()
+        
+        try:
+            connections = list(self.verifier.get_vpn_connections(raise_errors=True, **self.filters))
+        except Exception as e:
+            with self._lock:
+                self.poll_errors += 1
+            return [{'event': 'poll_error', 'error': str(e)}]
+        
+        with self._lock:
+            for conn in connections:
+                for tunnel in conn.tunnels:
+                    key = (conn.vpn_id, tunnel.outside_ip)
+                    seen.add(key)
+                    previous = self.tunnels.get(key)
+                    
+                    if previous is None:
+                        self.tunnels[key] = TunnelState(
+                            vpn_id=conn.vpn_id,
+                            tunnel_id=tunnel.tunnel_id,
+                            outside_ip=tunnel.outside_ip,
+                            status=tunnel.status,
+                            status_message=tunnel.status_message,
+                            last_status_change=tunnel.last_status_change,
+                            first_seen=now,
+                            accepted_route_count=tunnel.accepted_route_count
+                        )
+                        if self.polls:
+                            events.append(self._event('added', self.tunnels[key]))
+                        continue
+                    
+                    changes = {}
+                    if tunnel.status != previous.status:
+                        changes['status'] = (previous.status, tunnel.status)
+                        previous.flaps += 1
+                    elif (tunnel.last_status_change and previous.last_status_change
+                          and tunnel.last_status_change != previous.last_status_change):
+                        # Status flipped and back between polls
+                        changes['last_status_change'] = (
+                            str(previous.last_status_change), str(tunnel.last_status_change)
+                        )
+                        previous.flaps += 1
+                    if tunnel.status_message != previous.status_message:
+                        changes['status_message'] = (previous.status_message, tunnel.status_message)
+                    
+                    previous.status = tunnel.status
+                    previous.status_message = tunnel.status_message
+                    previous.accepted_route_count = tunnel.accepted_route_count
+                    previous.last_status_change = tunnel.last_status_change or previous.last_status_change
+                    
+                    if changes:
+                        events.append(self._event('changed', previous, changes))
+            
+            for key in list(self.tunnels):
+                if key not in seen:
+                    events.append(self._event('removed', self.tunnels.pop(key)))
+            
+            self.polls += 1
+            self.last_poll = now
+            self.last_poll_duration = time.perf_counter() - started
+            
+            if self.store:
+                self.store.record(
+                    (t.vpn_id, t.outside_ip, now, t.status.upper() == 'UP')
+                    for t in self.tunnels.values()
+                )
+        
+        return events
+    
+    @staticmethod
+    def _event(kind: str, tunnel: TunnelState, changes: Optional[Dict] = None) -> Dict:
+        """Build a transition event."""
+        event = {
+            'event': kind,
+            'time': datetime.now(timezone.utc).isoformat(),
+            'vpn_id': tunnel.vpn_id,
+            'tunnel_id': tunnel.tunnel_id,
+            'outside_ip': tunnel.outside_ip,
+            'status': tunnel.status,
+            'status_message': tunnel.status_message
+        }
+        if changes:
+            event['changes'] = changes
+        return event
+    
+    def seconds_since_change(self, tunnel: TunnelState, now: Optional[float] = None) -> float:
+        """Seconds since the tunnel last changed state."""
+        now = now or time.time()
+        changed = tunnel.last_status_change
+        if isinstance(changed, datetime):
+            if changed.tzinfo is None:
+                changed = changed.replace(tzinfo=timezone.utc)
+            return max(0.0, now - changed.timestamp())
+        return max(0.0, now - tunnel.first_seen)
+    
+    def render_metrics(self) -> str:
+        """Render current state in Prometheus text exposition format."""
+        now = time.time()
+        lines = [
+            '# HELP vpn_tunnel_up Whether the tunnel is UP (1) or not (0).',
+            '# TYPE vpn_tunnel_up gauge',
+        ]
+        with self._lock:
+            tunnels = list(self.tunnels.values())
+            polls, errors = self.polls, self.poll_errors
+            last_poll, duration = self.last_poll, self.last_poll_duration
+        
+        def labels(t):
+            return f'vpn_id="{t.vpn_id}",tunnel="{t.tunnel_id}",outside_ip="{t.outside_ip}"'
+        
+        for t in tunnels:
+            lines.append(f'vpn_tunnel_up{{{labels(t)}}} {1 if t.status.upper() == "UP" else 0}')
+        
+        lines += [
+            '# HELP vpn_tunnel_seconds_since_change Seconds since the last tunnel state change.',
+            '# TYPE vpn_tunnel_seconds_since_change gauge',
+        ]
+        for t in tunnels:
+            lines.append(
+                f'vpn_tunnel_seconds_since_change{{{labels(t)}}} {self.seconds_since_change(t, now):.0f}'
+            )
+        
+        lines += [
+            '# HELP vpn_tunnel_flaps_total Tunnel state changes observed by this monitor.',
+            '# TYPE vpn_tunnel_flaps_total counter',
+        ]
+        for t in tunnels:
+            lines.append(f'vpn_tunnel_flaps_total{{{labels(t)}}} {t.flaps}')
+        
+        lines += [
+            '# HELP vpn_tunnel_accepted_routes BGP routes accepted on the tunnel.',
+            '# TYPE vpn_tunnel_accepted_routes gauge',
+        ]
+        for t in tunnels:
+            lines.append(f'vpn_tunnel_accepted_routes{{{labels(t)}}} {t.accepted_route_count}')
+        
+        up = sum(1 for t in tunnels if t.status.upper() == 'UP')
+        lines += [
+            '# HELP vpn_tunnels_up Number of tunnels currently UP.',
+            '# TYPE vpn_tunnels_up gauge',
+            f'vpn_tunnels_up {up}',
+            '# HELP vpn_tunnels_total Number of tunnels being monitored.',
+            '# TYPE vpn_tunnels_total gauge',
+            f'vpn_tunnels_total {len(tunnels)}',
+            '# HELP vpn_monitor_polls_total Completed telemetry polls.',
+            '# TYPE vpn_monitor_polls_total counter',
+            f'vpn_monitor_polls_total {polls}',
+            '# HELP vpn_monitor_poll_errors_total Failed telemetry polls.',
+            '# TYPE vpn_monitor_poll_errors_total counter',
+            f'vpn_monitor_poll_errors_total {errors}',
+            '# HELP vpn_monitor_poll_duration_seconds Duration of the last poll.',
+            '# TYPE vpn_monitor_poll_duration_seconds gauge',
+            f'vpn_monitor_poll_duration_seconds {duration:.3f}',
+            '# HELP vpn_monitor_last_poll_timestamp_seconds Time of the last poll.',
+            '# TYPE vpn_monitor_last_poll_timestamp_seconds gauge',
+            f'vpn_monitor_last_poll_timestamp_seconds {last_poll or 0:.0f}',
+        ]
+        return '\n'.join(lines) + '\n'
+    
+    def serve_metrics(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Serve /metrics from a background thread.
+        
+        Args:
+            port: TCP port (0 picks a free one)
+            host: Bind address (default: localhost only)
+            
+        Returns:
+            The running server
+        """
+        monitor = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = monitor.render_metrics().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    
+    def next_delay(self) -> float:
+        """Poll interval with jitter, so many monitors don't poll in lockstep."""
+        return max(1.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+    
+    def run(self, as_json: bool = False):
+        """Poll forever, printing transitions as they happen."""
+        self.poll()
+        with self._lock:
+            tunnels = list(self.tunnels.values())
+        up = sum(1 for t in tunnels if t.status.upper() == 'UP')
+        print(f"👀 Monitoring {len(tunnels)} tunnel(s), {up} UP "
+              f"(every ~{self.interval:.0f}s, Ctrl+C to stop)")
+        
+        try:
+            while True:
+                time.sleep(self.next_delay())
+                for event in self.poll():
+                    if as_json:
+                        print(json.dumps(event), flush=True)
+                    else:
+                        print_monitor_event(event)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped monitoring")
+
+
+def print_monitor_event(event: Dict):
+    """Print one monitor event."""
+    stamp = time.strftime('%H:%M:%S')
+    if event['event'] == 'poll_error':
+        print(f"[{stamp}] ❌ Poll failed: {event['error']}")
+        return
+    
+    tunnel = f"{event['vpn_id']} tunnel {event['tunnel_id']} ({event['outside_ip']})"
+    if event['event'] == 'added':
+        print(f"[{stamp}] ➕ {tunnel}: {event['status']}")
+    elif event['event'] == 'removed':
+        print(f"[{stamp}] ➖ {tunnel}: no longer reported")
+    else:
+        for field_name, (old, new) in event['changes'].items():
+            icon = "✓" if field_name == 'status' and str(new).upper() == 'UP' else "⚠️ "
+            print(f"[{stamp}] {icon} {tunnel}: {field_name} {old or '-'} → {new or '-'}")
+
+
+@dataclass
+class ProbeTarget:
+    """A host behind a tunnel to probe."""
+    tunnel: str
+    host: str
+    port: int
+    protocol: str = 'tcp'
+
+
+@dataclass
+class ProbeStats:
+    """Probe results for one target."""
+    target: ProbeTarget
+    sent: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+    
+    @property
+    def received(self) -> int:
+        """Probes that got an answer."""
+        return len(self.latencies_ms)
+    
+    @property
+    def loss_pct(self) -> float:
+        """Percentage of probes without an answer."""
+        return 100.0 * (self.sent - self.received) / self.sent if self.sent else 0.0
+    
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile in ms (linear interpolation)."""
+        if not self.latencies_ms:
+            return None
+        ordered = sorted(self.latencies_ms)
+        rank = (len(ordered) - 1) * pct / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+    
+    @property
+    def jitter_ms(self) -> float:
+        """Mean absolute difference between consecutive latencies."""
+        pairs = list(zip(self.latencies_ms, self.latencies_ms[1:]))
+        return sum(abs(b - a) for a, b in pairs) / len(pairs) if pairs else 0.0
+    
+    def to_dict(self) -> Dict:
+        """JSON-friendly summary."""
+        return {
+            'tunnel': self.target.tunnel,
+            'target': f"{self.target.host}:{self.target.port}/{self.target.protocol}",
+            'sent': self.sent,
+            'received': self.received,
+            'loss_pct': round(self.loss_pct, 1),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'jitter_ms': round(self.jitter_ms, 3),
+            'error': self.error
+        }
+
+
+def parse_probe_target(spec: str) -> ProbeTarget:
+    """
+    Parse a probe target of the form ``[TUNNEL=]HOST:PORT[/tcp|udp]``.
+    
+    Args:
+        spec: Target specification (e.g. "vpn-123/1=10.1.0.10:22/tcp")
+        
+    Returns:
+        ProbeTarget (tunnel defaults to HOST)
+    """
+    tunnel, _, rest = spec.rpartition('=')
+    address, _, protocol = rest.partition('/')
+    host, _, port = address.rpartition(':')
+    protocol = (protocol or 'tcp').lower()
+    if not host or not port.isdigit() or protocol not in ('tcp', 'udp'):
+        raise ValueError(f"Invalid probe target '{spec}' (expected [TUNNEL=]HOST:PORT[/tcp|udp])")
+    return ProbeTarget(tunnel=tunnel or host, host=host, port=int(port), protocol=protocol)
+
+
+async def tcp_probe(host: str, port: int, timeout: float) -> Optional[float]:
+    """
+    Time a TCP connect.
+    
+    Returns:
+        Connect latency in ms, or None on timeout/refusal
+    """
+    started = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    latency = (time.perf_counter() - started) * 1000
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return latency
+
+
+class _UDPEchoClient(asyncio.DatagramProtocol):
+    """Match UDP echo replies to outstanding probes by sequence number."""
+    
+    def __init__(self):
+        self.pending: Dict[int, asyncio.Future] = {}
+    
+    def datagram_received(self, data, addr):
+        try:
+            seq = int(data.split(b':', 1)[0])
+        except ValueError:
+            return
+        future = self.pending.pop(seq, None)
+        if future and not future.done():
+            future.set_result(time.perf_counter())
+    
+    def error_received(self, exc):
+        # ICMP port unreachable etc.; the probes will time out
+        pass
+
+
+async def probe_target(
+    target: ProbeTarget,
+    count: int = 20,
+    rate: float = 5.0,
+    timeout: float = 1.0
+) -> ProbeStats:
+    """
+    Probe one target at a fixed rate.
+    
+    Probes are launched on schedule regardless of how long earlier ones
+    take, so slow replies don't lower the probe rate.
+    
+    Args:
+        target: Target to probe
+        count: Number of probes
+        rate: Probes per second
+        timeout: Seconds to wait for each answer
+        
+    Returns:
+        ProbeStats for the target
+    """
+    loop = asyncio.get_running_loop()
+    stats = ProbeStats(target=target)
+    transport = protocol = None
+    
+    if target.protocol == 'udp':
+        try:
+            transport, protocol = await loop.create_datagram_endpoint(
+                _UDPEchoClient, remote_addr=(target.host, target.port)
+            )
+        except OSError as e:
+            # Unresolvable or unroutable; count every probe as lost
+            stats.sent = count
+            stats.error = str(e)
+            return stats
+    
+    async def udp_probe(seq: int) -> Optional[float]:
+        future = loop.create_future()
+        protocol.pending[seq] = future
+        started = time.perf_counter()
+        transport.sendto(f"{seq}:vpn-probe".encode())
+        try:
+            return (await asyncio.wait_for(future, timeout) - started) * 1000
+        except asyncio.TimeoutError:
+            protocol.pending.pop(seq, None)
+            return None
+    
+    async def scheduled(seq: int) -> Optional[float]:
+        await asyncio.sleep(max(0.0, start + seq / rate - loop.time()))
+        stats.sent += 1
+        if target.protocol == 'udp':
+            return await udp_probe(seq)
+        return await tcp_probe(target.host, target.port, timeout)
+    
+    start = loop.time()
+    try:
+        results = await asyncio.gather(*(scheduled(seq) for seq in range(count)))
+    finally:
+        if transport:
+            transport.close()
+    
+    stats.latencies_ms = [r for r in results if r is not None]
+    return stats
+
+
+async def probe_tunnels(
+    targets: List[ProbeTarget],
+    count: int = 20,
+    rate: float = 5.0,
+    timeout: float = 1.0
+) -> List[ProbeStats]:
+    """Probe all targets concurrently."""
+    return list(await asyncio.gather(
+        *(probe_target(target, count, rate, timeout) for target in targets)
+    ))
+
+
+def print_probe_report(results: List[ProbeStats]):
+    """Print latency and loss per tunnel."""
+    def fmt(value):
+        return f"{value:.1f}" if value is not None else "-"
+    
+    print(f"\n{'Tunnel':<24} {'Target':<28} {'Loss':>6} {'p50':>7} {'p95':>7} "
+          f"{'p99':>7} {'Jitter':>7}")
+    for stats in sorted(results, key=lambda s: s.target.tunnel):
+        row = stats.to_dict()
+        icon = "✓" if stats.loss_pct == 0 else ("⚠️ " if stats.received else "❌")
+        print(f"{row['tunnel']:<24} {row['target']:<28} {row['loss_pct']:>5.1f}% "
+              f"{fmt(row['p50_ms']):>7} {fmt(row['p95_ms']):>7} {fmt(row['p99_ms']):>7} "
+              f"{row['jitter_ms']:>7.2f} {icon}")
+        if stats.error:
+            print(f"{'':<24} {stats.error}")
+    print("\n(latency in ms)")
+
+
+def record_history(
+    connections: Iterator[VPNConnectionInfo],
+    store: TelemetryStore
+) -> Iterator[VPNConnectionInfo]:
+    """Pass connections through, appending their tunnel state to the history."""
+    now = time.time()
+    for conn in connections:
+        store.record(
+            (conn.vpn_id, t.outside_ip, now, t.status.upper() == 'UP') for t in conn.tunnels
+        )
+        yield conn
+
+
+def history_samples(
+    connections: Iterable[Dict],
+    timestamp: float
+) -> Iterator[Tuple[str, str, float, bool]]:
+    """
+    Telemetry store samples from JSON connection or verification results.
+    
+    Args:
+        connections: Dicts with 'vpn_id' and 'tunnels' (outside_ip, status)
+        timestamp: Sample time for every tunnel
+        
+    Yields:
+        (vpn_id, outside_ip, timestamp, is_up) tuples
+    """
+    for conn in connections:
+        for tunnel in conn['tunnels']:
+            if tunnel.get('outside_ip'):
+                yield (conn['vpn_id'], tunnel['outside_ip'], timestamp,
+                       str(tunnel['status']).upper() == 'UP')
+
+
+def read_vpn_ids(path: str) -> List[str]:
+    """
+    Read VPN connection IDs from a file.
+    
+    Blank lines and ``#`` comments are ignored; '-' reads stdin.
+    """
+    handle = sys.stdin if path == '-' else open(path)
+    try:
+        return [
+            line.split('#', 1)[0].strip() for line in handle
+            if line.split('#', 1)[0].strip()
+        ]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def print_verification_result(results: Dict):
+    """Print one verify_vpn_connection result."""
+    print(f"\nVPN Connection: {results['vpn_id']}")
+    print(f"Status: {results['overall_status']}")
+    if results.get('error'):
+        print(f"Error: {results['error']}")
+    
+    if results['tunnels']:
+        print("\nTunnels:")
+    for tunnel in results['tunnels']:
+        status_icon = "✓" if (tunnel['status'] or '').upper() == "UP" else "✗"
+        print(f"  Tunnel {tunnel['tunnel_id']}: {status_icon} {tunnel['status']}")
+        print(f"    Outside IP: {tunnel['outside_ip']}")
+    
+    if 'route_tables' in results:
+        print(f"\nRoutes learned: {results['routes_learned']}")
+        for table in results['route_tables']:
+            icon = "⚠️ " if table['issues'] else "✓"
+            print(f"  {icon} {table['route_table_id']}: "
+                  f"{len(table['propagated_routes'])} propagated route(s)")
+    
+    if results['recommendations']:
+        print("\nRecommendations:")
+        for rec in results['recommendations']:
+            print(f"  {rec}")
+
+
 def main():
     """Main verification function."""
     import argparse
@@ -225,70 +1516,251 @@ def main():
         default='us-east-1',
         help='AWS region (default: us-east-1)'
     )
+    parser.add_argument(
+        '--stack',
+        default=os.environ.get('LAB_STACK'),
+        help="Target stack; 'local' checks LocalStack (default: $LAB_STACK)"
+    )
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help='Print AWS client creation and API call timing on exit'
+    )
     parser.add_argument(
         '--vpn-id',
-        help='Specific VPN connection ID to check'
+        action='append',
+        default=[],
+        help='VPN connection ID to check (repeatable)'
+    )
+    parser.add_argument(
+        '--vpn-ids-file',
+        help="File of VPN connection IDs, one per line ('-' for stdin)"
     )
     parser.add_argument(
         '--json',
         action='store_true',
         help='Output in JSON format'
     )
+    parser.add_argument(
+        '--state',
+        action='append',
+        help='Only list connections in this state (repeatable)'
+    )
+    parser.add_argument(
+        '--vgw',
+        action='append',
+        help='Only list connections on this VPN gateway ID (repeatable)'
+    )
+    parser.add_argument(
+        '--tag',
+        action='append',
+        default=[],
+        metavar='KEY=VALUE',
+        help='Only list connections with this tag (repeatable)'
+    )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        '--regions',
+        help='Comma-separated regions to check concurrently, or "all"'
+    )
+    parser.add_argument(
+        '--profiles',
+        help='Comma-separated AWS profiles (accounts) to check'
+    )
+    parser.add_argument(
+        '--role-arns',
+        help='Comma-separated IAM role ARNs to assume (accounts) to check'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep polling and report only tunnel state transitions'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=30.0,
+        help='Seconds between polls in watch mode (default: 30)'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=9877,
+        help='Serve Prometheus metrics on localhost in watch mode (0 = any free port, default: 9877)'
+    )
+    parser.add_argument(
+        '--no-metrics',
+        action='store_true',
+        help='Do not serve Prometheus metrics in watch mode'
+    )
+    parser.add_argument(
+        '--history',
+        nargs='?',
+        const=DEFAULT_DB,
+        metavar='DB',
+        help='Record tunnel samples to the telemetry history (default DB: .stack-cache/telemetry.db)'
+    )
+    parser.add_argument(
+        '--probe',
+        action='append',
+        default=[],
+        metavar='[TUNNEL=]HOST:PORT[/tcp|udp]',
+        help='Probe a target behind a tunnel (repeatable); UDP targets must echo'
+    )
+    parser.add_argument(
+        '--probe-count',
+        type=int,
+        default=20,
+        help='Probes per target (default: 20)'
+    )
+    parser.add_argument(
+        '--probe-rate',
+        type=float,
+        default=5.0,
+        help='Probes per second per target (default: 5)'
+    )
+    parser.add_argument(
+        '--probe-timeout',
+        type=float,
+        default=1.0,
+        help='Seconds to wait for each probe (default: 1)'
+    )
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=16,
+        help='Concurrent region/account queries (default: 16)'
+    )
     
-    verifier = VPNVerifier(region=args.region)
+    args = parser.parse_args()
+    for tag in args.tag:
+        if '=' not in tag:
+            parser.error(f"--tag expects KEY=VALUE, got '{tag}'")
+    tags = dict(tag.split('=', 1) for tag in args.tag)
     
-    print(f"🔍 Checking VPN connections in {args.region}...")
+    if args.timings:
+        def report_timings():
+            print("\n⏱️  AWS clients:", file=sys.stderr)
+            print_client_stats(write=lambda line: print(line, file=sys.stderr))
+        atexit.register(report_timings)
     
-    if args.vpn_id:
-        # Check specific VPN
-        results = verifier.verify_vpn_connection(args.vpn_id)
+    if args.regions or args.profiles or args.role_arns:
+        # Multi-region / multi-account check
+        accounts = [
+            AccountTarget(label=profile, profile=profile)
+            for profile in (args.profiles or '').split(',') if profile
+        ]
+        accounts += [
+            assume_role_target(arn) for arn in (args.role_arns or '').split(',') if arn
+        ]
+        if not accounts:
+            accounts = [AccountTarget(label='default')]
+        
+        regions = resolve_regions(
+            (args.regions or args.region).split(','), accounts[0].session()
+        )
+        print(f"🔍 Checking VPN connections in {len(regions)} region(s) "
+              f"across {len(accounts)} account(s)...",
+              file=sys.stderr if args.json else sys.stdout)
+        
+        report = verify_estate(
+            accounts, regions, args.max_workers,
+            states=args.state, vpn_gateway_ids=args.vgw, tags=tags
+        )
+        if args.history:
+            TelemetryStore(args.history).record(history_samples(
+                (conn for result in report['results'] for conn in result['connections']),
+                time.time()
+            ))
         
         if args.json:
-            print(json.dumps(results, indent=2))
+            print(json.dumps(report, indent=2))
         else:
-            print(f"\nVPN Connection: {results['vpn_id']}")
-            print(f"Status: {results['overall_status']}")
-            print("\nTunnels:")
-            for tunnel in results['tunnels']:
-                status_icon = "✓" if tunnel['status'].upper() == "UP" else "✗"
-                print(f"  Tunnel {tunnel['tunnel_id']}: {status_icon} {tunnel['status']}")
-                print(f"    Outside IP: {tunnel['outside_ip']}")
-            
-            if results['recommendations']:
-                print("\nRecommendations:")
-                for rec in results['recommendations']:
-                    print(f"  {rec}")
+            print_estate_report(report)
+        return 1 if report['summary']['errors'] else 0
+    
+    if args.probe:
+        # Data-plane check through the tunnels
+        try:
+            targets = [parse_probe_target(spec) for spec in args.probe]
+        except ValueError as e:
+            parser.error(str(e))
+        results = asyncio.run(probe_tunnels(
+            targets, args.probe_count, args.probe_rate, args.probe_timeout
+        ))
+        if args.json:
+            print(json.dumps([r.to_dict() for r in results], indent=2))
+        else:
+            print_probe_report(results)
+        return 1 if any(r.received == 0 for r in results) else 0
+    
+    verifier = VPNVerifier(region=args.region, stack=args.stack)
+    
+    if args.watch:
+        monitor = VPNMonitor(
+            verifier, args.interval,
+            store=TelemetryStore(args.history) if args.history else None,
+            states=args.state, vpn_gateway_ids=args.vgw, tags=tags
+        )
+        if not args.no_metrics:
+            try:
+                server = monitor.serve_metrics(args.metrics_port)
+            except OSError as e:
+                print(f"❌ Cannot serve metrics on port {args.metrics_port}: {e.strerror or e}\n"
+                      f"   Use --metrics-port to pick another port (0 = any free port) "
+                      f"or --no-metrics", file=sys.stderr)
+                return 1
+            print(f"📈 Metrics at http://127.0.0.1:{server.server_address[1]}/metrics",
+                  file=sys.stderr if args.json else sys.stdout)
+        monitor.run(as_json=args.json)
+        return 0
+    
+    print(f"🔍 Checking VPN connections in {args.region}...",
+          file=sys.stderr if args.json else sys.stdout)
+    
+    if args.vpn_ids_file:
+        args.vpn_id += read_vpn_ids(args.vpn_ids_file)
+    
+    if args.vpn_id:
+        # Check specific VPNs, batched into multi-ID describe calls
+        failed = 0
+        store = TelemetryStore(args.history) if args.history else None
+        for results in verifier.verify_vpn_connections(args.vpn_id):
+            if results['overall_status'] in ('NOT_FOUND', 'ERROR'):
+                failed += 1
+            if store:
+                store.record(history_samples([results], time.time()))
+            if args.json:
+                print(json.dumps(results), flush=True)
+            else:
+                print_verification_result(results)
+        return 1 if failed else 0
     else:
         # List all VPNs
-        connections = verifier.get_vpn_connections()
-        
-        if not connections:
-            print("❌ No VPN connections found")
-            return 1
+        connections = verifier.get_vpn_connections(
+            states=args.state,
+            vpn_gateway_ids=args.vgw,
+            tags=tags
+        )
+        if args.history:
+            connections = record_history(connections, TelemetryStore(args.history))
         
         if args.json:
-            output = [
-                {
-                    'vpn_id': conn.vpn_id,
-                    'state': conn.state,
-                    'tunnels': [
-                        {
-                            'tunnel_id': t.tunnel_id,
-                            'outside_ip': t.outside_ip,
-                            'status': t.status
-                        }
-                        for t in conn.tunnels
-                    ]
-                }
-                for conn in connections
-            ]
+            output = [connection_to_dict(conn) for conn in connections]
             print(json.dumps(output, indent=2))
+            if not output:
+                print("❌ No VPN connections found", file=sys.stderr)
+                return 1
         else:
-            print(f"\nFound {len(connections)} VPN connection(s):")
+            count = 0
             for conn in connections:
                 verifier.print_connection_summary(conn)
+                count += 1
+            
+            if not count:
+                print("❌ No VPN connections found")
+                return 1
+            print(f"\nFound {count} VPN connection(s)")
     
     return 0
 
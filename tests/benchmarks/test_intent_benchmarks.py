@@ -0,0 +1,126 @@
+"""
+Benchmarks for intent validation and serialization at scale.
+
+Run with pytest-benchmark (skipped in the normal test run):
+
+    pytest tests/benchmarks --benchmark-only --no-cov --benchmark-compare
+
+Baselines live in tests/benchmarks/baselines, one directory per
+interpreter (``Linux-CPython-3.13-64bit``, the project's target, plus
+``Linux-CPython-3.11-64bit``); a run compares against the newest file for
+the running interpreter only, and refuses to run if there is none. A run
+fails if any mean regresses more than --benchmark-threshold percent
+(default: 25, or $LAB_BENCHMARK_THRESHOLD). Timings are only comparable on
+similar hardware: refresh the baseline after intended changes, or on a new
+CI runner, with ``--benchmark-save=baseline``.
+"""
+
+import ipaddress
+from itertools import islice
+
+import pytest
+import yaml
+
+from models.aws_intent import (
+    AWSNetworkIntent,
+    CustomerGatewayIntent,
+    SubnetIntent,
+    VPCIntent,
+    VPNIntent,
+)
+
+pytest.importorskip("pytest_benchmark")
+
+SUBNET_COUNTS = [10, 100, 1_000, 10_000]
+AZS = ["us-east-1a", "us-east-1b", "us-east-1c"]
+
+
+def intent_data(subnets, static_routes=None):
+    """
+    Intent dict with ``subnets`` subnets and as many static VPN routes.
+
+    Subnets are carved from a /16 as small as needed to fit.
+    """
+    static_routes = subnets if static_routes is None else static_routes
+    vpc = ipaddress.ip_network("10.0.0.0/16")
+    prefix = max(24, 16 + (subnets - 1).bit_length())
+    routes = ipaddress.ip_network("100.64.0.0/10").subnets(new_prefix=26)
+    return {
+        "project_name": "bench",
+        "vpc": {
+            "cidr_block": str(vpc),
+            "subnets": [
+                {
+                    "name": f"subnet-{i}",
+                    "cidr_block": str(cidr),
+                    "availability_zone": AZS[i % len(AZS)],
+                    "public": i % 2 == 0,
+                }
+                for i, cidr in enumerate(islice(vpc.subnets(new_prefix=prefix), subnets))
+            ],
+        },
+        "vpn": {
+            "enabled": True,
+            "customer_gateway": {"ip_address": "203.0.113.1", "bgp_asn": 65000},
+            "static_routes_only": True,
+            "static_routes": [str(cidr) for cidr in islice(routes, static_routes)],
+        },
+    }
+
+
+@pytest.fixture(params=SUBNET_COUNTS, ids=lambda n: f"{n}-subnets")
+def data(request):
+    return intent_data(request.param)
+
+
+@pytest.mark.benchmark(group="construct")
+def test_construct(benchmark, data):
+    """Build an intent from model constructors, as Python callers do."""
+    def construct():
+        return AWSNetworkIntent(
+            project_name=data["project_name"],
+            vpc=VPCIntent(
+                cidr_block=data["vpc"]["cidr_block"],
+                subnets=[SubnetIntent(**subnet) for subnet in data["vpc"]["subnets"]],
+            ),
+            vpn=VPNIntent(
+                enabled=True,
+                customer_gateway=CustomerGatewayIntent(**data["vpn"]["customer_gateway"]),
+                static_routes_only=True,
+                static_routes=data["vpn"]["static_routes"],
+            ),
+        )
+
+    intent = benchmark(construct)
+    assert len(intent.vpc.subnets) == len(data["vpc"]["subnets"])
+
+
+@pytest.mark.benchmark(group="validate-dict")
+def test_validate_dict(benchmark, data):
+    intent = benchmark(AWSNetworkIntent.model_validate, data)
+    assert len(intent.vpn.static_routes) == len(data["vpn"]["static_routes"])
+
+
+@pytest.mark.benchmark(group="validate-yaml")
+def test_validate_yaml(benchmark, data, tmp_path):
+    path = tmp_path / "intent.yaml"
+    path.write_text(yaml.safe_dump({"network": data}))
+
+    intent = benchmark(AWSNetworkIntent.from_yaml, path)
+    assert intent.project_name == "bench"
+
+
+@pytest.mark.benchmark(group="dump")
+def test_model_dump(benchmark, data):
+    intent = AWSNetworkIntent.model_validate(data)
+
+    dumped = benchmark(intent.model_dump)
+    assert len(dumped["vpc"]["subnets"]) == len(data["vpc"]["subnets"])
+
+
+@pytest.mark.benchmark(group="pulumi-config")
+def test_to_pulumi_config(benchmark, data):
+    intent = AWSNetworkIntent.model_validate(data)
+
+    config = benchmark(intent.to_pulumi_config)
+    assert config["enable_vpn"] is True
@@ -0,0 +1,30 @@
+"""
+Benchmarks for synthetic fleet generation.
+
+Run with the intent benchmarks; see test_intent_benchmarks for the
+baseline and regression threshold.
+"""
+
+import pytest
+
+from models.synthetic import generate_fleet
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.benchmark(group="synthetic")
+def test_generate_100k_subnets(benchmark):
+    """Generate 25 VPCs with 100k+ subnets between them."""
+    fleet = benchmark.pedantic(
+        generate_fleet, kwargs={"vpcs": 25, "subnets_per_tier": 445}, rounds=3
+    )
+    assert sum(len(s.data["vpc"]["subnets"]) for s in fleet) > 100_000
+
+
+@pytest.mark.benchmark(group="synthetic")
+def test_to_intent(benchmark):
+    """Validate one synthetic VPC with 1,000+ subnets."""
+    synthetic = generate_fleet(vpcs=1, subnets_per_tier=120, static_routes=100)[0]
+
+    intent = benchmark(synthetic.to_intent)
+    assert len(intent.vpc.subnets) > 1000
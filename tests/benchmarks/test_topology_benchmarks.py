@@ -0,0 +1,34 @@
+"""
+Benchmarks for building and collapsing diagram topologies of large stacks.
+
+Run with the intent benchmarks; see test_intent_benchmarks for the
+baseline and regression threshold.
+"""
+
+import pytest
+
+from models.topology import Topology
+from tests.unit.test_topology import large_state_export
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="module")
+def large_export():
+    return large_state_export()
+
+
+@pytest.mark.benchmark(group="topology")
+def test_from_state_export(benchmark, large_export):
+    """Build the graph for a ~1,000-resource stack."""
+    topology = benchmark(Topology.from_state_export, large_export, name="large")
+    assert len(topology.nodes) + len(topology.edges) > 1000
+
+
+@pytest.mark.benchmark(group="topology")
+def test_collapse(benchmark, large_export):
+    """Fold a ~1,000-resource stack into per-AZ/tier groups."""
+    topology = Topology.from_state_export(large_export, name="large")
+
+    collapsed = benchmark(topology.collapse)
+    assert len(collapsed.of_kind("subnet_group")) == 9
@@ -4,6 +4,11 @@ Pytest fixtures for AWS Cloud Networking Lab tests.
 Provides reusable test setup and mock infrastructure.
 """
 
+import os
+import sys
+import time
+from pathlib import Path
+
 import pytest
 
 from models.aws_intent import (
@@ -14,6 +19,14 @@ from models.aws_intent import (
     VPNIntent,
 )
 
+# Tooling in pulumi/ and scripts/ is run from those directories, not as packages
+PULUMI_DIR = Path(__file__).parent.parent / "pulumi"
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+BENCHMARKS_DIR = Path(__file__).parent / "benchmarks"
+for tool_dir in (PULUMI_DIR, SCRIPTS_DIR):
+    if str(tool_dir) not in sys.path:
+        sys.path.append(str(tool_dir))
+
 # ==========================================
 # SAMPLE INTENT FIXTURES
 # ==========================================
@@ -200,6 +213,20 @@ def mock_vpn_connection_response():
         "Type": "ipsec.1",
         "VpnGatewayId": "vgw-12345678",
         "CustomerGatewayId": "cgw-12345678",
+        "VgwTelemetry": [
+            {
+                "OutsideIpAddress": "203.0.113.10",
+                "Status": "UP",
+                "StatusMessage": "",
+                "AcceptedRouteCount": 2
+            },
+            {
+                "OutsideIpAddress": "203.0.113.11",
+                "Status": "DOWN",
+                "StatusMessage": "IPSEC IS DOWN",
+                "AcceptedRouteCount": 0
+            }
+        ],
         "Options": {
             "StaticRoutesOnly": False,
             "TunnelOptions": [
@@ -218,6 +245,67 @@ def mock_vpn_connection_response():
     }
 
 
+# ==========================================
+# LOCALSTACK FIXTURES
+# ==========================================
+
+@pytest.fixture
+def localstack_baseline():
+    """
+    Reset LocalStack and the local stack to the 'baseline' snapshot.
+    
+    Create the snapshot once after a known-good deploy with:
+        python deploy.py snapshot --stack local
+    
+    Returns:
+        dict: Stack outputs of the restored baseline
+    """
+    import deploy
+    from models.stack_outputs import read_stack_outputs_cache
+    
+    if "baseline" not in deploy.list_snapshots():
+        pytest.skip("No LocalStack baseline snapshot")
+    if not deploy.wait_for_localstack(timeout=5):
+        pytest.skip("LocalStack is not running")
+    if not deploy.restore_snapshot("local", "baseline"):
+        pytest.fail("Could not restore LocalStack baseline snapshot")
+    
+    cached = read_stack_outputs_cache("local", cache_dir=deploy.STATE_DIR)
+    return cached.outputs if cached else {}
+
+
+@pytest.fixture(scope="session")
+def stack_pool():
+    """
+    Warm pool of pre-deployed LocalStack stacks shared by all xdist workers.
+    
+    Pool size comes from $LAB_STACK_POOL_SIZE (default: 2).
+    """
+    import deploy
+    from stack_pool import StackPool
+    
+    if not deploy.wait_for_localstack(timeout=5):
+        pytest.skip("LocalStack is not running")
+    
+    pool = StackPool(size=int(os.environ.get("LAB_STACK_POOL_SIZE", 2)))
+    if pool.ensure_warm() == 0:
+        pytest.skip("No warm stacks could be provisioned")
+    
+    return pool
+
+
+@pytest.fixture
+def warm_stack(stack_pool):
+    """
+    Lease a deployed stack for one test.
+    
+    Call ``warm_stack.mark_dirty()`` if the test modifies resources so the
+    stack is reset before the next lease.
+    """
+    with stack_pool.leased() as stack:
+        yield stack
+
+
 # ==========================================
 # PARAMETRIZE HELPERS
 # ==========================================
@@ -253,6 +341,59 @@ INVALID_BGP_ASNS = [
 # PYTEST CONFIGURATION
 # ==========================================
 
+_SESSION_START = time.time()
+
+# Set once collection shows a test using the warm stack pool
+_POOL_REQUESTED = False
+
+
+def pytest_addoption(parser):
+    """Benchmark regression threshold (used with pytest-benchmark)."""
+    parser.addoption(
+        "--benchmark-threshold",
+        type=int,
+        default=int(os.environ.get("LAB_BENCHMARK_THRESHOLD", 25)),
+        metavar="PCT",
+        help="Fail benchmarks whose mean regresses more than PCT%% against the "
+             "stored baseline (default: $LAB_BENCHMARK_THRESHOLD or 25)"
+    )
+
+
+def pytest_ignore_collect(collection_path, config):
+    """Only collect benchmarks when running with --benchmark-only."""
+    if BENCHMARKS_DIR in (collection_path, *collection_path.parents):
+        if not (config.pluginmanager.hasplugin("benchmark")
+                and config.getoption("benchmark_only")):
+            return True
+    return None
+
+
+def _configure_benchmarks(config):
+    """
+    Point pytest-benchmark at the in-repo baselines and regression threshold.
+
+    Baselines are stored per interpreter (``Linux-CPython-3.13-64bit``, ...).
+    pytest-benchmark only warns when the running interpreter has none and
+    then compares nothing, so a missing baseline is a usage error here.
+    """
+    from pytest_benchmark.utils import get_machine_id, parse_compare_fail
+
+    baselines = BENCHMARKS_DIR / "baselines"
+    if config.getoption("benchmark_storage") == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{baselines}"
+        machine_id = get_machine_id()
+        if config.getoption("benchmark_compare") and not any((baselines / machine_id).glob("*.json")):
+            available = sorted(path.name for path in baselines.iterdir() if path.is_dir())
+            raise pytest.UsageError(
+                f"No benchmark baseline for {machine_id} in {baselines} "
+                f"(have: {', '.join(available) or 'none'}); record one with "
+                "--benchmark-save=baseline"
+            )
+    if config.getoption("benchmark_compare") and not config.getoption("benchmark_compare_fail"):
+        threshold = config.getoption("benchmark_threshold")
+        config.option.benchmark_compare_fail = [parse_compare_fail(f"mean:{threshold}%")]
+
+
 def pytest_configure(config):
     """Configure pytest with custom markers."""
     config.addinivalue_line(
@@ -267,3 +408,29 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "aws: Tests that require AWS credentials"
     )
+    if config.pluginmanager.hasplugin("benchmark"):
+        _configure_benchmarks(config)
+
+
+def pytest_collection_finish(session):
+    """Note whether any collected test leases a warm stack."""
+    global _POOL_REQUESTED
+    _POOL_REQUESTED = any(
+        "stack_pool" in getattr(item, "fixturenames", ()) for item in session.items
+    )
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report warm stack pool metrics if the pool was used this session."""
+    # Under xdist the controller collects nothing, so also honour the env var
+    if not (_POOL_REQUESTED or "LAB_STACK_POOL_SIZE" in os.environ):
+        return
+    
+    from stack_pool import StackPool, print_stats
+    
+    pool = StackPool(size=int(os.environ.get("LAB_STACK_POOL_SIZE", 2)))
+    if not pool.state_file.exists() or pool.state_file.stat().st_mtime < _SESSION_START:
+        return
+    
+    terminalreporter.section("warm stack pool")
+    print_stats(pool.stats(), terminalreporter.write_line)
@@ -0,0 +1,87 @@
+"""
+Unit tests for the shared boto3 client factory.
+
+Clients are built offline; API calls are answered by botocore's Stubber.
+"""
+
+import pytest
+from botocore.stub import Stubber
+
+import aws_clients
+from aws_clients import (
+    LOCALSTACK_ENDPOINT,
+    client_stats,
+    endpoint_for,
+    get_client,
+    reset_clients,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_factory(monkeypatch):
+    """Start every test with no cached clients and fake credentials."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.delenv("LAB_STACK", raising=False)
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    reset_clients()
+    yield
+    reset_clients()
+
+
+class TestEndpoints:
+    """Test LocalStack endpoint selection."""
+
+    @pytest.mark.parametrize("stack", ["local", "local-pool-0"])
+    def test_local_stacks(self, stack):
+        """Test local stacks resolve to LocalStack."""
+        assert endpoint_for(stack) == LOCALSTACK_ENDPOINT
+
+    @pytest.mark.parametrize("stack", [None, "dev", "prod", "localized"])
+    def test_aws_stacks(self, stack):
+        """Test other stacks use the real AWS endpoint."""
+        assert endpoint_for(stack) is None
+
+    def test_local_client_endpoint(self):
+        """Test clients for the local stack talk to LocalStack."""
+        client = get_client("ec2", stack="local")
+
+        assert client.meta.endpoint_url == LOCALSTACK_ENDPOINT
+
+    def test_stack_from_environment(self, monkeypatch):
+        """Test $LAB_STACK selects LocalStack by default."""
+        monkeypatch.setenv("LAB_STACK", "local")
+
+        assert get_client("ec2").meta.endpoint_url == LOCALSTACK_ENDPOINT
+
+
+class TestClientFactory:
+    """Test client caching, config and timing."""
+
+    def test_clients_are_shared(self):
+        """Test the same client is returned for the same target."""
+        assert get_client("ec2", "us-east-1") is get_client("ec2", "us-east-1")
+        assert get_client("ec2", "us-east-1") is not get_client("ec2", "us-west-2")
+        assert len(client_stats()) == 2
+
+    def test_tuned_config(self):
+        """Test clients use the pooled, adaptive-retry config."""
+        config = get_client("ec2").meta.config
+
+        assert config.max_pool_connections == aws_clients.DEFAULT_CONFIG.max_pool_connections
+        assert config.retries["mode"] == "adaptive"
+        assert config.connect_timeout == 5
+
+    def test_call_timing(self):
+        """Test API calls are counted and timed per client."""
+        client = get_client("ec2")
+        with Stubber(client) as stubber:
+            stubber.add_response("describe_regions", {"Regions": []})
+            stubber.add_response("describe_regions", {"Regions": []})
+            client.describe_regions()
+            client.describe_regions()
+
+        stats = client_stats()[0]
+        assert stats.service == "ec2"
+        assert stats.calls == 2
+        assert stats.created_seconds > 0
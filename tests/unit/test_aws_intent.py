@@ -4,17 +4,23 @@ Unit tests for AWS intent Pydantic models.
 Tests validation logic, CIDR calculations, and intent creation.
 """
 
+from pathlib import Path
+
 import pytest
 from pydantic import ValidationError
 
 from models.aws_intent import (
     AWSNetworkIntent,
     CustomerGatewayIntent,
+    SpokeVPCIntent,
     SubnetIntent,
+    TransitGatewayIntent,
     VPCIntent,
     VPNIntent,
 )
 
+EXAMPLES_DIR = Path(__file__).parent.parent.parent / "examples"
+
 # ==========================================
 # SUBNET INTENT TESTS
 # ==========================================
@@ -165,6 +171,25 @@ class TestVPCIntent:
         
         assert "overlapping CIDR blocks" in str(exc_info.value)
 
+    def test_nested_subnet_overlap(self):
+        """Test a subnet nested in a larger one is caught wherever it appears."""
+        subnets = [
+            SubnetIntent(name=f"subnet-{i}", cidr_block=f"10.0.{i}.0/24",
+                         availability_zone="us-east-1a")
+            for i in range(16, 32)
+        ]
+        subnets.insert(3, SubnetIntent(
+            name="wide", cidr_block="10.0.0.0/20", availability_zone="us-east-1a"
+        ))
+        subnets.append(SubnetIntent(
+            name="nested", cidr_block="10.0.15.0/24", availability_zone="us-east-1b"
+        ))
+
+        with pytest.raises(ValidationError) as exc_info:
+            VPCIntent(cidr_block="10.0.0.0/16", subnets=subnets)
+
+        assert "Subnets wide and nested have overlapping CIDR blocks" in str(exc_info.value)
+
 
 # ==========================================
 # CUSTOMER GATEWAY INTENT TESTS
@@ -280,6 +305,237 @@ class TestVPNIntent:
         assert "Invalid static route CIDR" in str(exc_info.value)
 
 
+def spoke(name, cidr_block):
+    """A spoke VPC with one attachment subnet at the start of its CIDR."""
+    return SpokeVPCIntent(
+        name=name,
+        cidr_block=cidr_block,
+        subnets=[SubnetIntent(
+            name=f"{name}-tgw-a",
+            cidr_block=cidr_block.replace("/16", "/28"),
+            availability_zone="us-east-1a"
+        )]
+    )
+
+
+# ==========================================
+# ECMP VPN TESTS
+# ==========================================
+
+def ecmp_intent(**vpn):
+    """Intent with a BGP VPN on a Transit Gateway, plus VPN overrides."""
+    return AWSNetworkIntent(
+        project_name="ecmp",
+        vpc=VPCIntent(cidr_block="10.0.0.0/16"),
+        vpn=VPNIntent(
+            enabled=True,
+            customer_gateway=CustomerGatewayIntent(ip_address="203.0.113.1", bgp_asn=65000),
+            **vpn
+        ),
+        transit_gateway=TransitGatewayIntent(enabled=True)
+    )
+
+
+class TestECMPVPN:
+    """Test aggregate-bandwidth VPNs over parallel connections."""
+    
+    def test_single_connection_by_default(self):
+        """Test one connection (two tunnels) and no ECMP by default."""
+        vpn = VPNIntent()
+        
+        assert vpn.connection_count == 1
+        assert vpn.tunnel_count == 2
+        assert vpn.ecmp is False
+    
+    @pytest.mark.parametrize("gbps,connections", [
+        (1.0, 1), (2.5, 1), (2.6, 2), (5, 2), (10, 4), (20, 8),
+    ])
+    def test_connections_for_bandwidth(self, gbps, connections):
+        """Test enough 1.25 Gbps tunnels are provisioned for the bandwidth."""
+        vpn = VPNIntent(bandwidth_gbps=gbps)
+        
+        assert vpn.connection_count == connections
+        assert vpn.tunnel_count * 1.25 >= gbps
+    
+    def test_explicit_connections(self):
+        """Test an explicit connection count wins over a smaller bandwidth."""
+        assert VPNIntent(connections=3, bandwidth_gbps=1).connection_count == 3
+    
+    def test_one_connection_per_customer_gateway(self):
+        """Test each customer gateway gets at least one connection."""
+        intent = ecmp_intent(additional_customer_gateways=[
+            CustomerGatewayIntent(ip_address="203.0.113.2", bgp_asn=65000),
+            CustomerGatewayIntent(ip_address="203.0.113.3", bgp_asn=65000),
+        ])
+        
+        assert intent.vpn.connection_count == 3
+        assert intent.vpn.ecmp is True
+    
+    def test_ecmp_requires_bgp(self):
+        """Test multiple connections with static routing fails."""
+        with pytest.raises(ValidationError) as exc_info:
+            ecmp_intent(
+                bandwidth_gbps=10, static_routes_only=True, static_routes=["192.168.0.0/16"]
+            )
+        
+        assert "4 VPN connections need BGP for ECMP" in str(exc_info.value)
+    
+    def test_ecmp_requires_transit_gateway(self):
+        """Test multiple connections on a VGW fails."""
+        with pytest.raises(ValidationError) as exc_info:
+            AWSNetworkIntent(
+                project_name="ecmp",
+                vpc=VPCIntent(cidr_block="10.0.0.0/16"),
+                vpn=VPNIntent(
+                    enabled=True,
+                    customer_gateway=CustomerGatewayIntent(ip_address="203.0.113.1", bgp_asn=65000),
+                    connections=2
+                )
+            )
+        
+        assert "need an enabled transit_gateway" in str(exc_info.value)
+    
+    def test_ecmp_requires_tgw_ecmp_support(self):
+        """Test multiple connections fail with ECMP disabled on the TGW."""
+        with pytest.raises(ValidationError) as exc_info:
+            AWSNetworkIntent(
+                project_name="ecmp",
+                vpc=VPCIntent(cidr_block="10.0.0.0/16"),
+                vpn=VPNIntent(
+                    enabled=True,
+                    customer_gateway=CustomerGatewayIntent(ip_address="203.0.113.1", bgp_asn=65000),
+                    connections=2
+                ),
+                transit_gateway=TransitGatewayIntent(enabled=True, vpn_ecmp_support=False)
+            )
+        
+        assert "vpn_ecmp_support" in str(exc_info.value)
+    
+    def test_duplicate_customer_gateway_ip(self):
+        """Test customer gateways must have distinct IPs."""
+        with pytest.raises(ValidationError) as exc_info:
+            ecmp_intent(additional_customer_gateways=[
+                CustomerGatewayIntent(ip_address="203.0.113.1", bgp_asn=65001)
+            ])
+        
+        assert "distinct ip_address" in str(exc_info.value)
+    
+    def test_to_pulumi_config(self):
+        """Test connection count and extra gateways reach the Pulumi config."""
+        config = ecmp_intent(
+            bandwidth_gbps=10,
+            additional_customer_gateways=[
+                CustomerGatewayIntent(ip_address="203.0.113.2", bgp_asn=65001)
+            ]
+        ).to_pulumi_config()
+        
+        assert config["vpn_connection_count"] == 4
+        assert config["transit_gateway_vpn_ecmp"] is True
+        assert config["vpn_additional_customer_gateways"] == [
+            {"ip_address": "203.0.113.2", "bgp_asn": 65001, "device_name": None}
+        ]
+
+
+# ==========================================
+# TRANSIT GATEWAY INTENT TESTS
+# ==========================================
+
+class TestTransitGatewayIntent:
+    """Test TransitGatewayIntent model validation."""
+    
+    def test_disabled_by_default(self):
+        """Test Transit Gateway is disabled with no spokes by default."""
+        tgw = TransitGatewayIntent()
+        
+        assert tgw.enabled is False
+        assert tgw.spokes == []
+        assert tgw.isolate_spokes is False
+    
+    def test_hundreds_of_spokes(self):
+        """Test hundreds of non-overlapping spokes validate."""
+        intent = AWSNetworkIntent(
+            project_name="hub",
+            vpc=VPCIntent(cidr_block="10.0.0.0/16"),
+            transit_gateway=TransitGatewayIntent(
+                enabled=True,
+                spokes=[spoke(f"spoke-{i}", f"10.{i}.0.0/16") for i in range(1, 256)]
+            )
+        )
+        
+        assert len(intent.transit_gateway.spokes) == 255
+    
+    def test_spoke_requires_subnet(self):
+        """Test a spoke without subnets cannot be attached."""
+        with pytest.raises(ValidationError):
+            SpokeVPCIntent(name="empty", cidr_block="10.1.0.0/16")
+    
+    def test_duplicate_spoke_names(self):
+        """Test spoke names must be unique."""
+        with pytest.raises(ValidationError) as exc_info:
+            TransitGatewayIntent(spokes=[spoke("a", "10.1.0.0/16"), spoke("a", "10.2.0.0/16")])
+        
+        assert "Duplicate spoke name: a" in str(exc_info.value)
+    
+    def test_reserved_spoke_name(self):
+        """Test a spoke cannot take the project VPC's attachment name."""
+        with pytest.raises(ValidationError) as exc_info:
+            TransitGatewayIntent(spokes=[spoke("project", "10.1.0.0/16")])
+        
+        assert "'project' is reserved for the project VPC" in str(exc_info.value)
+    
+    def test_spoke_overlaps_project_vpc(self):
+        """Test spoke CIDRs must not overlap the project VPC."""
+        with pytest.raises(ValidationError) as exc_info:
+            AWSNetworkIntent(
+                project_name="hub",
+                vpc=VPCIntent(cidr_block="10.0.0.0/16"),
+                transit_gateway=TransitGatewayIntent(
+                    enabled=True, spokes=[spoke("a", "10.1.0.0/16"), spoke("b", "10.0.0.0/16")]
+                )
+            )
+        
+        assert "VPCs project VPC and b have overlapping CIDR blocks" in str(exc_info.value)
+    
+    @pytest.mark.parametrize("asn", [64512, 65534, 4200000000])
+    def test_valid_asn(self, asn):
+        """Test private ASNs are accepted."""
+        assert TransitGatewayIntent(amazon_side_asn=asn).amazon_side_asn == asn
+    
+    @pytest.mark.parametrize("asn", [64000, 65535, 4294967295])
+    def test_invalid_asn(self, asn):
+        """Test ASNs outside the TGW private ranges fail."""
+        with pytest.raises(ValidationError):
+            TransitGatewayIntent(amazon_side_asn=asn)
+    
+    def test_invalid_vpc_route(self):
+        """Test VPC route destinations must be CIDRs."""
+        with pytest.raises(ValidationError) as exc_info:
+            TransitGatewayIntent(vpc_routes=["10.0.0.0/33"])
+        
+        assert "Invalid TGW route CIDR" in str(exc_info.value)
+    
+    def test_to_pulumi_config(self):
+        """Test Transit Gateway settings and spokes reach the Pulumi config."""
+        intent = AWSNetworkIntent.from_yaml(EXAMPLES_DIR / "hub_and_spoke.yaml")
+        
+        config = intent.to_pulumi_config()
+        
+        assert config["enable_transit_gateway"] is True
+        assert config["transit_gateway_asn"] == 64512
+        assert config["transit_gateway_vpc_routes"] == ["10.0.0.0/8", "192.168.0.0/16"]
+        assert [s["name"] for s in config["transit_gateway_spokes"]] == [
+            "shared-services", "analytics"
+        ]
+        assert config["transit_gateway_spokes"][1]["subnets"][1]["cidr_block"] == "10.2.0.16/28"
+    
+    def test_to_pulumi_config_disabled(self, basic_vpc_intent):
+        """Test no Transit Gateway keys beyond the flag when disabled."""
+        config = basic_vpc_intent.to_pulumi_config()
+        
+        assert config["enable_transit_gateway"] is False
+        assert "transit_gateway_spokes" not in config
+
+
 # ==========================================
 # AWS NETWORK INTENT TESTS
 # ==========================================
@@ -352,6 +608,24 @@ class TestAWSNetworkIntent:
         assert config["customer_gateway_ip"] == "203.0.113.1"
         assert config["customer_bgp_asn"] == 65000
     
+    def test_from_yaml_example(self):
+        """Test loading an example intent file."""
+        intent = AWSNetworkIntent.from_yaml(EXAMPLES_DIR / "vpc_with_vpn.yaml")
+        
+        assert intent.project_name == "hybrid-lab"
+        assert len(intent.vpc.subnets) == 4
+        assert intent.vpn.customer_gateway.bgp_asn == 65000
+    
+    def test_from_yaml_bare_mapping(self, tmp_path):
+        """Test loading an intent without the top-level network key."""
+        path = tmp_path / "intent.yaml"
+        path.write_text("project_name: bare\nvpc:\n  cidr_block: 10.1.0.0/16\n")
+        
+        intent = AWSNetworkIntent.from_yaml(path)
+        
+        assert intent.project_name == "bare"
+        assert intent.vpc.cidr_block == "10.1.0.0/16"
+    
     @pytest.mark.parametrize("environment", ["dev", "staging", "prod"])
     def test_valid_environments(self, environment):
         """Test valid environment names."""
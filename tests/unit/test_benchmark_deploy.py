@@ -0,0 +1,146 @@
+"""
+Unit tests for the deploy-scaling benchmark runner.
+
+Pulumi and LocalStack are never called; deploy steps are replaced with fakes.
+"""
+
+import csv
+from types import SimpleNamespace
+
+import pytest
+
+import benchmark_deploy
+from benchmark_deploy import (
+    BenchmarkCase,
+    BenchmarkResult,
+    build_matrix,
+    max_private_subnets,
+    run_case,
+    scaling_exponent,
+    summarize,
+    write_csv,
+)
+
+
+@pytest.fixture
+def fake_deploy(monkeypatch):
+    """Record deploy steps instead of running Pulumi."""
+    calls = []
+
+    def step(name, result=True):
+        return lambda stack, *args, **kwargs: calls.append((name, stack)) or result
+
+    monkeypatch.setattr(benchmark_deploy, "prepare_stack", step("prepare"))
+    monkeypatch.setattr(benchmark_deploy, "set_stack_config", step("config"))
+    monkeypatch.setattr(
+        benchmark_deploy, "run_pulumi",
+        lambda operation, stack: calls.append((operation, stack)) or True
+    )
+    monkeypatch.setattr(benchmark_deploy, "remove_stack", step("remove", None))
+    monkeypatch.setattr(benchmark_deploy, "count_resources", lambda stack: 42)
+    return calls
+
+
+def test_build_matrix():
+    """Test every subnet count and toggle combination is covered."""
+    matrix = build_matrix([0, 8], nat=(False, True), vpn=(True,), flow_logs=(False,))
+
+    assert matrix == [
+        BenchmarkCase(0, False, True, False),
+        BenchmarkCase(0, True, True, False),
+        BenchmarkCase(8, False, True, False),
+        BenchmarkCase(8, True, True, False),
+    ]
+    assert matrix[3].name == "8-nat-vpn"
+    assert matrix[3].config() == {
+        "private_subnet_count": 8,
+        "enable_nat_gateway": True,
+        "enable_vpn": True,
+        "enable_flow_logs": False,
+    }
+    assert BenchmarkCase(0, False, False, False).features == "base"
+
+
+class TestRunCase:
+    """Test the deploy / no-op update / destroy sequence."""
+
+    def test_phases(self, fake_deploy):
+        """Test a case deploys twice, destroys and removes its stack."""
+        result = run_case(BenchmarkCase(8, True, False, True))
+
+        stack = "local-bench-8-nat-flowlogs"
+        assert [step for step, _ in fake_deploy] == [
+            "prepare", "config", "up", "up", "destroy", "remove"
+        ]
+        assert fake_deploy[0] == ("prepare", stack)
+        assert result.resources == 42
+        assert result.deploy_seconds is not None and result.update_seconds is not None
+        assert result.destroy_seconds is not None
+        assert result.error == ""
+
+    def test_failed_deploy_still_destroys(self, fake_deploy, monkeypatch):
+        """Test a failed deploy skips the update but cleans up."""
+        monkeypatch.setattr(
+            benchmark_deploy, "run_pulumi",
+            lambda operation, stack: fake_deploy.append((operation, stack)) or operation != "up"
+        )
+
+        result = run_case(BenchmarkCase(0, False, False, False), keep_stack=True)
+
+        assert result.error == "deploy"
+        assert result.update_seconds is None
+        assert [step for step, _ in fake_deploy][-1] == "destroy"
+
+
+def test_run_pulumi_skips_preview(monkeypatch):
+    """Test only the bare up/destroy command is run (and timed)."""
+    commands = []
+    monkeypatch.setattr(
+        benchmark_deploy.subprocess, "run",
+        lambda args, cwd: commands.append(args) or SimpleNamespace(returncode=0)
+    )
+
+    assert benchmark_deploy.run_pulumi("up", "local-bench-0-base")
+
+    assert commands == [["pulumi", "up", "--yes", "--skip-preview", "--stack", "local-bench-0-base"]]
+
+
+def test_max_private_subnets():
+    """Test the private /24s left in a VPC after the public tier."""
+    assert max_private_subnets("10.0.0.0/16") == 240
+    assert max_private_subnets("10.0.0.0/20") == 0
+    assert max_private_subnets("10.0.0.0/26") == 0
+
+
+def test_scaling_exponent():
+    """Test the fitted exponent separates linear from quadratic growth."""
+    assert scaling_exponent([(10, 1.0), (100, 10.0), (1000, 100.0)]) == pytest.approx(1.0)
+    assert scaling_exponent([(10, 1.0), (100, 100.0)]) == pytest.approx(2.0)
+    assert scaling_exponent([(10, 1.0)]) is None
+
+
+def test_summarize_skips_failed_cases():
+    """Test exponents are per feature combination and ignore failures."""
+    results = [
+        BenchmarkResult(0, False, False, False, resources=10, deploy_seconds=5, update_seconds=1),
+        BenchmarkResult(8, False, False, False, resources=20, deploy_seconds=10, update_seconds=2),
+        BenchmarkResult(32, False, False, False, resources=80, error="deploy"),
+        BenchmarkResult(0, True, False, False, resources=13, deploy_seconds=60),
+    ]
+
+    summary = summarize(results)
+
+    assert summary["base"]["deploy"] == pytest.approx(1.0)
+    assert summary["nat"]["deploy"] is None
+
+
+def test_write_csv(tmp_path):
+    """Test results are written one row per case."""
+    results = [BenchmarkResult(8, True, True, False, resources=30, deploy_seconds=12.5)]
+
+    path = write_csv(results, tmp_path / "out" / "results.csv")
+
+    rows = list(csv.DictReader(path.open()))
+    assert rows[0]["private_subnets"] == "8"
+    assert rows[0]["deploy_seconds"] == "12.5"
+    assert rows[0]["update_seconds"] == ""
@@ -0,0 +1,384 @@
+"""
+Unit tests for the deploy script's change detection, snapshots and watch mode.
+
+Pulumi and docker are never called; `pulumi stack export`, the config
+fingerprint, subprocess calls and the Automation API are replaced with
+fixed documents and stubs.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+import deploy
+from deploy import (
+    PROJECT_NAME,
+    changed_config_keys,
+    dependency_closure,
+    plan_targeted_update,
+)
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "examples"
+
+
+def urn(name, rtype="aws:ec2/vpc:Vpc"):
+    """URN of a resource in the local stack."""
+    return f"urn:pulumi:local::{PROJECT_NAME}::{rtype}::{name}"
+
+
+VPC = urn(f"{PROJECT_NAME}-vpc")
+SUBNET = urn(f"{PROJECT_NAME}-public-a", "aws:ec2/subnet:Subnet")
+INSTANCE = urn(f"{PROJECT_NAME}-web-server", "aws:ec2/instance:Instance")
+IGW = urn(f"{PROJECT_NAME}-igw", "aws:ec2/internetGateway:InternetGateway")
+CGW = urn(f"{PROJECT_NAME}-cgw", "aws:ec2/customerGateway:CustomerGateway")
+SG = urn(f"{PROJECT_NAME}-default-sg", "aws:ec2/securityGroup:SecurityGroup")
+PROVIDER = urn("default", "pulumi:providers:aws")
+
+
+def resources():
+    """A VPC with a subnet, an instance in it, a security group and an unrelated CGW."""
+    return [
+        {"urn": PROVIDER},
+        {"urn": VPC, "provider": f"{PROVIDER}::provider-id"},
+        {"urn": SUBNET, "dependencies": [VPC]},
+        {"urn": INSTANCE, "propertyDependencies": {"subnetId": [SUBNET]}},
+        {"urn": IGW, "parent": VPC},
+        {"urn": SG, "dependencies": [VPC]},
+        {"urn": CGW},
+    ]
+
+
+class TestChangedConfigKeys:
+    """Test config fingerprint comparison."""
+
+    def test_added_removed_and_changed(self):
+        """Test every kind of difference is reported, unchanged keys are not."""
+        old = {"a": "1", "b": "2", "c": "3"}
+        new = {"a": "1", "b": "9", "d": "4"}
+
+        assert changed_config_keys(old, new) == {"b", "c", "d"}
+
+    def test_identical(self):
+        """Test identical configs have no changes."""
+        assert changed_config_keys({"a": "1"}, {"a": "1"}) == set()
+
+
+class TestDependencyClosure:
+    """Test expanding changed resources to their dependents."""
+
+    def test_dependents(self):
+        """Test dependencies, property dependencies and children are followed."""
+        assert dependency_closure(resources(), [VPC]) == {VPC, SUBNET, INSTANCE, IGW, SG}
+
+    def test_leaf(self):
+        """Test a resource nothing depends on is targeted alone."""
+        assert dependency_closure(resources(), [CGW]) == {CGW}
+
+    def test_provider_dependents(self):
+        """Test resources using a provider depend on it."""
+        assert VPC in dependency_closure(resources(), [PROVIDER])
+
+    def test_missing_urn(self):
+        """Test an unknown seed gives None (full update)."""
+        assert dependency_closure(resources(), [VPC, urn("gone")]) is None
+
+
+@pytest.fixture
+def last_deploy(monkeypatch):
+    """A recorded deploy whose vpc_cidr has since changed."""
+    state = {"deployment": {"resources": resources()}}
+    monkeypatch.setattr(deploy, "load_deploy_record", lambda stack: {
+        "program": "program-hash",
+        "config": {f"{PROJECT_NAME}:vpc_cidr": "old"},
+    })
+    monkeypatch.setattr(deploy, "get_program_fingerprint", lambda pulumi_dir: "program-hash")
+    monkeypatch.setattr(deploy, "get_config_fingerprint", lambda stack, pulumi_dir: {
+        f"{PROJECT_NAME}:vpc_cidr": "new"
+    })
+    monkeypatch.setattr(deploy, "_pulumi_json", lambda args, pulumi_dir: state)
+    return state
+
+
+class TestPlanTargetedUpdate:
+    """Test choosing between a targeted and a full update."""
+
+    def test_targets_closure(self, last_deploy):
+        """Test a targetable change targets the resources and their dependents."""
+        assert plan_targeted_update("local", deploy.PULUMI_DIR) == sorted(
+            {VPC, SUBNET, INSTANCE, IGW, SG}
+        )
+
+    def test_no_changes(self, last_deploy, monkeypatch):
+        """Test an unchanged config needs no update."""
+        monkeypatch.setattr(deploy, "get_config_fingerprint", lambda stack, pulumi_dir: {
+            f"{PROJECT_NAME}:vpc_cidr": "old"
+        })
+
+        assert plan_targeted_update("local", deploy.PULUMI_DIR) == []
+
+    def test_untargetable_key(self, last_deploy, monkeypatch):
+        """Test a feature toggle change falls back to a full update."""
+        monkeypatch.setattr(deploy, "get_config_fingerprint", lambda stack, pulumi_dir: {
+            f"{PROJECT_NAME}:vpc_cidr": "old", f"{PROJECT_NAME}:enable_vpn": "true"
+        })
+
+        assert plan_targeted_update("local", deploy.PULUMI_DIR) is None
+
+    def test_program_changed(self, last_deploy, monkeypatch):
+        """Test an edited program falls back to a full update."""
+        monkeypatch.setattr(deploy, "get_program_fingerprint", lambda pulumi_dir: "edited")
+
+        assert plan_targeted_update("local", deploy.PULUMI_DIR) is None
+
+    def test_no_record(self, last_deploy, monkeypatch):
+        """Test a stack never deployed by deploy.py gets a full update."""
+        monkeypatch.setattr(deploy, "load_deploy_record", lambda stack: None)
+
+        assert plan_targeted_update("local", deploy.PULUMI_DIR) is None
+
+    def test_pending_operations(self, last_deploy):
+        """Test an interrupted previous update falls back to a full update."""
+        last_deploy["deployment"]["pending_operations"] = [{"type": "creating"}]
+
+        assert plan_targeted_update("local", deploy.PULUMI_DIR) is None
+
+    def test_resource_not_in_state(self, last_deploy):
+        """Test a targetable resource missing from state falls back to a full update."""
+        last_deploy["deployment"]["resources"] = [
+            r for r in resources() if r["urn"] != VPC
+        ]
+
+        assert plan_targeted_update("local", deploy.PULUMI_DIR) is None
+
+
+def test_paths_from_pulumi_dir():
+    """Test deploy.py run from pulumi/ finds models/ and the repo-root cache."""
+    result = subprocess.run(
+        [sys.executable, "-c",
+         "import deploy, models.stack_outputs; print(deploy.STATE_DIR)"],
+        cwd=deploy.PULUMI_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    assert result.stdout.strip() == str(deploy.ROOT_DIR / ".stack-cache")
+    assert deploy.ROOT_DIR == deploy.PULUMI_DIR.parent
+
+
+@pytest.fixture
+def snapshot_env(tmp_path, monkeypatch):
+    """
+    Snapshot directories under tmp_path, with docker and pulumi stubbed.
+
+    `pulumi stack export` writes a checkpoint with one stack output; every
+    command is recorded.
+    """
+    commands = []
+
+    def fake_run(args, cwd=None, check=False, **kwargs):
+        commands.append(args[:3])
+        if args[:3] == ["pulumi", "stack", "export"]:
+            checkpoint = {"deployment": {"resources": [
+                {"type": "pulumi:pulumi:Stack", "outputs": {"vpc_id": "vpc-snap"}}
+            ]}}
+            Path(args[args.index("--file") + 1]).write_text(json.dumps(checkpoint))
+        return subprocess.CompletedProcess(args, 0)
+
+    data = tmp_path / "localstack-data"
+    (data / "state").mkdir(parents=True)
+    (data / "state" / "ec2.json").write_text("original")
+
+    monkeypatch.setattr(deploy, "STATE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(deploy, "SNAPSHOT_DIR", tmp_path / "cache" / "snapshots")
+    monkeypatch.setattr(deploy, "LOCALSTACK_DATA", data)
+    monkeypatch.setattr(deploy, "wait_for_localstack", lambda timeout=60.0: True)
+    monkeypatch.setattr(deploy.subprocess, "run", fake_run)
+    return commands
+
+
+class TestSnapshots:
+    """Test saving and restoring LocalStack snapshots."""
+
+    def test_snapshot_copies_state(self, snapshot_env):
+        """Test a snapshot holds the checkpoint, deploy record and LocalStack data."""
+        deploy.STATE_DIR.mkdir()
+        (deploy.STATE_DIR / "local.deployed.json").write_text('{"stack": "local"}')
+
+        assert deploy.snapshot_stack("local", "base")
+
+        snapshot = deploy.SNAPSHOT_DIR / "base"
+        assert (snapshot / "localstack-data" / "state" / "ec2.json").read_text() == "original"
+        assert (snapshot / "deployed.json").exists()
+        assert json.loads((snapshot / "snapshot.json").read_text())["stack"] == "local"
+        assert deploy.list_snapshots() == ["base"]
+        # LocalStack is stopped for the copy and started again
+        assert ["docker", "compose", "stop"] in snapshot_env
+        assert snapshot_env[-1] == ["docker", "compose", "start"]
+
+    def test_snapshot_failure_leaves_nothing(self, snapshot_env, monkeypatch):
+        """Test a failed export removes the staging directory."""
+        def failing_run(args, **kwargs):
+            raise subprocess.CalledProcessError(1, args)
+
+        monkeypatch.setattr(deploy.subprocess, "run", failing_run)
+
+        assert not deploy.snapshot_stack("local", "base")
+        assert list(deploy.SNAPSHOT_DIR.iterdir()) == []
+
+    def test_restore_replaces_state(self, snapshot_env):
+        """Test restore puts back LocalStack data, the record and cached outputs."""
+        from models.stack_outputs import read_stack_outputs_cache
+
+        deploy.STATE_DIR.mkdir()
+        (deploy.STATE_DIR / "local.deployed.json").write_text('{"stack": "local"}')
+        assert deploy.snapshot_stack("local", "base")
+        (deploy.LOCALSTACK_DATA / "state" / "ec2.json").write_text("changed")
+        (deploy.LOCALSTACK_DATA / "extra.json").write_text("new")
+        (deploy.STATE_DIR / "local.deployed.json").unlink()
+
+        assert deploy.restore_snapshot("local", "base")
+
+        assert (deploy.LOCALSTACK_DATA / "state" / "ec2.json").read_text() == "original"
+        assert not (deploy.LOCALSTACK_DATA / "extra.json").exists()
+        assert (deploy.STATE_DIR / "local.deployed.json").exists()
+        assert ["pulumi", "stack", "import"] in snapshot_env
+        cached = read_stack_outputs_cache("local", cache_dir=deploy.STATE_DIR)
+        assert cached.outputs == {"vpc_id": "vpc-snap"}
+
+    def test_restore_missing_snapshot(self, snapshot_env, capsys):
+        """Test restoring an unknown snapshot fails without touching LocalStack."""
+        assert not deploy.restore_snapshot("local", "nope")
+
+        assert snapshot_env == []
+        assert "Snapshot not found: nope" in capsys.readouterr().out
+
+    def test_restore_other_stack(self, snapshot_env):
+        """Test a snapshot is only restored onto the stack it was taken from."""
+        assert deploy.snapshot_stack("local", "base")
+        snapshot_env.clear()
+
+        assert not deploy.restore_snapshot("dev", "base")
+        assert snapshot_env == []
+
+
+class FakeStack:
+    """Automation API stack recording config writes and previews."""
+
+    def __init__(self):
+        self.config = []
+        self.previews = 0
+
+    def set_all_config(self, values):
+        self.config.append({key: value.value for key, value in values.items()})
+
+    def preview(self, on_event=None):
+        self.previews += 1
+        return SimpleNamespace(change_summary={"same": 5, "update": 1})
+
+
+@pytest.fixture
+def fake_automation(monkeypatch):
+    """A stand-in for pulumi.automation whose select_stack returns a FakeStack."""
+    stack = FakeStack()
+    automation = ModuleType("pulumi.automation")
+    automation.select_stack = lambda **kwargs: stack
+    automation.LocalWorkspaceOptions = lambda **kwargs: kwargs
+    automation.ConfigValue = lambda value: SimpleNamespace(value=value)
+    automation.errors = SimpleNamespace(CommandError=RuntimeError)
+    monkeypatch.setitem(sys.modules, "pulumi.automation", automation)
+    return stack
+
+
+@pytest.fixture
+def watch_env(tmp_path, monkeypatch):
+    """A program directory and intent file, with sleep driving one edit then Ctrl+C."""
+    program = tmp_path / "program"
+    program.mkdir()
+    (program / "__main__.py").write_text("")
+    intent = tmp_path / "intent.yaml"
+    intent.write_text((EXAMPLES_DIR / "basic_vpc.yaml").read_text())
+    monkeypatch.setattr(deploy, "PULUMI_DIR", program)
+
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 1:
+            # First poll: the intent file is edited
+            mtime = intent.stat().st_mtime + 10
+            os.utime(intent, (mtime, mtime))
+        elif len(sleeps) == 3:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(deploy.time, "sleep", fake_sleep)
+    return SimpleNamespace(intent=intent, sleeps=sleeps)
+
+
+class TestWatchStack:
+    """Test the watch loop's intent handling and re-previews."""
+
+    def test_preview_on_start_and_change(self, fake_automation, watch_env, capsys):
+        """Test the intent is applied and previewed at start and again after an edit."""
+        assert deploy.watch_stack("local", [watch_env.intent], debounce=0.25, poll_interval=0.1)
+
+        assert fake_automation.previews == 2
+        assert len(fake_automation.config) == 2
+        assert fake_automation.config[0]["vpc_cidr"] == "10.0.0.0/16"
+        assert fake_automation.config[0]["enable_vpn"] == "false"
+        assert watch_env.sleeps == [0.1, 0.25, 0.1]
+        out = capsys.readouterr().out
+        assert "Changed: intent.yaml" in out
+        assert "1 to update" in out
+
+    def test_transit_gateway_intent_config_is_json(self, fake_automation, watch_env):
+        """Test list and dict config from a TGW intent is stored as JSON for get_object."""
+        watch_env.intent.write_text((EXAMPLES_DIR / "hub_and_spoke.yaml").read_text())
+
+        assert deploy.watch_stack("local", [watch_env.intent])
+
+        config = fake_automation.config[0]
+        assert config["enable_transit_gateway"] == "true"
+        spokes = json.loads(config["transit_gateway_spokes"])
+        assert spokes and {"name", "cidr_block", "subnets"} <= set(spokes[0])
+        assert isinstance(json.loads(config["transit_gateway_vpc_routes"]), list)
+
+    def test_invalid_intent_skips_preview(self, fake_automation, watch_env, capsys):
+        """Test an invalid intent is reported and not previewed."""
+        watch_env.intent.write_text("network:\n  vpc:\n    cidr_block: nonsense\n")
+
+        assert deploy.watch_stack("local", [watch_env.intent])
+
+        assert fake_automation.previews == 0
+        assert "Invalid intent" in capsys.readouterr().out
+
+    def test_program_change_without_intent(self, fake_automation, watch_env):
+        """Test watching without an intent previews and never writes config."""
+        assert deploy.watch_stack("local", [])
+
+        assert fake_automation.previews == 1
+        assert fake_automation.config == []
+
+
+def test_print_preview_event(capsys):
+    """Test only changing resource events are printed, with their diffs."""
+    def event(op, diffs=()):
+        metadata = SimpleNamespace(
+            op=SimpleNamespace(value=op), urn=f"{VPC}-{op}", type="aws:ec2/vpc:Vpc",
+            diffs=list(diffs)
+        )
+        return SimpleNamespace(resource_pre_event=SimpleNamespace(metadata=metadata))
+
+    deploy._print_preview_event(event("same"))
+    deploy._print_preview_event(event("update", ["cidrBlock"]))
+    deploy._print_preview_event(SimpleNamespace(resource_pre_event=None))
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert "~ update" in lines[0]
+    assert f"{PROJECT_NAME}-vpc-update  [cidrBlock]" in lines[0]
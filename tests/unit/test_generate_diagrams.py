@@ -0,0 +1,226 @@
+"""
+Unit tests for the diagram generator's text backends and parallel renderer.
+"""
+
+import subprocess
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import generate_diagrams
+from generate_diagrams import (
+    diagram_filename,
+    generate_all_diagrams,
+    generate_intent_diagram,
+    read_png_hash,
+    render_text,
+    topology_to_dot,
+    topology_to_mermaid,
+    walk_topology,
+    write_png_hash,
+)
+from models.topology import Topology
+from tests.unit.test_topology import state_export
+
+
+@pytest.fixture
+def topology():
+    return Topology.from_state_export(state_export(), name="local")
+
+
+def test_import_does_not_load_diagrams_library():
+    """Test the text path starts without importing the diagrams library."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, generate_diagrams; print('diagrams' in sys.modules)"],
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_walk_topology(topology):
+    """Test clusters balance and edges only join drawn nodes."""
+    events = list(walk_topology(topology))
+    opened = [item for event, item in events if event == "cluster"]
+    drawn = {item.id for event, item in events if event == "node"}
+
+    assert opened[:2] == ["On-Premises", "AWS Cloud"]
+    assert len(opened) == sum(1 for event, _ in events if event == "end")
+    assert drawn == {n.id for n in topology.nodes if n.kind != "vpc"}
+    assert all(item.source in drawn and item.target in drawn
+               for event, item in events if event == "edge")
+
+
+def test_mermaid(topology):
+    """Test Mermaid output has every node, subgraph and labelled edge."""
+    text = topology_to_mermaid(topology)
+
+    assert "flowchart TB" in text
+    assert 'subgraph c2["VPC: lab-vpc<br/>10.0.0.0/16"]' in text
+    assert '["lab-public-a<br/>10.0.1.0/24"]' in text
+    assert '-->|"IPsec VPN"|' in text
+    assert text.count("subgraph") == text.count("end\n")
+
+
+def test_dot(topology):
+    """Test DOT output is balanced and escapes labels."""
+    topology.nodes[0].label = 'say "hi"'
+    text = topology_to_dot(topology, title="Lab")
+
+    assert text.startswith('digraph "local" {')
+    assert 'label="Lab"' in text and "splines=ortho" in text
+    assert 'subgraph cluster_0 {' in text
+    assert '[label="0.0.0.0/0"]' in text
+    assert '\\"hi\\"' in text
+    assert text.count("{") == text.count("}")
+
+
+def test_svg_needs_graphviz(topology, monkeypatch):
+    """Test SVG output reports a missing Graphviz install."""
+    monkeypatch.setattr(generate_diagrams.shutil, "which", lambda name: None)
+
+    with pytest.raises(RuntimeError, match="Graphviz"):
+        render_text(topology, "svg")
+
+
+def test_diagram_filename():
+    """Test output paths per stack and drill-down."""
+    assert diagram_filename() == "diagrams/current_architecture"
+    assert diagram_filename("org/prod") == "diagrams/architecture_org_prod"
+    assert diagram_filename("dev", az="us-east-1a", tier="app") == "diagrams/architecture_dev_us-east-1a_app"
+
+
+def test_png_hash_roundtrip(tmp_path):
+    """Test the topology hash survives a write/read through PNG chunks."""
+    def chunk(kind, body=b""):
+        return (len(body).to_bytes(4, "big") + kind + body
+                + (zlib.crc32(kind + body) & 0xffffffff).to_bytes(4, "big"))
+
+    png = tmp_path / "diagram.png"
+    png.write_bytes(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", bytes(13)) + chunk(b"IEND"))
+    assert read_png_hash(png) is None
+
+    write_png_hash(png, "abc123")
+
+    assert read_png_hash(png) == "abc123"
+    assert read_png_hash(tmp_path / "missing.png") is None
+
+
+def test_intent_diagram(tmp_path, monkeypatch):
+    """Test an intent file is drawn without Pulumi state."""
+    intent = Path(__file__).resolve().parents[2] / "examples" / "vpc_with_vpn.yaml"
+    monkeypatch.chdir(tmp_path)
+
+    written = generate_intent_diagram(intent, fmt="mermaid")
+
+    assert written == Path("diagrams/intent_vpc_with_vpn.mmd")
+    text = written.read_text()
+    assert "hybrid-lab (intent)" in text
+    assert '["lab-router<br/>203.0.113.1"]' in text
+
+
+@pytest.fixture
+def renders(tmp_path, monkeypatch):
+    """Record renders in-process instead of drawing with Graphviz."""
+    calls = []
+
+    def current(stack, force=False, **detail):
+        calls.append(("current", stack, force, detail))
+        if stack == "missing":
+            raise RuntimeError("no outputs for stack 'missing'")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(generate_diagrams, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(generate_diagrams, "generate_current_architecture", current)
+    for name in generate_diagrams.SOLUTION_DIAGRAMS:
+        monkeypatch.setitem(
+            generate_diagrams.SOLUTION_DIAGRAMS, name,
+            lambda name=name: calls.append((name, None, None, None))
+        )
+    return calls
+
+
+class TestGenerateAllDiagrams:
+    """Test job fan-out and error reporting of the parallel renderer."""
+
+    def test_renders_every_job(self, renders):
+        """Test each stack and solution diagram is one job, with errors kept per job."""
+        results = generate_all_diagrams(
+            ["current", "basic_vpc"], stacks=["dev", "missing"], force=True,
+            workers=2, detail={"threshold": 5}
+        )
+
+        assert [(label, error) for label, _, error in results] == [
+            ("current:dev", None),
+            ("current:missing", "no outputs for stack 'missing'"),
+            ("basic_vpc", None),
+        ]
+        assert ("current", "dev", True, {"threshold": 5}) in renders
+        assert Path("diagrams").is_dir()
+
+    def test_defaults_to_all(self, renders):
+        """Test no names renders current plus every solution diagram."""
+        results = generate_all_diagrams()
+
+        assert [label for label, _, _ in results] == [
+            "current", *generate_diagrams.SOLUTION_DIAGRAMS
+        ]
+
+    def test_missing_library_is_raised(self, renders, monkeypatch):
+        """Test a missing diagrams library fails the run instead of one job."""
+        def current(stack, force=False, **detail):
+            raise ImportError("No module named 'diagrams'")
+
+        monkeypatch.setattr(generate_diagrams, "generate_current_architecture", current)
+
+        with pytest.raises(ImportError):
+            generate_all_diagrams(["current"])
+
+
+@pytest.fixture
+def run_main(monkeypatch):
+    """Run the CLI with the given arguments."""
+    def run(*argv):
+        monkeypatch.setattr(sys, "argv", ["generate_diagrams.py", *argv])
+        generate_diagrams.main()
+    return run
+
+
+class TestMain:
+    """Test command-line validation and exit codes."""
+
+    @pytest.mark.parametrize("argv, message", [
+        (["nope"], "unknown diagram(s): nope"),
+        (["basic_vpc", "--format", "mermaid"], "--format mermaid only supports the 'current'"),
+        (["--output", "-"], "--output requires a text --format"),
+        (["--intent", "x.yaml", "--stack", "dev"], "--intent cannot be combined"),
+    ])
+    def test_usage_errors(self, run_main, capsys, argv, message):
+        """Test conflicting or unknown arguments are usage errors."""
+        with pytest.raises(SystemExit) as exc:
+            run_main(*argv)
+
+        assert exc.value.code == 2
+        assert message in capsys.readouterr().err
+
+    def test_missing_library_hint(self, run_main, renders, monkeypatch, capsys):
+        """Test a missing diagrams library prints the install hint."""
+        def current(stack, force=False, **detail):
+            raise ImportError("No module named 'diagrams'")
+
+        monkeypatch.setattr(generate_diagrams, "generate_current_architecture", current)
+
+        with pytest.raises(SystemExit) as exc:
+            run_main("current", "--stack", "dev")
+
+        assert exc.value.code == 1
+        assert "'diagrams' library not installed" in capsys.readouterr().out
+
+    def test_failed_explicit_stack_exits_nonzero(self, run_main, renders):
+        """Test a requested stack that cannot be drawn fails the run."""
+        with pytest.raises(SystemExit) as exc:
+            run_main("--stack", "missing")
+
+        assert exc.value.code == 1
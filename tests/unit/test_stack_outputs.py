@@ -0,0 +1,191 @@
+"""
+Unit tests for the local stack output cache.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import stack_outputs
+from models.stack_outputs import (
+    CACHE_SCHEMA_VERSION,
+    StackOutputsCache,
+    get_stack_outputs,
+    invalidate_stack_outputs,
+    read_stack_outputs_cache,
+    write_stack_outputs,
+)
+
+
+@pytest.fixture
+def cli_outputs(monkeypatch):
+    """Replace the Pulumi CLI with a recorder returning fixed outputs."""
+    calls = []
+
+    def fake_fetch(stack=None, pulumi_dir=None):
+        calls.append(stack)
+        return {"vpc_id": "vpc-from-cli"}, 7
+
+    monkeypatch.setattr(stack_outputs, "fetch_stack_outputs", fake_fetch)
+    monkeypatch.setattr(stack_outputs, "latest_update_version", lambda stack, pulumi_dir: None)
+    return calls
+
+
+@pytest.fixture
+def latest_version(monkeypatch):
+    """Report update 7 as the stack's latest, recording each history lookup."""
+    lookups = []
+
+    def fake_latest(stack=None, pulumi_dir=None):
+        lookups.append(stack)
+        return 7
+
+    monkeypatch.setattr(stack_outputs, "latest_update_version", fake_latest)
+    return lookups
+
+
+class TestStackOutputsCache:
+    """Test reading and writing the cache file."""
+
+    def test_write_and_read_roundtrip(self, tmp_path):
+        """Test cached outputs are read back with their metadata."""
+        write_stack_outputs("local", {"vpc_id": "vpc-123"}, update_version=3, cache_dir=tmp_path)
+
+        entry = read_stack_outputs_cache("local", cache_dir=tmp_path)
+
+        assert entry.stack == "local"
+        assert entry.update_version == 3
+        assert entry.schema_version == CACHE_SCHEMA_VERSION
+        assert entry.outputs == {"vpc_id": "vpc-123"}
+
+    def test_read_missing_returns_none(self, tmp_path):
+        """Test a missing cache file reads as None."""
+        assert read_stack_outputs_cache("dev", cache_dir=tmp_path) is None
+
+    def test_read_latest_when_stack_not_given(self, tmp_path):
+        """Test the most recently written stack is used by default."""
+        write_stack_outputs("local", {"vpc_id": "vpc-local"}, cache_dir=tmp_path)
+        write_stack_outputs("dev", {"vpc_id": "vpc-dev"}, cache_dir=tmp_path)
+        os.utime(tmp_path / "local.outputs.json", (0, 0))
+
+        assert read_stack_outputs_cache(cache_dir=tmp_path).stack == "dev"
+
+    def test_stale_by_age(self):
+        """Test entries older than max_age are stale."""
+        entry = StackOutputsCache(
+            stack="local",
+            timestamp=datetime.now(timezone.utc) - timedelta(hours=2)
+        )
+
+        assert entry.is_stale(timedelta(hours=1))
+        assert not entry.is_stale(timedelta(hours=3))
+
+    def test_stale_by_schema_version(self):
+        """Test entries from another cache format are stale."""
+        entry = StackOutputsCache(stack="local", schema_version=CACHE_SCHEMA_VERSION + 1)
+
+        assert entry.is_stale()
+
+    def test_stale_by_update_version(self):
+        """Test entries recorded for another update are stale, whatever their age."""
+        entry = StackOutputsCache(stack="local", update_version=3)
+
+        assert entry.is_stale(latest_version=4)
+        assert not entry.is_stale(latest_version=3)
+        assert not entry.is_stale()
+
+    def test_invalidate(self, tmp_path):
+        """Test invalidation removes the entry."""
+        write_stack_outputs("local", {}, cache_dir=tmp_path)
+        invalidate_stack_outputs("local", cache_dir=tmp_path)
+        invalidate_stack_outputs("local", cache_dir=tmp_path)
+
+        assert read_stack_outputs_cache("local", cache_dir=tmp_path) is None
+
+
+class TestGetStackOutputs:
+    """Test cache-first lookup with CLI fallback."""
+
+    def test_fresh_cache_skips_cli(self, tmp_path, cli_outputs):
+        """Test a fresh cache is served without calling the CLI."""
+        write_stack_outputs("local", {"vpc_id": "vpc-cached"}, cache_dir=tmp_path)
+
+        outputs = get_stack_outputs("local", cache_dir=tmp_path)
+
+        assert outputs == {"vpc_id": "vpc-cached"}
+        assert cli_outputs == []
+
+    def test_missing_cache_falls_back_and_writes(self, tmp_path, cli_outputs):
+        """Test a cache miss queries the CLI and populates the cache."""
+        outputs = get_stack_outputs("local", cache_dir=tmp_path)
+
+        assert outputs == {"vpc_id": "vpc-from-cli"}
+        assert cli_outputs == ["local"]
+        assert read_stack_outputs_cache("local", cache_dir=tmp_path).update_version == 7
+
+    def test_stale_cache_falls_back(self, tmp_path, cli_outputs):
+        """Test a stale cache is refreshed from the CLI."""
+        write_stack_outputs("local", {"vpc_id": "vpc-old"}, cache_dir=tmp_path)
+
+        outputs = get_stack_outputs("local", max_age=timedelta(0), cache_dir=tmp_path)
+
+        assert outputs == {"vpc_id": "vpc-from-cli"}
+
+    def test_refresh_bypasses_cache(self, tmp_path, cli_outputs):
+        """Test refresh=True always queries the CLI."""
+        write_stack_outputs("local", {"vpc_id": "vpc-cached"}, cache_dir=tmp_path)
+
+        get_stack_outputs("local", refresh=True, cache_dir=tmp_path)
+
+        assert cli_outputs == ["local"]
+
+    def test_newer_update_falls_back(self, tmp_path, cli_outputs, latest_version):
+        """Test a deploy made outside deploy.py invalidates a young cache."""
+        write_stack_outputs("local", {"vpc_id": "vpc-old"}, update_version=3, cache_dir=tmp_path)
+
+        outputs = get_stack_outputs("local", cache_dir=tmp_path, check_version=True)
+
+        assert outputs == {"vpc_id": "vpc-from-cli"}
+        assert latest_version == ["local"]
+
+    def test_latest_update_uses_cache(self, tmp_path, cli_outputs, latest_version):
+        """Test a cache recorded for the latest update skips `pulumi stack output`."""
+        write_stack_outputs("local", {"vpc_id": "vpc-cached"}, update_version=7, cache_dir=tmp_path)
+
+        outputs = get_stack_outputs("local", cache_dir=tmp_path, check_version=True)
+
+        assert outputs == {"vpc_id": "vpc-cached"}
+        assert cli_outputs == []
+
+    def test_version_check_is_opt_in(self, tmp_path, cli_outputs, latest_version):
+        """Test the default lookup trusts the cache without `pulumi stack history`."""
+        write_stack_outputs("local", {"vpc_id": "vpc-cached"}, update_version=3, cache_dir=tmp_path)
+
+        outputs = get_stack_outputs("local", cache_dir=tmp_path)
+
+        assert outputs == {"vpc_id": "vpc-cached"}
+        assert latest_version == []
+
+    def test_newer_deploy_record_falls_back(self, tmp_path, cli_outputs, latest_version):
+        """Test a deploy recorded after the cache was written invalidates it."""
+        write_stack_outputs("local", {"vpc_id": "vpc-old"}, cache_dir=tmp_path)
+        record = tmp_path / "local.deployed.json"
+        record.write_text("{}")
+        deployed = (datetime.now(timezone.utc) + timedelta(minutes=1)).timestamp()
+        os.utime(record, (deployed, deployed))
+
+        outputs = get_stack_outputs("local", cache_dir=tmp_path)
+
+        assert outputs == {"vpc_id": "vpc-from-cli"}
+        assert latest_version == []
+
+    def test_older_deploy_record_uses_cache(self, tmp_path, cli_outputs):
+        """Test outputs captured after the last deploy are served from the cache."""
+        record = tmp_path / "local.deployed.json"
+        record.write_text("{}")
+        os.utime(record, (0, 0))
+        write_stack_outputs("local", {"vpc_id": "vpc-cached"}, cache_dir=tmp_path)
+
+        assert get_stack_outputs("local", cache_dir=tmp_path) == {"vpc_id": "vpc-cached"}
+        assert cli_outputs == []
@@ -0,0 +1,157 @@
+"""
+Unit tests for the warm stack pool bookkeeping.
+
+Deploys are never run here; stacks are seeded directly into the pool state.
+"""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+import stack_pool
+from stack_pool import DIRTY, LEASED, READY, PoolTimeout, StackPool
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    """Two-stack pool with its state in a temporary directory."""
+    monkeypatch.setattr(stack_pool, "POOL_DIR", tmp_path)
+    pool = StackPool(size=2)
+    with pool._locked_state() as state:
+        for name in pool.stack_names:
+            state["stacks"][name] = {"status": READY}
+    return pool
+
+
+@pytest.fixture
+def dead_pid():
+    """PID of a process that has already exited."""
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+class TestStackPool:
+    """Test leasing, releasing and metrics."""
+
+    def test_stack_names(self):
+        """Test pool stacks are numbered from the prefix."""
+        assert StackPool(size=3).stack_names == ["local-pool-0", "local-pool-1", "local-pool-2"]
+
+    def test_lease_marks_stack_leased(self, pool):
+        """Test a lease takes a ready stack out of the pool."""
+        stack = pool.lease(timeout=0)
+
+        assert stack.name == "local-pool-0"
+        stats = pool.stats()
+        assert stats["leased"] == 1
+        assert stats["ready"] == 1
+        assert stats["leases"] == 1
+
+    def test_lease_times_out_when_exhausted(self, pool):
+        """Test leasing fails once every stack is taken."""
+        pool.lease(timeout=0)
+        pool.lease(timeout=0)
+
+        with pytest.raises(PoolTimeout):
+            pool.lease(timeout=0, poll_interval=0)
+
+    def test_clean_release_skips_reset(self, pool, monkeypatch):
+        """Test releasing a clean stack makes it ready without a reset."""
+        monkeypatch.setattr(pool, "_reset", lambda name: pytest.fail("unexpected reset"))
+
+        with pool.leased(timeout=0) as stack:
+            assert pool.stats()[LEASED] == 1
+
+        assert pool.stats()[READY] == 2
+        assert stack.dirty is False
+
+    def test_dirty_release_resets(self, pool, monkeypatch):
+        """Test releasing a dirty stack resets it first."""
+        resets = []
+        monkeypatch.setattr(pool, "_reset", lambda name: resets.append(name) or True)
+
+        with pool.leased(timeout=0) as stack:
+            stack.mark_dirty()
+
+        assert resets == [stack.name]
+        assert pool.stats()[READY] == 2
+
+    def test_wait_metrics(self, pool):
+        """Test lease wait times are recorded."""
+        pool.lease(timeout=0)
+        stats = pool.stats()
+
+        assert stats["size"] == 2
+        assert stats["wait_max_s"] >= 0.0
+        assert stats["wait_mean_s"] >= 0.0
+
+    def test_stats_is_read_only(self, pool):
+        """Test reading stats never rewrites the state file."""
+        before = pool.state_file.stat().st_mtime_ns
+        pool.state_file.chmod(0o444)
+        try:
+            pool.stats()
+        finally:
+            pool.state_file.chmod(0o644)
+
+        assert pool.state_file.stat().st_mtime_ns == before
+
+
+class TestReclaim:
+    """Test recovery of stacks abandoned by crashed workers."""
+
+    def test_dead_owner_is_reclaimed(self, pool, dead_pid, monkeypatch):
+        """Test a stack leased by a dead process is reset before its next lease."""
+        resets = []
+        monkeypatch.setattr(pool, "_reset", lambda name: resets.append(name) or True)
+        with pool._locked_state() as state:
+            state["stacks"]["local-pool-0"] = {
+                "status": LEASED, "since": time.time(), "pid": dead_pid, "leased_by": "gw0"
+            }
+            state["stacks"]["local-pool-1"] = {"status": LEASED, "since": time.time()}
+
+        stack = pool.lease(timeout=0)
+
+        assert stack.name == "local-pool-0"
+        assert resets == ["local-pool-0"]
+        assert pool.stats()[LEASED] == 2
+
+    def test_expired_lease_is_reclaimed(self, pool, monkeypatch):
+        """Test a lease older than the TTL is marked dirty, even if its owner lives."""
+        monkeypatch.setattr(pool, "_reset", lambda name: True)
+        monkeypatch.setattr(pool, "_provision", lambda name: pytest.fail("unexpected deploy"))
+        pool.lease_ttl = 60
+        with pool._locked_state() as state:
+            state["stacks"]["local-pool-1"] = {
+                "status": LEASED, "since": time.time() - 120, "pid": 1
+            }
+
+        assert pool.ensure_warm() == 2
+        assert pool.stats()[READY] == 2
+
+    def test_live_owner_keeps_lease(self, pool):
+        """Test a lease held by a running process within the TTL is left alone."""
+        pool.lease(timeout=0)
+        with pool._locked_state() as state:
+            assert pool._reclaim(state) == []
+
+        assert pool.stats()[LEASED] == 1
+        assert pool.stats()[DIRTY] == 0
+
+    def test_failed_reset_marks_broken(self, pool, dead_pid, monkeypatch):
+        """Test a reclaimed stack that cannot be reset is not leased."""
+        monkeypatch.setattr(pool, "_reset", lambda name: False)
+        with pool._locked_state() as state:
+            for name in pool.stack_names:
+                state["stacks"][name] = {"status": LEASED, "since": time.time(), "pid": dead_pid}
+
+        with pytest.raises(PoolTimeout):
+            pool.lease(timeout=0, poll_interval=0)
+
+        stats = pool.stats()
+        assert stats["broken"] == 1
+        assert stats[DIRTY] == 1
+        assert stats[LEASED] == 0
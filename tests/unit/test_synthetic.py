@@ -0,0 +1,107 @@
+"""
+Unit tests for the synthetic intent generator.
+"""
+
+import ipaddress
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from models.aws_intent import AWSNetworkIntent
+from models.synthetic import (
+    FAULTS,
+    SyntheticSpec,
+    generate_fleet,
+    generate_intent,
+    inject_fault,
+    write_fleet,
+)
+
+
+class TestGenerateFleet:
+    """Test fleet shape, determinism and validity."""
+
+    def test_shape(self):
+        """Test VPC, AZ, tier and route counts follow the spec."""
+        fleet = generate_fleet(vpcs=3, azs=2, tiers=["public", "app"], subnets_per_tier=4,
+                               static_routes=50)
+
+        assert len(fleet) == 3
+        intent = fleet[0].to_intent()
+        assert len(intent.vpc.subnets) == 2 * 2 * 4
+        assert {s.availability_zone for s in intent.vpc.subnets} == {"us-east-1a", "us-east-1b"}
+        assert sum(s.public for s in intent.vpc.subnets) == 8
+        assert len(intent.vpn.static_routes) == 50
+        assert intent.enable_nat_gateway is True
+
+    def test_vpcs_do_not_overlap(self):
+        """Test each VPC gets its own address space."""
+        fleet = generate_fleet(vpcs=300)
+
+        networks = [ipaddress.ip_network(s.data["vpc"]["cidr_block"]) for s in fleet]
+        assert len(set(networks)) == 300
+
+    def test_seeded(self):
+        """Test the same seed gives the same fleet and faults."""
+        spec = SyntheticSpec(vpcs=20, overlap_rate=0.5, error_rate=0.5, seed=7)
+
+        assert generate_fleet(spec) == generate_fleet(spec)
+        assert generate_fleet(spec) != generate_fleet(spec.model_copy(update={"seed": 8}))
+
+    def test_fault_injection(self):
+        """Test intents validate exactly when no fault was injected."""
+        fleet = generate_fleet(vpcs=60, overlap_rate=0.3, error_rate=0.3, static_routes=3, seed=1)
+
+        assert any(s.faults for s in fleet) and any(s.valid for s in fleet)
+        for synthetic in fleet:
+            if synthetic.valid:
+                synthetic.to_intent()
+            else:
+                with pytest.raises(ValidationError):
+                    synthetic.to_intent()
+
+    @pytest.mark.parametrize("fault", FAULTS)
+    def test_each_fault_is_invalid(self, fault):
+        """Test every fault kind breaks validation."""
+        synthetic = generate_fleet(vpcs=1)[0]
+        inject_fault(synthetic.data, fault, random.Random(0))
+
+        with pytest.raises(ValidationError):
+            AWSNetworkIntent.model_validate(synthetic.data)
+
+    def test_too_many_subnets(self):
+        """Test a VPC that cannot fit its subnets at /28 is rejected."""
+        with pytest.raises(ValueError, match="do not fit"):
+            generate_fleet(subnets_per_tier=500)
+
+    def test_100k_subnets(self):
+        """Test a fleet can reach 100k subnets."""
+        fleet = generate_fleet(vpcs=25, subnets_per_tier=445)
+
+        assert sum(len(s.data["vpc"]["subnets"]) for s in fleet) > 100_000
+
+
+def test_construct_matches_validate():
+    """Test the model_construct fast path builds the same intent."""
+    synthetic = generate_fleet(vpcs=1, static_routes=5)[0]
+
+    assert synthetic.to_intent(validate=False).model_dump() == synthetic.to_intent().model_dump()
+
+
+def test_generate_intent():
+    """Test a single validated intent can be generated directly."""
+    intent = generate_intent(subnets_per_tier=2, vpcs=10)
+
+    assert intent.project_name == "synth-0000"
+    assert len(intent.vpc.subnets) == 18
+
+
+def test_write_fleet(tmp_path):
+    """Test YAML files round-trip through AWSNetworkIntent.from_yaml."""
+    fleet = generate_fleet(vpcs=2, static_routes=2)
+
+    paths = write_fleet(fleet, tmp_path / "fleet")
+
+    assert [p.name for p in paths] == ["synth-0000.yaml", "synth-0001.yaml"]
+    assert AWSNetworkIntent.from_yaml(paths[1]) == fleet[1].to_intent()
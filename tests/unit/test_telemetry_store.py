@@ -0,0 +1,95 @@
+"""
+Unit tests for the tunnel telemetry history.
+"""
+
+import time
+
+import pytest
+
+from telemetry_store import DAY, HOUR, RAW_RETENTION, TelemetryStore, parse_duration
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Empty telemetry store in a temporary directory."""
+    with TelemetryStore(tmp_path / "telemetry.db") as store:
+        yield store
+
+
+def minute_samples(start, states, vpn_id="vpn-1", outside_ip="203.0.113.10"):
+    """One sample per minute from start with the given up/down states."""
+    return [(vpn_id, outside_ip, start + i * 60, up) for i, up in enumerate(states)]
+
+
+class TestTelemetryStore:
+    """Test recording and querying tunnel history."""
+
+    def test_availability_and_flaps(self, store):
+        """Test availability, flap count and MTTR from recorded samples."""
+        start = int(time.time()) - 2 * HOUR
+        # 10 up, 5 down, 10 up, 10 down, 5 up
+        states = [True] * 10 + [False] * 5 + [True] * 10 + [False] * 10 + [True] * 5
+        store.record(minute_samples(start, states))
+
+        [report] = store.tunnel_report(start, start + len(states) * 60)
+
+        assert report["samples"] == 40
+        assert report["availability_pct"] == 62.5
+        assert report["flaps"] == 4
+        assert report["outages"] == 2
+        assert report["mttr_seconds"] == pytest.approx((5 * 60 + 10 * 60) / 2)
+
+    def test_window_excludes_other_samples(self, store):
+        """Test only samples inside the window are counted."""
+        start = int(time.time()) - 2 * HOUR
+        store.record(minute_samples(start, [False] * 30 + [True] * 30))
+
+        [report] = store.tunnel_report(start + 30 * 60, start + 60 * 60)
+
+        assert report["availability_pct"] == 100.0
+        assert report["flaps"] == 1
+
+    def test_duplicates_ignored(self, store):
+        """Test re-recording the same sample does not double count."""
+        start = int(time.time()) - HOUR
+        store.record(minute_samples(start, [True] * 5))
+
+        assert store.record(minute_samples(start, [True] * 5)) == 0
+        assert store.tunnel_report(start)[0]["samples"] == 5
+
+    def test_state_survives_reopen(self, tmp_path):
+        """Test transitions continue from the stored state after reopening."""
+        start = int(time.time()) - HOUR
+        with TelemetryStore(tmp_path / "t.db") as store:
+            store.record(minute_samples(start, [True] * 3))
+        with TelemetryStore(tmp_path / "t.db") as store:
+            store.record(minute_samples(start + 180, [True, False]))
+
+            assert store.tunnel_report(start)[0]["flaps"] == 1
+
+    def test_downsampled_history_still_counted(self, store):
+        """Test samples past raw retention are compacted and answered from rollups."""
+        now = int(time.time())
+        old = now - RAW_RETENTION - 3 * DAY
+        store.record(minute_samples(old - old % HOUR, [True] * 60 + [False] * 60))
+        store.record(minute_samples(now - 600, [True] * 5))
+
+        [raw_count] = store.db.execute("SELECT COUNT(*) FROM samples").fetchone()
+        [report] = store.tunnel_report(now - 30 * DAY)
+
+        assert raw_count == 5
+        assert report["samples"] == 125
+        assert report["outages"] == 1
+
+    def test_per_vpn_filter(self, store):
+        """Test reports can be limited to one VPN connection."""
+        start = int(time.time()) - HOUR
+        store.record(minute_samples(start, [True] * 3, vpn_id="vpn-1"))
+        store.record(minute_samples(start, [True] * 3, vpn_id="vpn-2"))
+
+        assert [r["vpn_id"] for r in store.tunnel_report(start, vpn_id="vpn-2")] == ["vpn-2"]
+
+    @pytest.mark.parametrize("text,seconds", [("90m", 5400), ("24h", DAY), ("30d", 30 * DAY), ("120", 120)])
+    def test_parse_duration(self, text, seconds):
+        """Test window lengths with units."""
+        assert parse_duration(text) == seconds
@@ -0,0 +1,284 @@
+"""
+Unit tests for the diagram topology model.
+"""
+
+from pathlib import Path
+
+from models.aws_intent import AWSNetworkIntent, CustomerGatewayIntent
+from models.topology import Topology, subnet_tier
+
+EXAMPLES = Path(__file__).resolve().parents[2] / "examples"
+
+
+def resource(rtype, name, **outputs):
+    """A resource entry as it appears in `pulumi stack export`."""
+    return {
+        "urn": f"urn:pulumi:local::cloud-networking-lab::{rtype}::{name}",
+        "type": rtype,
+        "id": outputs.get("id"),
+        "outputs": outputs,
+    }
+
+
+def state_export():
+    """State export for a VPC with two subnets, an IGW, a web server and a VPN."""
+    return {
+        "version": 3,
+        "deployment": {
+            "resources": [
+                resource("pulumi:pulumi:Stack", "cloud-networking-lab-local"),
+                resource("aws:ec2/vpc:Vpc", "vpc", id="vpc-1", cidrBlock="10.0.0.0/16",
+                         tags={"Name": "lab-vpc"}),
+                resource("aws:ec2/subnet:Subnet", "public-a", id="subnet-a", vpcId="vpc-1",
+                         cidrBlock="10.0.1.0/24", availabilityZone="us-east-1a",
+                         mapPublicIpOnLaunch=True, tags={"Name": "lab-public-a"}),
+                resource("aws:ec2/subnet:Subnet", "private-b", id="subnet-b", vpcId="vpc-1",
+                         cidrBlock="10.0.12.0/24", availabilityZone="us-east-1b",
+                         mapPublicIpOnLaunch=False, tags={"Name": "lab-private-b"}),
+                resource("aws:ec2/internetGateway:InternetGateway", "igw", id="igw-1",
+                         vpcId="vpc-1"),
+                resource("aws:ec2/routeTable:RouteTable", "public-rt", id="rtb-1", vpcId="vpc-1",
+                         routes=[{"cidrBlock": "0.0.0.0/0", "gatewayId": "igw-1"}]),
+                resource("aws:ec2/route:Route", "public-route", id="r-1", routeTableId="rtb-1",
+                         destinationCidrBlock="0.0.0.0/0", gatewayId="igw-1"),
+                resource("aws:ec2/routeTableAssociation:RouteTableAssociation", "assoc-a",
+                         id="rtbassoc-1", routeTableId="rtb-1", subnetId="subnet-a"),
+                resource("aws:ec2/instance:Instance", "web", id="i-1", subnetId="subnet-a",
+                         privateIp="10.0.1.10", instanceType="t3.micro"),
+                resource("aws:ec2/vpnGateway:VpnGateway", "vgw", id="vgw-1", vpcId="vpc-1"),
+                resource("aws:ec2/customerGateway:CustomerGateway", "cgw", id="cgw-1",
+                         ipAddress="203.0.113.1", bgpAsn="65000"),
+                resource("aws:ec2/vpnConnection:VpnConnection", "vpn", id="vpn-1",
+                         vpnGatewayId="vgw-1", customerGatewayId="cgw-1"),
+                resource("aws:ec2/securityGroup:SecurityGroup", "sg", id="sg-1", vpcId="vpc-1"),
+            ]
+        }
+    }
+
+
+class TestFromStateExport:
+    """Test building the topology from Pulumi state."""
+
+    def test_all_network_resources(self):
+        """Test every network resource becomes a node."""
+        topology = Topology.from_state_export(state_export(), name="local")
+
+        kinds = sorted(n.kind for n in topology.nodes)
+        assert kinds == ["cgw", "igw", "instance", "route_table", "subnet", "subnet", "vgw", "vpc"]
+
+    def test_subnet_attributes(self):
+        """Test subnets carry CIDR, AZ, tier and their VPC."""
+        topology = Topology.from_state_export(state_export())
+
+        private, public = topology.of_kind("subnet")
+        assert private.attrs == {"cidr": "10.0.12.0/24", "az": "us-east-1b", "tier": "private"}
+        assert public.attrs["tier"] == "public"
+        assert public.parent == "vpc-1"
+        assert [n.id for n in topology.children("subnet-a")] == ["i-1"]
+
+    def test_children_by_kind(self):
+        """Test children are sorted by label and filtered by kind."""
+        topology = Topology.from_state_export(state_export())
+
+        assert [n.kind for n in topology.children("vpc-1")] == [
+            "igw", "subnet", "subnet", "route_table", "vgw"
+        ]
+        assert [n.id for n in topology.children("vpc-1", "subnet")] == ["subnet-b", "subnet-a"]
+        assert topology.children("vpc-1", "nat") == []
+        assert topology.children("missing") == []
+        assert topology.node("rtb-1").kind == "route_table"
+        assert topology.node("missing") is None
+
+    def test_edges(self):
+        """Test routes, associations and VPN links become edges, without duplicates."""
+        topology = Topology.from_state_export(state_export())
+
+        edges = {(e.source, e.target, e.label) for e in topology.edges}
+        assert edges == {
+            ("rtb-1", "igw-1", "0.0.0.0/0"),
+            ("rtb-1", "subnet-a", None),
+            ("vgw-1", "cgw-1", "IPsec VPN"),
+        }
+
+    def test_empty_state(self):
+        """Test an empty export gives an empty topology."""
+        assert Topology.from_state_export({}).nodes == []
+
+
+def large_state_export(subnets_per_group=37):
+    """State export with ~1,000 resources: 3 AZs x 3 tiers of subnets, each with an instance."""
+    resources = [resource("aws:ec2/vpc:Vpc", "vpc", id="vpc-1", cidrBlock="10.0.0.0/8")]
+    resources.append(resource("aws:ec2/routeTable:RouteTable", "rt", id="rtb-1", vpcId="vpc-1"))
+    n = 0
+    for az in ("us-east-1a", "us-east-1b", "us-east-1c"):
+        for tier in ("public", "app", "data"):
+            for _ in range(subnets_per_group):
+                n += 1
+                resources.append(resource(
+                    "aws:ec2/subnet:Subnet", f"s{n}", id=f"subnet-{n}", vpcId="vpc-1",
+                    cidrBlock=f"10.{n // 256}.{n % 256}.0/24", availabilityZone=az,
+                    tags={"Name": f"lab-{tier}-{n}"}
+                ))
+                resources.append(resource(
+                    "aws:ec2/routeTableAssociation:RouteTableAssociation", f"a{n}",
+                    routeTableId="rtb-1", subnetId=f"subnet-{n}"
+                ))
+                resources.append(resource(
+                    "aws:ec2/instance:Instance", f"i{n}", id=f"i-{n}", subnetId=f"subnet-{n}"
+                ))
+    return {"deployment": {"resources": resources}}
+
+
+class TestLevelOfDetail:
+    """Test collapsed and drill-down views."""
+
+    def test_small_vpc_not_collapsed(self):
+        """Test VPCs under the threshold are drawn as-is."""
+        topology = Topology.from_state_export(state_export())
+
+        assert topology.collapse(threshold=2) is topology
+
+    def test_collapse_by_az_and_tier(self):
+        """Test subnets fold into per-AZ/tier groups with counts."""
+        topology = Topology.from_state_export(state_export())
+
+        collapsed = topology.collapse(threshold=1)
+
+        groups = {n.id: n.attrs for n in collapsed.of_kind("subnet_group")}
+        assert groups["vpc-1/us-east-1a/public"] == {
+            "az": "us-east-1a", "tier": "public", "count": "1", "instances": "1"
+        }
+        assert not collapsed.of_kind("subnet", "instance")
+        edges = {(e.source, e.target) for e in collapsed.edges}
+        assert ("rtb-1", "vpc-1/us-east-1a/public") in edges
+
+    def test_collapse_large_stack(self):
+        """Test a 1,000-resource stack collapses to a handful of nodes."""
+        topology = Topology.from_state_export(large_state_export(), name="large")
+        assert len(topology.nodes) + len(topology.edges) > 1000
+
+        collapsed = topology.collapse()
+
+        groups = collapsed.of_kind("subnet_group")
+        assert len(groups) == 9
+        assert sum(int(g.attrs["count"]) for g in groups) == 9 * 37
+        assert len(collapsed.edges) == 9
+
+    def test_focus(self):
+        """Test drill-down keeps one AZ's subnets and drops the rest."""
+        topology = Topology.from_state_export(state_export())
+
+        focused = topology.focus(az="us-east-1a")
+
+        assert [n.id for n in focused.of_kind("subnet")] == ["subnet-a"]
+        assert focused.node("i-1") and focused.node("igw-1")
+
+        focused = topology.focus(tier="private")
+        assert [n.id for n in focused.of_kind("subnet")] == ["subnet-b"]
+        assert focused.node("i-1") is None
+        assert all(e.target != "subnet-a" for e in focused.edges)
+
+
+class TestFromIntent:
+    """Test building the planned topology from an intent file."""
+
+    def test_vpc_with_vpn(self):
+        """Test subnets, NAT, IGW, VGW and CGW are drawn from the example intent."""
+        intent = AWSNetworkIntent.from_yaml(EXAMPLES / "vpc_with_vpn.yaml")
+
+        topology = Topology.from_intent(intent)
+
+        assert topology.name == "hybrid-lab"
+        assert sorted(n.kind for n in topology.nodes) == [
+            "cgw", "igw", "nat", "route_table", "route_table",
+            "subnet", "subnet", "subnet", "subnet", "vgw", "vpc",
+        ]
+        assert topology.node("subnet:private-a").attrs == {
+            "cidr": "10.0.11.0/24", "az": "us-east-1a", "tier": "private"
+        }
+        assert topology.node("nat").parent == "subnet:public-a"
+        assert topology.node("cgw").attrs == {"ip": "203.0.113.1", "bgp_asn": "65000"}
+        edges = {(e.source, e.target, e.label) for e in topology.edges}
+        assert ("rtb:private", "nat", "0.0.0.0/0") in edges
+        assert ("vgw", "rtb:private", "propagation") in edges
+        assert ("vgw", "cgw", "IPsec VPN") in edges
+
+    def test_basic_vpc(self):
+        """Test a public-only intent without VPN has no NAT or VPN nodes."""
+        intent = AWSNetworkIntent.from_yaml(EXAMPLES / "basic_vpc.yaml")
+
+        kinds = {n.kind for n in Topology.from_intent(intent).nodes}
+
+        assert not kinds & {"nat", "vgw", "cgw"}
+
+    def test_static_routes(self):
+        """Test static VPN routes become route table edges to the VGW."""
+        intent = AWSNetworkIntent.from_yaml(EXAMPLES / "vpc_with_vpn.yaml")
+        intent.vpn.static_routes_only = True
+        intent.vpn.static_routes = ["192.168.0.0/16"]
+
+        edges = {(e.source, e.target, e.label) for e in Topology.from_intent(intent).edges}
+
+        assert ("rtb:public", "vgw", "192.168.0.0/16") in edges
+        assert not any(label == "propagation" for _, _, label in edges)
+
+    def test_transit_gateway(self):
+        """Test spokes attach to the TGW and the VPN terminates on it (no VGW)."""
+        intent = AWSNetworkIntent.from_yaml(EXAMPLES / "hub_and_spoke.yaml")
+
+        topology = Topology.from_intent(intent)
+
+        assert not topology.of_kind("vgw")
+        assert {n.id for n in topology.of_kind("vpc")} == {
+            "vpc:hub-lab", "vpc:shared-services", "vpc:analytics"
+        }
+        assert topology.node("subnet:analytics/tgw-b").parent == "vpc:analytics"
+        edges = {(e.source, e.target, e.label) for e in topology.edges}
+        assert ("tgw", "vpc:analytics", "attachment") in edges
+        assert ("tgw", "cgw", "IPsec VPN x2 (ECMP)") in edges
+        assert ("rtb:public", "tgw", "192.168.0.0/16") in edges
+        assert ("rtb:shared-services", "tgw", "10.0.0.0/8") in edges
+        assert not any(label == "propagation" for _, _, label in edges)
+
+    def test_ecmp_customer_gateways(self):
+        """Test ECMP connections are spread over every customer gateway."""
+        intent = AWSNetworkIntent.from_yaml(EXAMPLES / "hub_and_spoke.yaml")
+        intent.vpn.connections = 3
+        intent.vpn.bandwidth_gbps = None
+        intent.vpn.additional_customer_gateways = [
+            CustomerGatewayIntent(ip_address="203.0.113.2", bgp_asn=65001)
+        ]
+
+        edges = {(e.source, e.target, e.label) for e in Topology.from_intent(intent).edges}
+
+        assert ("tgw", "cgw", "IPsec VPN x2 (ECMP)") in edges
+        assert ("tgw", "cgw:1", "IPsec VPN x1 (ECMP)") in edges
+
+
+class TestGraphHash:
+    """Test the content hash used to skip unchanged renders."""
+
+    def test_order_independent(self):
+        """Test resource order in the export does not change the hash."""
+        state = state_export()
+        reversed_state = state_export()
+        reversed_state["deployment"]["resources"].reverse()
+
+        assert (Topology.from_state_export(state).graph_hash()
+                == Topology.from_state_export(reversed_state).graph_hash())
+
+    def test_changes_with_infrastructure(self):
+        """Test a changed CIDR changes the hash."""
+        before = Topology.from_state_export(state_export())
+        state = state_export()
+        state["deployment"]["resources"][2]["outputs"]["cidrBlock"] = "10.0.5.0/24"
+
+        assert Topology.from_state_export(state).graph_hash() != before.graph_hash()
+
+
+def test_subnet_tier():
+    """Test tier classification from tags, names and public IP mapping."""
+    assert subnet_tier("lab-db-a", False) == "data"
+    assert subnet_tier("lab-app-a", False) == "app"
+    assert subnet_tier("lab-a", True) == "public"
+    assert subnet_tier("lab-a", False, {"Tier": "Edge"}) == "edge"
@@ -0,0 +1,934 @@
+"""
+Unit tests for the VPN verification script.
+
+The EC2 client is replaced with an in-memory fake; no AWS calls are made.
+"""
+
+import asyncio
+import copy
+import json
+import socket
+import sys
+import urllib.request
+from collections import OrderedDict
+
+import pytest
+
+import verify_connectivity
+from verify_connectivity import (
+    AccountTarget,
+    ProbeStats,
+    ProbeTarget,
+    VPNConnectionInfo,
+    VPNMonitor,
+    VPNVerifier,
+    connection_to_dict,
+    get_gateway_config,
+    parse_gateway_config,
+    parse_probe_target,
+    probe_tunnels,
+    read_vpn_ids,
+    resolve_regions,
+    route_count_alerts,
+    verify_estate,
+)
+
+
+def _tunnel_xml(cgw_outside, vgw_outside, cgw_inside, vgw_inside):
+    return f"""
+  <ipsec_tunnel>
+    <customer_gateway>
+      <tunnel_outside_address><ip_address>{cgw_outside}</ip_address></tunnel_outside_address>
+      <tunnel_inside_address>
+        <ip_address>{cgw_inside}</ip_address>
+        <network_mask>255.255.255.252</network_mask>
+        <network_cidr>30</network_cidr>
+      </tunnel_inside_address>
+      <bgp><asn>65000</asn><hold_time>30</hold_time></bgp>
+    </customer_gateway>
+    <vpn_gateway>
+      <tunnel_outside_address><ip_address>{vgw_outside}</ip_address></tunnel_outside_address>
+      <tunnel_inside_address>
+        <ip_address>{vgw_inside}</ip_address>
+        <network_mask>255.255.255.252</network_mask>
+        <network_cidr>30</network_cidr>
+      </tunnel_inside_address>
+      <bgp><asn>64512</asn><hold_time>30</hold_time></bgp>
+    </vpn_gateway>
+    <ike>
+      <authentication_protocol>sha1</authentication_protocol>
+      <encryption_protocol>aes-128-cbc</encryption_protocol>
+      <lifetime>28800</lifetime>
+      <perfect_forward_secrecy>group2</perfect_forward_secrecy>
+      <mode>main</mode>
+      <pre_shared_key>secret-psk</pre_shared_key>
+    </ike>
+    <ipsec>
+      <protocol>esp</protocol>
+      <encryption_protocol>aes-128-cbc</encryption_protocol>
+      <lifetime>3600</lifetime>
+      <dead_peer_detection><delay>10</delay><retries>3</retries></dead_peer_detection>
+    </ipsec>
+  </ipsec_tunnel>"""
+
+
+CUSTOMER_GATEWAY_CONFIG = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n<vpn_connection id="vpn-12345678">'
+    + _tunnel_xml("198.51.100.1", "203.0.113.10", "169.254.10.2", "169.254.10.1")
+    + _tunnel_xml("198.51.100.1", "203.0.113.11", "169.254.10.6", "169.254.10.5")
+    + "\n</vpn_connection>"
+)
+
+
+class FakeEC2:
+    """Minimal stand-in for a boto3 EC2 client."""
+
+    def __init__(self, vpn_connections, vpn_gateways=None, route_tables=None):
+        self.vpn_connections = vpn_connections
+        self.vpn_gateways = vpn_gateways or []
+        self.route_tables = route_tables or []
+        self.calls = []
+
+    def can_paginate(self, operation_name):
+        return False
+
+    def describe_vpn_connections(self, **kwargs):
+        self.calls.append(("describe_vpn_connections", kwargs))
+        ids = kwargs.get("VpnConnectionIds")
+        for f in kwargs.get("Filters", []):
+            if f["Name"] == "vpn-connection-id":
+                ids = f["Values"]
+        return {
+            "VpnConnections": [
+                vpn for vpn in self.vpn_connections
+                if ids is None or vpn["VpnConnectionId"] in ids
+            ]
+        }
+
+    def describe_vpn_gateways(self, VpnGatewayIds):
+        self.calls.append(("describe_vpn_gateways", VpnGatewayIds))
+        return {
+            "VpnGateways": [
+                gw for gw in self.vpn_gateways if gw["VpnGatewayId"] in VpnGatewayIds
+            ]
+        }
+
+    def describe_route_tables(self, Filters):
+        self.calls.append(("describe_route_tables", Filters))
+        vpc_ids = Filters[0]["Values"]
+        return {"RouteTables": [t for t in self.route_tables if t["VpcId"] in vpc_ids]}
+
+
+class FailingEC2(FakeEC2):
+    """EC2 client whose describe calls are denied."""
+
+    def __init__(self):
+        super().__init__([])
+
+    def describe_vpn_connections(self, **kwargs):
+        raise RuntimeError("AccessDenied")
+
+
+class FakeSession:
+    """boto3 session stand-in handing out FakeEC2 clients per region."""
+
+    def __init__(self, clients):
+        self.clients = clients
+
+    def client(self, service_name, region_name=None, **kwargs):
+        return self.clients[region_name]
+
+
+@pytest.fixture
+def fake_ec2(mock_vpn_connection_response):
+    """Fake EC2 client holding one VPN connection."""
+    return FakeEC2([mock_vpn_connection_response])
+
+
+@pytest.fixture
+def verifier(fake_ec2):
+    """VPNVerifier wired to the fake EC2 client."""
+    verifier = VPNVerifier.__new__(VPNVerifier)
+    verifier.ec2 = fake_ec2
+    verifier.region = "us-east-1"
+    return verifier
+
+
+class TestGetVpnConnections:
+    """Test streaming and filtering of VPN connections."""
+
+    def test_returns_generator(self, verifier, fake_ec2):
+        """Test nothing is fetched until the generator is consumed."""
+        connections = verifier.get_vpn_connections()
+
+        assert fake_ec2.calls == []
+        assert [c.vpn_id for c in connections] == ["vpn-12345678"]
+
+    def test_no_filters_by_default(self, verifier, fake_ec2):
+        """Test an unfiltered call sends no Filters."""
+        list(verifier.get_vpn_connections())
+
+        assert fake_ec2.calls == [("describe_vpn_connections", {})]
+
+    def test_server_side_filters(self, verifier, fake_ec2):
+        """Test state, gateway and tag filters are passed to the API."""
+        list(verifier.get_vpn_connections(
+            states=["available"],
+            vpn_gateway_ids=["vgw-12345678"],
+            tags={"Environment": "dev"}
+        ))
+
+        _, kwargs = fake_ec2.calls[0]
+        assert kwargs["Filters"] == [
+            {"Name": "state", "Values": ["available"]},
+            {"Name": "vpn-gateway-id", "Values": ["vgw-12345678"]},
+            {"Name": "tag:Environment", "Values": ["dev"]},
+        ]
+
+    def test_tunnels_parsed_lazily(self, verifier):
+        """Test tunnel status is built from telemetry on first access."""
+        conn = next(verifier.get_vpn_connections())
+
+        assert "tunnels" not in conn.__dict__
+        assert [t.status for t in conn.tunnels] == ["UP", "DOWN"]
+        assert conn.tunnels[1].status_message == "IPSEC IS DOWN"
+        assert "tunnels" in conn.__dict__
+
+    def test_api_error_stops_stream(self, verifier, fake_ec2):
+        """Test API errors end the stream instead of raising."""
+        def fail(**kwargs):
+            raise RuntimeError("throttled")
+
+        fake_ec2.describe_vpn_connections = fail
+
+        assert list(verifier.get_vpn_connections()) == []
+
+
+class TestVPNConnectionInfo:
+    """Test the connection dataclass."""
+
+    def test_no_telemetry(self):
+        """Test a connection without telemetry has no tunnels."""
+        conn = VPNConnectionInfo(
+            vpn_id="vpn-1",
+            state="pending",
+            type="ipsec.1",
+            customer_gateway_id="cgw-1",
+            vpn_gateway_id="vgw-1"
+        )
+
+        assert conn.tunnels == []
+
+
+class TestGatewayConfig:
+    """Test parsing of CustomerGatewayConfiguration XML."""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch):
+        monkeypatch.setattr(verify_connectivity, "_gateway_config_cache", OrderedDict())
+
+    def test_parse_asns_and_tunnels(self):
+        """Test ASNs and per-tunnel addressing are extracted."""
+        config = parse_gateway_config(CUSTOMER_GATEWAY_CONFIG)
+
+        assert config.customer_asn == 65000
+        assert config.amazon_asn == 64512
+        assert [t.tunnel_id for t in config.tunnels] == [1, 2]
+        tunnel = config.tunnels[1]
+        assert tunnel.amazon_outside_ip == "203.0.113.11"
+        assert tunnel.customer_inside_cidr == "169.254.10.6/30"
+        assert tunnel.amazon_inside_cidr == "169.254.10.5/30"
+        assert tunnel.bgp_neighbor_ip == "169.254.10.5"
+        assert tunnel.bgp_hold_time == 30
+
+    def test_parse_ike_ipsec_without_secrets(self):
+        """Test IKE/IPsec parameters are kept and the pre-shared key is not."""
+        tunnel = parse_gateway_config(CUSTOMER_GATEWAY_CONFIG).tunnels[0]
+
+        assert tunnel.ike["encryption_protocol"] == "aes-128-cbc"
+        assert tunnel.ike["lifetime"] == "28800"
+        assert "pre_shared_key" not in tunnel.ike
+        assert tunnel.ipsec["dpd_delay"] == "10"
+
+    def test_cache_skips_reparse(self, monkeypatch):
+        """Test an unchanged document is parsed once per connection."""
+        calls = []
+        real_parse = verify_connectivity.parse_gateway_config
+        monkeypatch.setattr(
+            verify_connectivity, "parse_gateway_config",
+            lambda doc: calls.append(doc) or real_parse(doc)
+        )
+
+        first = get_gateway_config("vpn-1", CUSTOMER_GATEWAY_CONFIG)
+        second = get_gateway_config("vpn-1", CUSTOMER_GATEWAY_CONFIG)
+        get_gateway_config("vpn-1", CUSTOMER_GATEWAY_CONFIG.replace("65000", "65001"))
+
+        assert first is second
+        assert len(calls) == 2
+
+    def test_cache_is_bounded(self, monkeypatch):
+        """Test the least recently used connection is evicted when the cache is full."""
+        monkeypatch.setattr(verify_connectivity, "GATEWAY_CONFIG_CACHE_SIZE", 2)
+
+        get_gateway_config("vpn-1", CUSTOMER_GATEWAY_CONFIG)
+        get_gateway_config("vpn-2", CUSTOMER_GATEWAY_CONFIG)
+        get_gateway_config("vpn-1", CUSTOMER_GATEWAY_CONFIG)
+        get_gateway_config("vpn-3", CUSTOMER_GATEWAY_CONFIG)
+
+        assert list(verify_connectivity._gateway_config_cache) == ["vpn-1", "vpn-3"]
+
+    def test_connection_parses_lazily(self, verifier, fake_ec2, monkeypatch):
+        """Test streaming connections does not parse their configuration."""
+        calls = []
+        real_parse = verify_connectivity.parse_gateway_config
+        monkeypatch.setattr(
+            verify_connectivity, "parse_gateway_config",
+            lambda doc: calls.append(doc) or real_parse(doc)
+        )
+        fake_ec2.vpn_connections[0]["CustomerGatewayConfiguration"] = CUSTOMER_GATEWAY_CONFIG
+
+        conn = next(verifier.get_vpn_connections())
+        assert calls == []
+
+        assert conn.bgp_asn == 65000
+        assert conn.tunnel_configs[0].bgp_neighbor_ip == "169.254.10.1"
+        assert len(calls) == 1
+        assert conn.gateway_config_document is None
+
+    def test_connection_survives_bad_config(self, verifier, fake_ec2, capsys):
+        """Test an unparsable configuration leaves the BGP details empty."""
+        fake_ec2.vpn_connections[0]["CustomerGatewayConfiguration"] = "<vpn_connection>"
+
+        conn = next(verifier.get_vpn_connections())
+
+        assert conn.bgp_asn is None
+        assert conn.tunnel_configs == []
+        assert "Could not parse configuration for vpn-12345678" in capsys.readouterr().out
+
+    def test_connection_gets_asn(self, verifier, fake_ec2):
+        """Test streamed connections carry the parsed configuration."""
+        fake_ec2.vpn_connections[0]["CustomerGatewayConfiguration"] = CUSTOMER_GATEWAY_CONFIG
+
+        conn = next(verifier.get_vpn_connections())
+
+        assert conn.bgp_asn == 65000
+        assert conn.amazon_asn == 64512
+        assert connection_to_dict(conn)["tunnels"][0]["bgp_neighbor_ip"] == "169.254.10.1"
+
+    def test_verify_reports_bgp_neighbors(self, verifier, fake_ec2):
+        """Test single-connection verification includes BGP details."""
+        fake_ec2.vpn_connections[0]["CustomerGatewayConfiguration"] = CUSTOMER_GATEWAY_CONFIG
+
+        results = verifier.verify_vpn_connection("vpn-12345678")
+
+        assert results["bgp_asn"] == 65000
+        assert results["tunnels"][1]["bgp_neighbor_ip"] == "169.254.10.5"
+
+    def test_tunnels_matched_by_outside_ip(self, verifier, fake_ec2, capsys):
+        """Test telemetry listed in reverse still pairs with the right tunnel config."""
+        vpn = fake_ec2.vpn_connections[0]
+        vpn["CustomerGatewayConfiguration"] = CUSTOMER_GATEWAY_CONFIG
+        vpn["VgwTelemetry"].reverse()
+
+        results = verifier.verify_vpn_connection("vpn-12345678")
+        conn = next(verifier.get_vpn_connections())
+        verifier.print_connection_summary(conn)
+
+        assert [(t["outside_ip"], t["bgp_neighbor_ip"]) for t in results["tunnels"]] == [
+            ("203.0.113.11", "169.254.10.5"),
+            ("203.0.113.10", "169.254.10.1"),
+        ]
+        assert [(t["outside_ip"], t["inside_cidr"]) for t in connection_to_dict(conn)["tunnels"]] == [
+            ("203.0.113.11", "169.254.10.6/30"),
+            ("203.0.113.10", "169.254.10.2/30"),
+        ]
+        summary = capsys.readouterr().out
+        assert summary.index("203.0.113.11") < summary.index("BGP neighbor 169.254.10.5")
+        assert summary.index("BGP neighbor 169.254.10.5") < summary.index("203.0.113.10")
+
+    def test_verify_survives_bad_config(self, verifier, fake_ec2):
+        """Test an unparsable configuration becomes a recommendation, not an error."""
+        fake_ec2.vpn_connections[0]["CustomerGatewayConfiguration"] = "<vpn_connection>"
+
+        results = verifier.verify_vpn_connection("vpn-12345678")
+
+        assert results["overall_status"] == "available"
+        assert "bgp_asn" not in results
+        assert any("Could not parse" in r for r in results["recommendations"])
+
+
+class TestAcceptedRoutes:
+    """Test BGP accepted route counts and prefix-limit alerts."""
+
+    def test_tunnel_route_counts(self, verifier):
+        """Test AcceptedRouteCount is kept per tunnel and in JSON output."""
+        conn = next(verifier.get_vpn_connections())
+
+        assert [t.accepted_route_count for t in conn.tunnels] == [2, 0]
+        assert connection_to_dict(conn)["tunnels"][0]["accepted_route_count"] == 2
+        assert conn.prefix_limit == 100
+
+    def test_healthy_counts(self):
+        """Test equal counts well under the limit raise nothing."""
+        assert route_count_alerts([(1, "UP", 20), (2, "UP", 20)]) == []
+
+    def test_near_and_at_limit(self):
+        """Test tunnels near or at the prefix limit are flagged."""
+        at_limit = route_count_alerts([(1, "UP", 100), (2, "UP", 100)])
+        [near] = route_count_alerts([(1, "UP", 90)])
+
+        assert len(at_limit) == 2
+        assert all("at prefix limit" in alert for alert in at_limit)
+        assert "near prefix limit (90/100)" in near
+
+    def test_asymmetric_counts(self):
+        """Test differing counts between UP tunnels are flagged."""
+        [alert] = route_count_alerts([(1, "UP", 10), (2, "UP", 4)])
+
+        assert "Asymmetric" in alert
+
+    def test_down_tunnel_not_asymmetric(self, verifier):
+        """Test a DOWN tunnel with no routes is not reported as asymmetric."""
+        conn = next(verifier.get_vpn_connections())
+
+        assert conn.route_alerts == []
+
+    def test_transit_gateway_limit(self, verifier, fake_ec2):
+        """Test Transit Gateway connections use the higher prefix limit."""
+        vpn = fake_ec2.vpn_connections[0]
+        vpn["TransitGatewayId"] = "tgw-1"
+        vpn["VgwTelemetry"][0]["AcceptedRouteCount"] = 150
+
+        conn = next(verifier.get_vpn_connections())
+
+        assert conn.prefix_limit == 1000
+        assert conn.route_alerts == []
+        assert verifier.verify_vpn_connection("vpn-12345678")["tunnels"][0]["accepted_route_count"] == 150
+
+
+class TestRoutePropagation:
+    """Test route table checks for VPN gateways."""
+
+    @pytest.fixture
+    def routed_ec2(self, fake_ec2):
+        """Fake EC2 with one attached VGW and three route tables."""
+        fake_ec2.vpn_gateways = [{
+            "VpnGatewayId": "vgw-12345678",
+            "VpcAttachments": [{"VpcId": "vpc-1", "State": "attached"}]
+        }]
+        fake_ec2.route_tables = [
+            {
+                "RouteTableId": "rtb-good",
+                "VpcId": "vpc-1",
+                "PropagatingVgws": [{"GatewayId": "vgw-12345678"}],
+                "Routes": [
+                    {"DestinationCidrBlock": "10.0.0.0/16", "GatewayId": "local",
+                     "Origin": "CreateRouteTable", "State": "active"},
+                    {"DestinationCidrBlock": "192.168.0.0/16", "GatewayId": "vgw-12345678",
+                     "Origin": "EnableVgwRoutePropagation", "State": "active"},
+                    {"DestinationCidrBlock": "172.16.0.0/12", "GatewayId": "vgw-12345678",
+                     "Origin": "EnableVgwRoutePropagation", "State": "active"},
+                ]
+            },
+            {
+                "RouteTableId": "rtb-nopropagation",
+                "VpcId": "vpc-1",
+                "PropagatingVgws": [],
+                "Routes": []
+            },
+            {
+                "RouteTableId": "rtb-blackhole",
+                "VpcId": "vpc-1",
+                "PropagatingVgws": [{"GatewayId": "vgw-12345678"}],
+                "Routes": [
+                    {"DestinationCidrBlock": "0.0.0.0/0", "NatGatewayId": "nat-gone",
+                     "Origin": "CreateRoute", "State": "blackhole"},
+                ]
+            },
+            {
+                "RouteTableId": "rtb-other-vpc",
+                "VpcId": "vpc-2",
+                "PropagatingVgws": [],
+                "Routes": []
+            },
+        ]
+        return fake_ec2
+
+    def test_single_route_table_call(self, verifier, routed_ec2):
+        """Test all tables are fetched with one filtered call."""
+        report = verifier.verify_route_propagation(["vgw-12345678"])
+
+        table_calls = [c for c in routed_ec2.calls if c[0] == "describe_route_tables"]
+        assert len(table_calls) == 1
+        assert [t["route_table_id"] for t in report["vgw-12345678"]] == [
+            "rtb-good", "rtb-nopropagation", "rtb-blackhole"
+        ]
+
+    def test_flags_issues(self, verifier, routed_ec2):
+        """Test missing propagation and blackholes are flagged."""
+        tables = {
+            t["route_table_id"]: t
+            for t in verifier.verify_route_propagation(["vgw-12345678"])["vgw-12345678"]
+        }
+
+        assert tables["rtb-good"]["propagated_routes"] == ["192.168.0.0/16", "172.16.0.0/12"]
+        assert tables["rtb-good"]["issues"] == []
+        assert tables["rtb-nopropagation"]["issues"] == ["route propagation not enabled"]
+        assert tables["rtb-blackhole"]["blackhole_routes"] == ["0.0.0.0/0"]
+
+    def test_detached_gateway(self, verifier, fake_ec2):
+        """Test a gateway with no VPC attachment skips the route table call."""
+        assert verifier.verify_route_propagation(["vgw-12345678"]) == {"vgw-12345678": []}
+        assert all(c[0] != "describe_route_tables" for c in fake_ec2.calls)
+
+    def test_routes_learned(self, verifier, routed_ec2):
+        """Test verification counts propagated routes and adds recommendations."""
+        results = verifier.verify_vpn_connection("vpn-12345678")
+
+        assert results["routes_learned"] == 2
+        assert any("rtb-nopropagation" in r for r in results["recommendations"])
+
+
+class TestBatchVerification:
+    """Test verification of many VPN IDs with chunked calls."""
+
+    @pytest.fixture
+    def many_vpns(self, fake_ec2):
+        """Fake EC2 holding five VPN connections."""
+        template = fake_ec2.vpn_connections[0]
+        fake_ec2.vpn_connections = []
+        for i in range(5):
+            vpn = copy.deepcopy(template)
+            vpn["VpnConnectionId"] = f"vpn-{i}"
+            fake_ec2.vpn_connections.append(vpn)
+        return fake_ec2
+
+    def test_chunked_describe_calls(self, verifier, many_vpns):
+        """Test IDs are looked up in chunks, in input order."""
+        ids = [f"vpn-{i}" for i in (4, 3, 2, 1, 0)]
+
+        results = list(verifier.verify_vpn_connections(ids, chunk_size=2))
+
+        describe_calls = [c for c in many_vpns.calls if c[0] == "describe_vpn_connections"]
+        assert len(describe_calls) == 3
+        assert [r["vpn_id"] for r in results] == ids
+        assert {r["overall_status"] for r in results} == {"available"}
+
+    def test_unknown_ids_not_found(self, verifier, many_vpns):
+        """Test unknown IDs don't fail the rest of their chunk."""
+        results = list(verifier.verify_vpn_connections(["vpn-0", "vpn-missing"]))
+
+        assert [r["overall_status"] for r in results] == ["available", "NOT_FOUND"]
+
+    def test_duplicate_ids_verified_once(self, verifier, many_vpns):
+        """Test repeated IDs are only reported once."""
+        results = list(verifier.verify_vpn_connections(["vpn-1", "vpn-1"]))
+
+        assert len(results) == 1
+
+    def test_api_error_marks_chunk(self, verifier, many_vpns):
+        """Test a failed describe call reports ERROR for its chunk."""
+        def fail(**kwargs):
+            raise RuntimeError("Throttling")
+
+        many_vpns.describe_vpn_connections = fail
+
+        results = list(verifier.verify_vpn_connections(["vpn-0", "vpn-1"]))
+
+        assert [r["overall_status"] for r in results] == ["ERROR", "ERROR"]
+
+    def test_read_vpn_ids(self, tmp_path):
+        """Test ID files skip blanks and comments."""
+        ids_file = tmp_path / "vpns.txt"
+        ids_file.write_text("# production\nvpn-1\n\nvpn-2  # branch office\n")
+
+        assert read_vpn_ids(str(ids_file)) == ["vpn-1", "vpn-2"]
+
+
+class TestEstateVerification:
+    """Test concurrent multi-region, multi-account checks."""
+
+    @pytest.fixture
+    def accounts(self, mock_vpn_connection_response, monkeypatch):
+        """Two accounts; one region in the second account fails."""
+        sessions = {
+            "prod": FakeSession({
+                "us-east-1": FakeEC2([mock_vpn_connection_response]),
+                "eu-west-1": FakeEC2([]),
+            }),
+            "shared": FakeSession({
+                "us-east-1": FakeEC2([mock_vpn_connection_response]),
+                "eu-west-1": FailingEC2(),
+            }),
+        }
+        monkeypatch.setattr(AccountTarget, "session", lambda self: sessions[self.label])
+        return [AccountTarget(label="prod"), AccountTarget(label="shared")]
+
+    def test_merged_report(self, accounts):
+        """Test results from every account/region are merged."""
+        report = verify_estate(accounts, ["us-east-1", "eu-west-1"], max_workers=4)
+
+        assert len(report["results"]) == 4
+        assert report["summary"]["connections"] == 2
+        assert report["summary"]["tunnels_up"] == 2
+        assert report["summary"]["tunnels_total"] == 4
+        assert all("latency_ms" in r for r in report["results"])
+
+    def test_region_errors_are_isolated(self, accounts):
+        """Test one failing region does not hide the others."""
+        report = verify_estate(accounts, ["us-east-1", "eu-west-1"])
+
+        errors = [r for r in report["results"] if r["error"]]
+        assert report["summary"]["errors"] == 1
+        assert (errors[0]["account"], errors[0]["region"]) == ("shared", "eu-west-1")
+
+    def test_resolve_explicit_regions(self):
+        """Test explicit regions are de-duplicated without API calls."""
+        assert resolve_regions(["us-west-2", "us-east-1", "us-west-2"]) == ["us-east-1", "us-west-2"]
+
+    def test_resolve_all_regions(self):
+        """Test "all" lists regions from the API."""
+        class RegionsEC2:
+            def describe_regions(self):
+                return {"Regions": [{"RegionName": "us-west-2"}, {"RegionName": "eu-west-1"}]}
+
+        session = FakeSession({"us-east-1": RegionsEC2()})
+
+        assert resolve_regions(["all"], session) == ["eu-west-1", "us-west-2"]
+
+
+class TestVPNMonitor:
+    """Test change detection and metrics in watch mode."""
+
+    @pytest.fixture
+    def monitor(self, verifier):
+        """Monitor over the fake EC2 client."""
+        return VPNMonitor(verifier, interval=10)
+
+    def test_first_poll_is_baseline(self, monitor):
+        """Test the first poll records state without emitting events."""
+        assert monitor.poll() == []
+        assert len(monitor.tunnels) == 2
+
+    def test_unchanged_poll_is_silent(self, monitor):
+        """Test repeated identical telemetry emits nothing."""
+        monitor.poll()
+
+        assert monitor.poll() == []
+
+    def test_status_transition(self, monitor, fake_ec2):
+        """Test a tunnel coming up emits one transition and counts a flap."""
+        monitor.poll()
+        fake_ec2.vpn_connections[0]["VgwTelemetry"][1]["Status"] = "UP"
+        fake_ec2.vpn_connections[0]["VgwTelemetry"][1]["StatusMessage"] = ""
+
+        events = monitor.poll()
+
+        assert len(events) == 1
+        assert events[0]["changes"]["status"] == ("DOWN", "UP")
+        assert "status_message" in events[0]["changes"]
+        assert monitor.tunnels[("vpn-12345678", "203.0.113.11")].flaps == 1
+
+    def test_missed_flap_detected_from_last_change(self, monitor, fake_ec2):
+        """Test a LastStatusChange update without status change counts as a flap."""
+        monitor.poll()
+        telemetry = fake_ec2.vpn_connections[0]["VgwTelemetry"][0]
+        telemetry["LastStatusChange"] = "2026-01-01T00:00:00Z"
+        monitor.poll()
+        telemetry["LastStatusChange"] = "2026-01-01T00:05:00Z"
+
+        events = monitor.poll()
+
+        assert [list(e["changes"]) for e in events] == [["last_status_change"]]
+        assert monitor.tunnels[("vpn-12345678", "203.0.113.10")].flaps == 1
+
+    def test_removed_connection(self, monitor, fake_ec2):
+        """Test tunnels that disappear are reported once."""
+        monitor.poll()
+        fake_ec2.vpn_connections.clear()
+
+        assert {e["event"] for e in monitor.poll()} == {"removed"}
+        assert monitor.poll() == []
+
+    def test_added_connection(self, monitor, fake_ec2):
+        """Test tunnels appearing after the baseline are reported."""
+        monitor.poll()
+        vpn = copy.deepcopy(fake_ec2.vpn_connections[0])
+        vpn["VpnConnectionId"] = "vpn-new"
+        fake_ec2.vpn_connections.append(vpn)
+
+        events = monitor.poll()
+
+        assert [e["event"] for e in events] == ["added", "added"]
+
+    def test_poll_error_keeps_state(self, monitor, fake_ec2):
+        """Test API failures are reported without dropping known tunnels."""
+        monitor.poll()
+
+        def fail(**kwargs):
+            raise RuntimeError("Throttling")
+
+        fake_ec2.describe_vpn_connections = fail
+
+        assert monitor.poll()[0]["event"] == "poll_error"
+        assert len(monitor.tunnels) == 2
+        assert monitor.poll_errors == 1
+
+    def test_render_metrics(self, monitor):
+        """Test Prometheus exposition of tunnel state."""
+        monitor.poll()
+
+        metrics = monitor.render_metrics()
+
+        assert 'vpn_tunnel_up{vpn_id="vpn-12345678",tunnel="1",outside_ip="203.0.113.10"} 1' in metrics
+        assert 'vpn_tunnel_up{vpn_id="vpn-12345678",tunnel="2",outside_ip="203.0.113.11"} 0' in metrics
+        assert "vpn_tunnels_up 1" in metrics
+        assert "vpn_monitor_polls_total 1" in metrics
+
+    def test_metrics_endpoint(self, monitor):
+        """Test the metrics server answers on /metrics."""
+        monitor.poll()
+        server = monitor.serve_metrics(0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+
+        assert "vpn_tunnels_total 2" in body
+
+    def test_records_history(self, verifier, tmp_path):
+        """Test every poll is appended to the telemetry store."""
+        from telemetry_store import TelemetryStore
+
+        with TelemetryStore(tmp_path / "telemetry.db") as store:
+            monitor = VPNMonitor(verifier, store=store)
+            monitor.poll()
+            report = store.tunnel_report(0)
+
+        assert [(r["outside_ip"], r["availability_pct"]) for r in report] == [
+            ("203.0.113.10", 100.0), ("203.0.113.11", 0.0)
+        ]
+
+    def test_jitter_bounds(self, monitor):
+        """Test poll delays stay within the jitter window."""
+        delays = [monitor.next_delay() for _ in range(100)]
+
+        assert all(9.0 <= d <= 11.0 for d in delays)
+
+
+class _EchoServer(asyncio.DatagramProtocol):
+    """UDP echo server for loopback probe tests."""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.transport.sendto(data, addr)
+
+
+def _unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestProber:
+    """Test data-plane probing against loopback servers."""
+
+    def test_parse_probe_target(self):
+        """Test target specs with and without tunnel labels."""
+        assert parse_probe_target("vpn-1/1=10.1.0.10:22") == ProbeTarget(
+            "vpn-1/1", "10.1.0.10", 22, "tcp"
+        )
+        assert parse_probe_target("10.1.0.10:7/udp").tunnel == "10.1.0.10"
+        with pytest.raises(ValueError):
+            parse_probe_target("10.1.0.10")
+
+    def test_statistics(self):
+        """Test percentiles, jitter and loss."""
+        stats = ProbeStats(target=ProbeTarget("t", "h", 1), sent=5,
+                           latencies_ms=[10.0, 20.0, 10.0, 30.0])
+
+        assert stats.loss_pct == 20.0
+        assert stats.percentile(50) == 15.0
+        assert stats.percentile(99) == pytest.approx(29.7)
+        assert stats.jitter_ms == pytest.approx(40 / 3)
+
+    def test_probes_loopback(self):
+        """Test TCP and UDP probes against local servers, concurrently."""
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            tcp_server = await asyncio.start_server(
+                lambda reader, writer: writer.close(), "127.0.0.1", 0
+            )
+            udp_transport, _ = await loop.create_datagram_endpoint(
+                _EchoServer, local_addr=("127.0.0.1", 0)
+            )
+            tcp_port = tcp_server.sockets[0].getsockname()[1]
+            udp_port = udp_transport.get_extra_info("sockname")[1]
+            try:
+                return await probe_tunnels(
+                    [
+                        ProbeTarget("tunnel-1", "127.0.0.1", tcp_port, "tcp"),
+                        ProbeTarget("tunnel-2", "127.0.0.1", udp_port, "udp"),
+                        ProbeTarget("tunnel-3", "127.0.0.1", _unused_port(), "tcp"),
+                    ],
+                    count=10, rate=100, timeout=0.5
+                )
+            finally:
+                tcp_server.close()
+                udp_transport.close()
+
+        tcp, udp, closed = asyncio.run(scenario())
+
+        assert (tcp.sent, tcp.received) == (10, 10)
+        assert (udp.sent, udp.received) == (10, 10)
+        assert udp.percentile(99) < 500
+        assert closed.loss_pct == 100.0
+        assert closed.to_dict()["p50_ms"] is None
+
+    def test_udp_loss_on_silent_port(self):
+        """Test UDP probes without an echo time out as loss."""
+        stats = asyncio.run(probe_tunnels(
+            [ProbeTarget("tunnel-1", "127.0.0.1", _unused_port(), "udp")],
+            count=3, rate=100, timeout=0.1
+        ))[0]
+
+        assert stats.sent == 3
+        assert stats.loss_pct == 100.0
+
+    def test_unresolvable_udp_host(self, monkeypatch):
+        """Test a UDP target that cannot be resolved is reported as total loss."""
+        def getaddrinfo(*args, **kwargs):
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+        monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+        stats = asyncio.run(probe_tunnels(
+            [ProbeTarget("tunnel-1", "probe-target.invalid", 7, "udp")],
+            count=3, rate=100, timeout=0.1
+        ))[0]
+
+        assert (stats.sent, stats.received) == (3, 0)
+        assert "Name or service not known" in stats.to_dict()["error"]
+
+
+@pytest.fixture
+def run_main(monkeypatch):
+    """Run the CLI with the given arguments and return its exit status."""
+    def run(*argv):
+        monkeypatch.setattr(sys, "argv", ["verify_connectivity.py", *argv])
+        return verify_connectivity.main()
+    return run
+
+
+class TestMain:
+    """Test command-line validation."""
+
+    def test_rejects_malformed_tag(self, run_main, capsys):
+        """Test a --tag without a value is a usage error."""
+        with pytest.raises(SystemExit) as exc:
+            run_main("--tag", "Name")
+
+        assert exc.value.code == 2
+        assert "--tag expects KEY=VALUE, got 'Name'" in capsys.readouterr().err
+
+    def test_rejects_malformed_probe(self, run_main, capsys):
+        """Test an unparsable --probe target is a usage error."""
+        with pytest.raises(SystemExit) as exc:
+            run_main("--probe", "10.1.0.10")
+
+        assert exc.value.code == 2
+        assert "Invalid probe target '10.1.0.10'" in capsys.readouterr().err
+
+    def test_json_without_connections(self, run_main, verifier, fake_ec2, monkeypatch, capsys):
+        """Test --json with no connections prints an empty list and reports on stderr."""
+        fake_ec2.vpn_connections.clear()
+        monkeypatch.setattr(verify_connectivity, "VPNVerifier", lambda region, stack: verifier)
+
+        assert run_main("--json") == 1
+
+        captured = capsys.readouterr()
+        assert json.loads(captured.out) == []
+        assert "No VPN connections found" in captured.err
+
+    @pytest.fixture
+    def watch_cli(self, verifier, monkeypatch):
+        """Watch mode wired to the fake verifier, returning started metrics servers."""
+        servers = []
+        serve = VPNMonitor.serve_metrics
+
+        def serve_metrics(monitor, port):
+            servers.append(serve(monitor, port))
+            return servers[-1]
+
+        monkeypatch.setattr(verify_connectivity, "VPNVerifier", lambda region, stack: verifier)
+        monkeypatch.setattr(VPNMonitor, "serve_metrics", serve_metrics)
+        monkeypatch.setattr(VPNMonitor, "run", lambda monitor, as_json=False: None)
+        yield servers
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_metrics_port_zero_picks_free_port(self, run_main, watch_cli, capsys):
+        """Test --metrics-port 0 serves on a free port and reports it."""
+        assert run_main("--watch", "--metrics-port", "0") == 0
+
+        port = watch_cli[0].server_address[1]
+        assert port != 0
+        assert f"http://127.0.0.1:{port}/metrics" in capsys.readouterr().out
+
+    def test_metrics_port_in_use(self, run_main, watch_cli, capsys):
+        """Test a busy metrics port is reported instead of crashing watch mode."""
+        with socket.socket() as busy:
+            busy.bind(("127.0.0.1", 0))
+            busy.listen()
+            port = busy.getsockname()[1]
+
+            assert run_main("--watch", "--metrics-port", str(port)) == 1
+
+        assert watch_cli == []
+        assert f"Cannot serve metrics on port {port}" in capsys.readouterr().err
+
+    def test_no_metrics(self, run_main, watch_cli):
+        """Test --no-metrics starts no server."""
+        assert run_main("--watch", "--no-metrics") == 0
+
+        assert watch_cli == []
+
+    def test_history_for_vpn_ids(self, run_main, verifier, monkeypatch, tmp_path):
+        """Test --history records tunnels checked with --vpn-id."""
+        from telemetry_store import TelemetryStore
+
+        monkeypatch.setattr(verify_connectivity, "VPNVerifier", lambda region, stack: verifier)
+        db = tmp_path / "telemetry.db"
+
+        assert run_main("--vpn-id", "vpn-12345678", "--history", str(db), "--json") == 0
+
+        with TelemetryStore(db) as store:
+            report = store.tunnel_report(0)
+        assert [(r["outside_ip"], r["availability_pct"]) for r in report] == [
+            ("203.0.113.10", 100.0), ("203.0.113.11", 0.0)
+        ]
+
+    def test_history_for_regions(self, run_main, verifier, monkeypatch, tmp_path):
+        """Test --history records tunnels from a multi-region check."""
+        from telemetry_store import TelemetryStore
+
+        report = {
+            "results": [{
+                "account": "default", "region": "us-east-1", "latency_ms": 1.0, "error": None,
+                "connections": [connection_to_dict(next(verifier.get_vpn_connections()))]
+            }],
+            "summary": {"errors": 0}
+        }
+        monkeypatch.setattr(verify_connectivity, "resolve_regions", lambda names, session: names)
+        monkeypatch.setattr(verify_connectivity, "verify_estate", lambda *args, **kwargs: report)
+        db = tmp_path / "telemetry.db"
+
+        assert run_main("--regions", "us-east-1", "--history", str(db), "--json") == 0
+
+        with TelemetryStore(db) as store:
+            assert len(store.tunnel_report(0)) == 2